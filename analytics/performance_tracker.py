@@ -2,11 +2,11 @@
 Performance Tracker Module
 Analyzes past trades to learn and improve strategy performance over time
 """
-import json
 import os
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict
 from typing import Dict, List
+from logger import loads_jsonl_line
 
 
 class PerformanceTracker:
@@ -19,21 +19,22 @@ class PerformanceTracker:
         self.strategy_stats_cache = {}  # Cache strategy stats
         self.cache_timestamp = None
         self.cache_duration = timedelta(minutes=5)  # Update cache every 5 minutes
+        # (strategy, lookback, trades file stamp) -> boost; only valid while the file is unchanged
+        self._boost_cache = {}
     
     def _read_trades(self, days=7, limit=None):
         """Read trades from JSONL file, optionally limited by count"""
         trades = []
         if os.path.exists(self.trades_file):
-            with open(self.trades_file, 'r') as f:
+            with open(self.trades_file, 'rb') as f:
                 lines = f.readlines()
                 if limit:
                     lines = lines[-limit:]  # Get last N trades
                 for line in lines:
                     if line.strip():
-                        try:
-                            trades.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
+                        trade = loads_jsonl_line(line)
+                        if trade is not None:
+                            trades.append(trade)
         return trades
     
     def calculate_strategy_performance(self, strategy_type: str, lookback_trades: int = 20) -> Dict:
@@ -46,7 +47,10 @@ class PerformanceTracker:
             dict with win_rate, avg_pnl_pct, profit_factor, trade_count, recent_performance
         """
         trades = self._read_trades(days=30, limit=lookback_trades * 2)
-        
+        return self._strategy_performance(trades, strategy_type, lookback_trades)
+    
+    def _strategy_performance(self, trades: List[Dict], strategy_type: str, lookback_trades: int) -> Dict:
+        """Performance metrics for strategy_type over already-loaded trades"""
         strategy_trades = [t for t in trades if t.get('strategy', '').upper() == strategy_type.upper()]
         
         if len(strategy_trades) > lookback_trades:
@@ -103,15 +107,46 @@ class PerformanceTracker:
             }
         }
     
+    def _trades_file_stamp(self):
+        """(mtime_ns, size) of the trades file - changes whenever a trade is appended"""
+        try:
+            st = os.stat(self.trades_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def scoring_stamp(self):
+        """
+        Changes whenever cooldowns or boosts could change a setup scorer's result:
+        the trades file stamp plus the strategies currently in cooldown
+        """
+        cooldowns = self.strategy_cooldowns
+        if not cooldowns:
+            return self._trades_file_stamp(), frozenset()
+        now = datetime.now(timezone.utc)
+        # Snapshot the items: the per-asset workers and the cooldown refresh share this dict
+        return self._trades_file_stamp(), frozenset(s for s, until in list(cooldowns.items()) if now < until)
+    
     def calculate_strategy_boost(self, strategy_type: str, lookback_trades: int = 20) -> Dict:
         """
         Calculate confidence boost/penalty based on strategy performance
+        Cached until the trades file changes (every setup scorer asks on every cycle)
         Parameters:
             strategy_type: Strategy name
             lookback_trades: Number of trades to analyze
         Returns:
             dict with boost, win_rate, avg_pnl, trade_count, reason
         """
+        key = (strategy_type, lookback_trades, self._trades_file_stamp())
+        boost_data = self._boost_cache.get(key)
+        if boost_data is None:
+            if len(self._boost_cache) > 64:
+                self._boost_cache.clear()
+            boost_data = self._boost_cache[key] = self._calculate_strategy_boost(strategy_type, lookback_trades)
+        return boost_data
+    
+    def _calculate_strategy_boost(self, strategy_type: str, lookback_trades: int) -> Dict:
+        """Boost/penalty computed from the trades file"""
         stats = self.calculate_strategy_performance(strategy_type, lookback_trades)
         
         win_rate = stats['win_rate']
@@ -170,21 +205,37 @@ class PerformanceTracker:
         Check if strategy is in cooldown due to poor performance
         Returns: (is_cooldown, reason)
         """
-        if strategy_type not in self.strategy_cooldowns:
+        cooldown_until = self.strategy_cooldowns.get(strategy_type)
+        if cooldown_until is None:
             return False, ""
         
-        cooldown_until = self.strategy_cooldowns[strategy_type]
-        if datetime.now(timezone.utc) < cooldown_until:
-            remaining = (cooldown_until - datetime.now(timezone.utc)).total_seconds() / 3600
+        now = datetime.now(timezone.utc)
+        if now < cooldown_until:
+            remaining = (cooldown_until - now).total_seconds() / 3600
             return True, f"Strategy {strategy_type} in cooldown for {remaining:.1f} more hours"
         
-        del self.strategy_cooldowns[strategy_type]
+        # Another asset's worker may have expired it already
+        self.strategy_cooldowns.pop(strategy_type, None)
         return False, ""
     
     def update_strategy_cooldown(self, strategy_type: str):
         """Set cooldown for strategy if performance is poor"""
         recent_stats = self.calculate_strategy_performance(strategy_type, lookback_trades=10)
-        
+        return self._apply_cooldown(strategy_type, recent_stats)
+    
+    def update_all_cooldowns(self, strategies: List[str]) -> List[str]:
+        """
+        update_strategy_cooldown for several strategies from a single trades-file read
+        Returns the strategies that entered cooldown
+        """
+        trades = self._read_trades(days=30, limit=20)
+        return [
+            strategy for strategy in strategies
+            if self._apply_cooldown(strategy, self._strategy_performance(trades, strategy, 10))
+        ]
+    
+    def _apply_cooldown(self, strategy_type: str, recent_stats: Dict) -> bool:
+        """Start a 2h cooldown if the strategy's last 10 trades won less than 30%"""
         if recent_stats['trade_count'] >= 10:
             win_rate = recent_stats['win_rate']
             if win_rate < 0.30:
@@ -3,6 +3,7 @@ Configuration module for the trading bot
 Loads environment variables and provides configuration constants
 """
 import os
+import threading
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
@@ -76,6 +77,12 @@ ALERT_WEBHOOK_URL = os.getenv('ALERT_WEBHOOK_URL', '')
 # Technical Indicator Settings (Binance-supported intervals)
 TIMEFRAMES = ['5m', '15m', '1h', '4h']
 KLINE_LIMIT = int(os.getenv('KLINE_LIMIT', 200))
+DATA_FETCH_WORKERS = int(os.getenv('DATA_FETCH_WORKERS', 10))  # Max concurrent symbol fetches (rate-limit guard)
+ENABLE_MARKET_STREAM = os.getenv('ENABLE_MARKET_STREAM', 'true').lower() == 'true'  # WebSocket tickers instead of REST polling
+MARKET_STREAM_MAX_AGE_SECONDS = float(os.getenv('MARKET_STREAM_MAX_AGE_SECONDS', 10))  # Older stream tickers fall back to REST
+STREAM_KLINE_INTERVAL = os.getenv('STREAM_KLINE_INTERVAL', '5m')  # A closed candle of this interval starts a cycle early
+SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv('SNAPSHOT_MAX_AGE_SECONDS', 300))  # Indicators reused with stream prices up to this age
+SETUP_SCAN_REUSE_SECONDS = float(os.getenv('SETUP_SCAN_REUSE_SECONDS', 30))  # Max age of a setup scan reused while its inputs are unchanged
 
 # Fast exit/management settings
 STALE_POSITION_MINUTES = int(os.getenv('STALE_POSITION_MINUTES', 20))
@@ -91,6 +98,9 @@ CIRCUIT_BREAKERS = {
 
 # Position Management
 TRAILING_STOP_ACTIVATION = 0.05
+TRAILING_TICK_PCT = float(os.getenv('TRAILING_TICK_PCT', 0.0005))  # Mark move that warrants a trailing-stop update
+STOP_REFRESH_MAX_SECONDS = int(os.getenv('STOP_REFRESH_MAX_SECONDS', 300))  # Refresh stops at least this often
+EXCHANGE_INFO_REFRESH_SECONDS = int(os.getenv('EXCHANGE_INFO_REFRESH_SECONDS', 6 * 3600))  # Symbol filters rarely change
 # Reduced to single TP order to minimize total orders (was [0.5, 0.3, 0.2] = 3 orders)
 # Each position now creates: 1 entry + 1 stop-loss + 1 take-profit = 3 orders total
 SCALED_TP_LEVELS = [1.0]  # Single take-profit order at full target
@@ -101,6 +111,9 @@ OPENROUTER_MODEL = os.getenv('OPENROUTER_MODEL', 'meta-llama/llama-3.1-8b-instru
 OPENROUTER_TEMPERATURE = float(os.getenv('OPENROUTER_TEMPERATURE', 0.3))
 OPENROUTER_MAX_TOKENS = int(os.getenv('OPENROUTER_MAX_TOKENS', 500))
 OPENROUTER_TIMEOUT = int(os.getenv('OPENROUTER_TIMEOUT', 30))
+DECISION_CACHE_TTL_SECONDS = int(os.getenv('DECISION_CACHE_TTL_SECONDS', 120))  # Reuse LLM decisions for unchanged markets
+DECISION_CACHE_SIZE = int(os.getenv('DECISION_CACHE_SIZE', 256))  # Max cached decisions (least recently used evicted first)
+LLM_MAX_CONCURRENT_REQUESTS = int(os.getenv('LLM_MAX_CONCURRENT_REQUESTS', 4))  # Decision requests in flight at once
 
 # Logging Settings
 LOG_DIR = 'logs'
@@ -109,6 +122,9 @@ TRADE_LOG_FILE = f'{LOG_DIR}/trades.jsonl'
 PERFORMANCE_LOG_FILE = f'{LOG_DIR}/performance.jsonl'
 ERROR_LOG_FILE = f'{LOG_DIR}/errors.jsonl'
 ASSESSMENT_LOG_FILE = f'{LOG_DIR}/assessments.jsonl'
+CONSOLE_LOG_FILE = f'{LOG_DIR}/bot.log'
+CONSOLE_LOG_LEVEL = os.getenv('CONSOLE_LOG_LEVEL', 'INFO').upper()  # DEBUG adds per-asset step tracing
+CONSOLE_REPEAT_WINDOW_SECONDS = float(os.getenv('CONSOLE_REPEAT_WINDOW_SECONDS', 60))  # Identical market-data errors shown once per window
 
 # Telegram Bot Settings (disabled)
 ENABLE_TELEGRAM_BOT = False
@@ -118,6 +134,10 @@ HEALTH_CHECK_INTERVAL = 60
 MAX_API_RETRIES = 3
 RETRY_BACKOFF_MULTIPLIER = 2
 API_TIMEOUT = 30
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 20))  # Keep-alive connections per HTTP session
+CLOSE_ALL_TIMEOUT_SECONDS = int(os.getenv('CLOSE_ALL_TIMEOUT_SECONDS', 10))  # Shutdown budget for closing positions
+CLOSE_ALL_WORKERS = 5  # Concurrent close orders on shutdown
+PORTFOLIO_CACHE_SECONDS = float(os.getenv('PORTFOLIO_CACHE_SECONDS', 5))  # Max age of the per-cycle portfolio snapshot
 
 # Binance Settings
 BINANCE_TESTNET_URL = 'https://testnet.binancefuture.com'
@@ -180,11 +200,31 @@ DECISION RULES:
 Remember: Preservation of capital is priority #1. Never risk more than you can afford to lose.
 """
 
+_binance_client = None
+_binance_client_lock = threading.Lock()
+
+def get_binance_client():
+    """
+    Get the shared Binance testnet client.
+    DataPipeline, Executor and the balance check all reuse one client so every
+    REST call goes through the same pooled keep-alive session instead of
+    opening a fresh TCP+TLS connection per client.
+    """
+    global _binance_client
+    with _binance_client_lock:
+        if _binance_client is None:
+            from binance.client import Client
+            from requests.adapters import HTTPAdapter
+            client = Client(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=True)
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            client.session.mount('https://', adapter)
+            _binance_client = client
+    return _binance_client
+
 def get_binance_balance():
     """Fetch actual USDT balance from Binance testnet"""
     try:
-        from binance.client import Client
-        client = Client(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=True)
+        client = get_binance_client()
         balance = client.futures_account_balance()
         usdt_balance = next((float(b['balance']) for b in balance if b['asset'] == 'USDT'), 0)
         return usdt_balance
@@ -3,49 +3,62 @@ Data Pipeline Module
 Handles real-time data fetching, technical indicator calculation, and market data processing
 """
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime, timezone
 import pandas as pd
 import numpy as np
-from binance.client import Client
 from binance.exceptions import BinanceAPIException
 import ta
 from config import (
-    BINANCE_API_KEY, BINANCE_API_SECRET, TIMEFRAMES,
-    KLINE_LIMIT, MAX_API_RETRIES, RETRY_BACKOFF_MULTIPLIER,
-    ENABLE_VOLATILITY_TRADING, VOLATILITY_MIN_ATR_RATIO, SCALP_MODE_THRESHOLD
+    get_binance_client, TIMEFRAMES,
+    KLINE_LIMIT, DATA_FETCH_WORKERS, MAX_API_RETRIES, RETRY_BACKOFF_MULTIPLIER, SNAPSHOT_MAX_AGE_SECONDS,
+    ENABLE_VOLATILITY_TRADING, VOLATILITY_MIN_ATR_RATIO, SCALP_MODE_THRESHOLD, STREAM_KLINE_INTERVAL
 )
+from logger import get_console
+from market_stream import get_market_stream
 
 
 class DataPipeline:
     """Fetches and processes market data for trading decisions"""
     
     def __init__(self):
-        self.client = Client(
-            api_key=BINANCE_API_KEY,
-            api_secret=BINANCE_API_SECRET,
-            testnet=True
-        )
+        self.log = get_console('trading_bot.data', suppress_repeats=True)
+        self.client = get_binance_client()
+        self.stream = get_market_stream()
         self.cache = {}  # Cache for rate limiting
         self.last_fetch = {}
+        # symbol -> (primary candle tail, indicators, regime); reused while the candles are unchanged
+        self._indicator_cache = {}
+        # symbol -> (monotonic fetch time, market data); served with live stream prices by get_cached_realtime
+        self._snapshots = {}
+        # Per-symbol requests (klines per timeframe, funding) are issued side by side
+        self._request_pool = ThreadPoolExecutor(max_workers=DATA_FETCH_WORKERS, thread_name_prefix='klines')
+        # Symbol-level workers live in their own pool: they block on _request_pool
+        # futures, so sharing one pool could starve it of threads
+        self._symbol_pool = ThreadPoolExecutor(max_workers=DATA_FETCH_WORKERS, thread_name_prefix='fetch')
     
-    def fetch_realtime_data(self, symbol: str) -> Dict:
+    def fetch_realtime_data(self, symbol: str, stats_24h: Optional[Dict] = None) -> Dict:
         """
         Fetch real-time market data for a symbol
+        stats_24h: the symbol's 24h ticker if already fetched (see fetch_realtime_batch)
         Returns comprehensive market data including price, indicators, and regime
         """
         try:
-            # Get current price
-            ticker = self.client.futures_symbol_ticker(symbol=symbol)
-            current_price = float(ticker['price'])
-            
-            # Get 24h stats
-            stats_24h = self.client.futures_ticker(symbol=symbol)
-            
-            # Fetch OHLCV data for multiple timeframes
+            # Get 24h stats - its lastPrice is the current price, so no separate price call
+            if stats_24h is None:
+                stats_24h = self.stream.get_ticker(symbol) or self.client.futures_ticker(symbol=symbol)
+            current_price = float(stats_24h['lastPrice'])
+            
+            # Fetch OHLCV data for multiple timeframes (and the funding rate) concurrently
+            kline_futures = {
+                timeframe: self._request_pool.submit(self._fetch_klines, symbol, timeframe)
+                for timeframe in TIMEFRAMES
+            }
+            funding_future = self._request_pool.submit(self.get_funding_rate, symbol)
             timeframe_data = {}
-            for timeframe in TIMEFRAMES:
-                df = self._fetch_klines(symbol, timeframe)
+            for timeframe, future in kline_futures.items():
+                df = future.result()
                 if df is not None and not df.empty:
                     timeframe_data[timeframe] = df
             
@@ -55,14 +68,11 @@ class DataPipeline:
             if primary_df is None or primary_df.empty:
                 return {'symbol': symbol, 'price': current_price, 'error': 'No data available'}
             
-            # Calculate technical indicators
-            indicators = self.calculate_technical_indicators(primary_df)
-            
-            # Get market regime
-            regime = self.get_market_regime(primary_df, indicators)
+            # Calculate technical indicators and market regime
+            indicators, regime = self._get_indicators_and_regime(symbol, primary_df)
             
             # Get funding rate
-            funding_rate = self.get_funding_rate(symbol)
+            funding_rate = funding_future.result()
             
             # Compute volatility flags
             high_24h = float(stats_24h['highPrice'])
@@ -91,40 +101,106 @@ class DataPipeline:
                 'indicators': indicators,
                 'timeframe_data': {tf: self._extract_recent_data(df) for tf, df in timeframe_data.items()}
             }
+            self._snapshots[symbol] = (time.monotonic(), market_data)
             
             return market_data
             
         except Exception as e:
-            print(f"Error fetching data for {symbol}: {e}")
+            self.log.info(f"Error fetching data for {symbol}: {e}")
             return {'symbol': symbol, 'error': str(e)}
     
+    def get_cached_realtime(self, symbol: str) -> Optional[Dict]:
+        """
+        Latest fetched market data for symbol with price fields refreshed from the stream
+        No network call; returns None if the snapshot is too old or no fresh stream ticker exists
+        """
+        snapshot = self._snapshots.get(symbol)
+        if snapshot is None or time.monotonic() - snapshot[0] > SNAPSHOT_MAX_AGE_SECONDS:
+            return None
+        ticker = self.stream.get_ticker(symbol)
+        if ticker is None:
+            return None
+        market_data = dict(snapshot[1])
+        market_data['price'] = float(ticker['lastPrice'])
+        market_data['volume_24h'] = float(ticker['volume'])
+        market_data['price_change_24h'] = float(ticker['priceChangePercent'])
+        market_data['high_24h'] = float(ticker['highPrice'])
+        market_data['low_24h'] = float(ticker['lowPrice'])
+        return market_data
+    
+    def fetch_realtime_batch(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch real-time market data for several symbols concurrently
+        Returns {symbol: market_data}; failures carry an 'error' key like fetch_realtime_data
+        """
+        if not symbols:
+            return {}
+        
+        # Tickers come from the WebSocket stream; one all-symbol REST request
+        # covers any symbol whose stream ticker is missing or stale
+        tickers = {symbol: self.stream.get_ticker(symbol) for symbol in symbols}
+        if not all(tickers.values()):
+            try:
+                rest_tickers = {t['symbol']: t for t in self.client.futures_ticker()}
+            except Exception as e:
+                self.log.info(f"Error fetching 24h tickers: {e}")
+                rest_tickers = {}
+            for symbol, ticker in tickers.items():
+                if ticker is None:
+                    tickers[symbol] = rest_tickers.get(symbol)
+        
+        results = self._symbol_pool.map(lambda symbol: self.fetch_realtime_data(symbol, tickers.get(symbol)), symbols)
+        return dict(zip(symbols, results))
+    
     def _fetch_klines(self, symbol: str, timeframe: str, limit: int = KLINE_LIMIT) -> Optional[pd.DataFrame]:
-        """Fetch OHLCV candle data"""
+        """
+        Fetch OHLCV candle data
+        After the first full download only the candles since the last cached one
+        are requested and merged into a rolling window of `limit` candles
+        """
         try:
             # Check cache (short cache for fast testing)
             cache_key = f"{symbol}_{timeframe}"
+            cached_df = None
             if cache_key in self.cache:
                 cache_time, cached_df = self.cache[cache_key]
                 if time.time() - cache_time < 60:  # 60s cache for quick refresh
                     return cached_df
             
+            if cached_df is not None and len(cached_df) >= limit and timeframe == STREAM_KLINE_INTERVAL:
+                # The stream already carries this interval's latest candles
+                df = self._merge_stream_klines(symbol, cached_df)
+                if df is not None:
+                    self.cache[cache_key] = (time.time(), df)
+                    return df
+            
+            if cached_df is not None and len(cached_df) >= limit:
+                # Delta fetch from the last cached candle (it may still have been forming)
+                last_open_ms = int(cached_df['timestamp'].iloc[-1].value // 1_000_000)
+                klines = self.client.futures_klines(
+                    symbol=symbol,
+                    interval=timeframe,
+                    startTime=last_open_ms,
+                    limit=limit
+                )
+                if klines and len(klines) < limit:
+                    new_df = self._klines_to_dataframe(klines)
+                    first_new = new_df['timestamp'].iloc[0]
+                    df = pd.concat(
+                        [cached_df[cached_df['timestamp'] < first_new], new_df],
+                        ignore_index=True
+                    )
+                    df = df.tail(len(cached_df)).reset_index(drop=True)
+                    self.cache[cache_key] = (time.time(), df)
+                    return df
+                # Gap larger than the window (or empty reply) - fall back to a full fetch
+            
             klines = self.client.futures_klines(
                 symbol=symbol,
                 interval=timeframe,
                 limit=limit
             )
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignore'
-            ])
-            
-            # Convert types
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = df[col].astype(float)
+            df = self._klines_to_dataframe(klines)
             
             # Cache result
             self.cache[cache_key] = (time.time(), df)
@@ -132,17 +208,76 @@ class DataPipeline:
             return df
             
         except Exception as e:
-            print(f"Error fetching klines for {symbol} {timeframe}: {e}")
+            self.log.info(f"Error fetching klines for {symbol} {timeframe}: {e}")
             return None
     
+    def _merge_stream_klines(self, symbol: str, cached_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        cached_df brought up to date from the stream's latest candles, or None if
+        they don't continue it (a REST delta fetch is needed then)
+        """
+        stream_klines = self.stream.get_klines(symbol)
+        if stream_klines is None:
+            return None
+        closed, latest = stream_klines
+        last_open_ms = int(cached_df['timestamp'].iloc[-1].value // 1_000_000)
+        if latest['t'] == last_open_ms:
+            rows = [latest]
+        elif closed is not None and closed['t'] == last_open_ms and closed['T'] + 1 == latest['t']:
+            rows = [closed, latest]
+        else:
+            return None
+        new_df = self._klines_to_dataframe([
+            [k['t'], k['o'], k['h'], k['l'], k['c'], k['v']]
+            for k in rows
+        ])
+        df = pd.concat([cached_df.iloc[:-1], new_df], ignore_index=True)
+        return df.tail(len(cached_df)).reset_index(drop=True)
+    
+    @staticmethod
+    def _klines_to_dataframe(klines: List) -> pd.DataFrame:
+        """
+        Convert raw Binance klines to a typed OHLCV DataFrame
+        Only the OHLCV fields are kept - the trailing string fields (close time, quote
+        volume, trade counts...) are never read and would sit in every cached frame
+        """
+        df = pd.DataFrame(
+            [kline[:6] for kline in klines],
+            columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        )
+        
+        # Convert types
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            df[col] = df[col].astype(float)
+        
+        return df
+    
+    def _get_indicators_and_regime(self, symbol: str, df: pd.DataFrame) -> tuple:
+        """
+        Indicators and regime for the primary candles, recomputed only when the
+        latest candle changed (new candle, or the forming one moved)
+        """
+        last = df.iloc[-1]
+        tail_key = (len(df), last['timestamp'], last['close'], last['high'], last['low'], last['volume'])
+        cached = self._indicator_cache.get(symbol)
+        if cached is not None and cached[0] == tail_key:
+            return cached[1], cached[2]
+        
+        indicators = self.calculate_technical_indicators(df)
+        regime = self.get_market_regime(df, indicators)
+        self._indicator_cache[symbol] = (tail_key, indicators, regime)
+        return indicators, regime
+    
     def calculate_technical_indicators(self, df: pd.DataFrame) -> Dict:
         """Calculate technical indicators from OHLCV data"""
         if df is None or len(df) < 50:
             return {}
         
         try:
-            # Make a copy to avoid modifying original
-            df = df.copy()
+            # Indicators only read the frame (no copy needed); plain statistics
+            # below work on the raw NumPy columns
+            close = df['close'].to_numpy()
             
             # Moving Averages
             ema_9 = ta.trend.EMAIndicator(df['close'], window=9).ema_indicator().iloc[-1]
@@ -166,7 +301,7 @@ class DataPipeline:
             bb_low = bb.bollinger_lband().iloc[-1]
             bb_width = ((bb_high - bb_low) / bb_mid) * 100
             
-            current_price = df['close'].iloc[-1]
+            current_price = close[-1]
             bb_position = ((current_price - bb_low) / (bb_high - bb_low)) * 100 if bb_high != bb_low else 50
             
             # ATR (Average True Range) - for volatility
@@ -174,18 +309,19 @@ class DataPipeline:
             atr_percent = (atr / current_price) * 100
             
             # Volume analysis
-            volume_sma_20 = df['volume'].rolling(20).mean().iloc[-1]
-            current_volume = df['volume'].iloc[-1]
+            volume = df['volume'].to_numpy()
+            volume_sma_20 = volume[-20:].mean()
+            current_volume = volume[-1]
             volume_ratio = current_volume / volume_sma_20 if volume_sma_20 > 0 else 1
             
             # Price momentum
-            price_change_1h = ((df['close'].iloc[-1] - df['close'].iloc[-2]) / df['close'].iloc[-2]) * 100 if len(df) >= 2 else 0
-            price_change_4h = ((df['close'].iloc[-1] - df['close'].iloc[-5]) / df['close'].iloc[-5]) * 100 if len(df) >= 5 else 0
-            price_change_24h = ((df['close'].iloc[-1] - df['close'].iloc[-25]) / df['close'].iloc[-25]) * 100 if len(df) >= 25 else 0
+            price_change_1h = ((close[-1] - close[-2]) / close[-2]) * 100 if len(close) >= 2 else 0
+            price_change_4h = ((close[-1] - close[-5]) / close[-5]) * 100 if len(close) >= 5 else 0
+            price_change_24h = ((close[-1] - close[-25]) / close[-25]) * 100 if len(close) >= 25 else 0
             
             # Support and Resistance (simple version using recent highs/lows)
-            recent_high = df['high'].tail(20).max()
-            recent_low = df['low'].tail(20).min()
+            recent_high = df['high'].to_numpy()[-20:].max()
+            recent_low = df['low'].to_numpy()[-20:].min()
             
             indicators = {
                 'ema_9': float(ema_9),
@@ -215,7 +351,7 @@ class DataPipeline:
             return indicators
             
         except Exception as e:
-            print(f"Error calculating indicators: {e}")
+            self.log.info(f"Error calculating indicators: {e}")
             return {}
     
     def get_market_regime(self, df: pd.DataFrame, indicators: Dict) -> str:
@@ -279,7 +415,7 @@ class DataPipeline:
             return "NEUTRAL"
             
         except Exception as e:
-            print(f"Error determining market regime: {e}")
+            self.log.info(f"Error determining market regime: {e}")
             return "UNKNOWN"
     
     def get_funding_rate(self, symbol: str) -> float:
@@ -289,7 +425,7 @@ class DataPipeline:
             if funding:
                 return float(funding[0]['fundingRate'])
         except Exception as e:
-            print(f"Error fetching funding rate for {symbol}: {e}")
+            self.log.info(f"Error fetching funding rate for {symbol}: {e}")
         return 0.0
     
     def _extract_recent_data(self, df: pd.DataFrame, periods: int = 5) -> List[Dict]:
@@ -306,7 +442,7 @@ class DataPipeline:
             # Verify we can fetch recent data
             df = self._fetch_klines(symbol, '1h', limit=50)
             if df is None or len(df) < 30:
-                print(f"⚠️ Data gap detected for {symbol}, attempting recovery...")
+                self.log.info(f"⚠️ Data gap detected for {symbol}, attempting recovery...")
                 # Clear cache and retry
                 cache_key = f"{symbol}_1h"
                 if cache_key in self.cache:
@@ -314,17 +450,17 @@ class DataPipeline:
                 return False
             return True
         except Exception as e:
-            print(f"Error checking data gaps for {symbol}: {e}")
+            self.log.info(f"Error checking data gaps for {symbol}: {e}")
             return False
     
     def test_connection(self) -> bool:
         """Test connection to Binance Futures"""
         try:
             self.client.futures_ping()
-            print("✅ Connected to Binance Futures Testnet")
+            self.log.info("✅ Connected to Binance Futures Testnet")
             return True
         except Exception as e:
-            print(f"❌ Failed to connect to Binance: {e}")
+            self.log.info(f"❌ Failed to connect to Binance: {e}")
             return False
 
 
@@ -336,14 +472,14 @@ def retry_on_failure(func, max_retries=MAX_API_RETRIES):
         except BinanceAPIException as e:
             if attempt < max_retries - 1:
                 wait_time = RETRY_BACKOFF_MULTIPLIER ** attempt
-                print(f"API error, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
+                get_console('trading_bot.data').warning(f"API error, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
                 time.sleep(wait_time)
             else:
                 raise
         except Exception as e:
             if attempt < max_retries - 1:
                 wait_time = RETRY_BACKOFF_MULTIPLIER ** attempt
-                print(f"Error: {e}, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
+                get_console('trading_bot.data').warning(f"Error: {e}, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
                 time.sleep(wait_time)
             else:
                 raise
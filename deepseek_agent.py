@@ -2,12 +2,17 @@
 LLM Agent (via OpenRouter)
 Integrates with OpenRouter for AI-powered trading decisions
 """
-import json
+import math
 import os
+import threading
 import time
-from typing import Dict
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from config import (
     OPENROUTER_API_KEY,
     OPENROUTER_API_URL,
@@ -18,7 +23,13 @@ from config import (
     SYSTEM_PROMPT,
     MAX_API_RETRIES,
     RETRY_BACKOFF_MULTIPLIER,
+    HTTP_POOL_SIZE,
+    DECISION_CACHE_TTL_SECONDS,
+    DECISION_CACHE_SIZE,
+    LLM_MAX_CONCURRENT_REQUESTS,
 )
+from logger import get_console
+from market_analyzer import get_analyzer
 
 
 class DeepSeekAgent:
@@ -28,9 +39,55 @@ class DeepSeekAgent:
         self.api_key = OPENROUTER_API_KEY
         self.api_url = OPENROUTER_API_URL
         self.model = OPENROUTER_MODEL
-        self.decision_cache: Dict[str, Dict] = {}
+        # (discretized market snapshot) -> (monotonic timestamp, decision), LRU order
+        self.decision_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self.last_regime: Dict[str, str] = {}  # symbol -> regime of its latest lookup
         self.total_api_calls = 0
         self.failed_api_calls = 0
+        self.log = get_console('trading_bot.agent')
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # get_decision runs on several asset worker threads at once; guards the
+        # counters and the decision cache
+        self._lock = threading.Lock()
+        # Decision requests run here so several assets' round trips overlap
+        self._request_pool = ThreadPoolExecutor(
+            max_workers=LLM_MAX_CONCURRENT_REQUESTS, thread_name_prefix="llm"
+        )
+
+        # One keep-alive session for every OpenRouter call; the static headers
+        # live on the session so each request only ships the payload.
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE),
+        )
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                # Optional but recommended per OpenRouter docs
+                "HTTP-Referer": os.getenv("OPENROUTER_REFERER", "http://localhost"),
+                "X-Title": os.getenv("OPENROUTER_TITLE", "AI Trading Bot"),
+            }
+        )
+
+        # Request body serialized once around a placeholder for the user prompt;
+        # each call only encodes the prompt and splices it in
+        placeholder = "\0prompt\0"
+        body = orjson.dumps(
+            {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": placeholder},
+                ],
+                "temperature": OPENROUTER_TEMPERATURE,
+                "max_tokens": OPENROUTER_MAX_TOKENS,
+                "response_format": {"type": "json_object"},
+            }
+        )
+        self._payload_head, self._payload_tail = body.split(orjson.dumps(placeholder))
 
     # --------------------------------------------------------------------- #
     # PUBLIC API
@@ -46,15 +103,20 @@ class DeepSeekAgent:
         Main entry point – returns a validated decision dict.
         If anything goes wrong we return a safe HOLD.
         """
+        cache_key = None if context_override else self._decision_cache_key(
+            market_data, portfolio, day_number
+        )
+        if cache_key is not None:
+            cached = self._lookup_decision(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             # Build the prompt
             if context_override:
                 context = context_override
             else:
-                from market_analyzer import get_analyzer
-
-                analyzer = get_analyzer()
-                context = analyzer.build_llm_context(market_data, portfolio, day_number)
+                context = get_analyzer().build_llm_context(market_data, portfolio, day_number)
 
             # Query OpenRouter
             response_text = self._query_openrouter(context)
@@ -63,65 +125,138 @@ class DeepSeekAgent:
             decision = self._parse_json_response(response_text)
             decision = self._normalize_decision(decision)
             if self._validate_decision(decision):
+                if cache_key is not None:
+                    self._store_decision(cache_key, decision)
                 return decision
             else:
                 return self._hold_decision("LLM response failed validation")
 
         except Exception as exc:  # pylint: disable=broad-except
-            print(f"[DeepSeekAgent] Error getting decision: {exc}")
-            self.failed_api_calls += 1
+            self.log.error(f"[DeepSeekAgent] Error getting decision: {exc}")
+            with self._lock:
+                self.failed_api_calls += 1
             return self._hold_decision(f"Exception: {exc}")
 
+    def submit_decision(self, market_data: Dict, portfolio: Dict, day_number: int) -> Future:
+        """Start get_decision in the background; the future resolves to the decision."""
+        return self._request_pool.submit(self.get_decision, market_data, portfolio, day_number)
+
+    def get_decisions_batch(
+        self, market_data_list: List[Dict], portfolio: Dict, day_number: int
+    ) -> Dict[str, Dict]:
+        """
+        Decisions for several assets with their requests in flight concurrently.
+        Returns {symbol: decision}.
+        """
+        futures = {
+            market_data["symbol"]: self.submit_decision(market_data, portfolio, day_number)
+            for market_data in market_data_list
+        }
+        return {symbol: future.result() for symbol, future in futures.items()}
+
     # --------------------------------------------------------------------- #
     # PRIVATE HELPERS
     # --------------------------------------------------------------------- #
+    @staticmethod
+    def _decision_cache_key(market_data: Dict, portfolio: Dict, day_number: int) -> tuple | None:
+        """
+        Discretize the inputs that drive the prompt: price to 0.1% log buckets,
+        RSI to whole points, volume ratio to 0.1x, plus regime, day and our
+        position on the symbol.
+        """
+        try:
+            symbol = market_data.get("symbol")
+            price = market_data.get("price") or 0
+            indicators = market_data.get("indicators") or {}
+            rsi = indicators.get("rsi") or 0
+            volume_ratio = indicators.get("volume_ratio") or 0
+            positions_by_symbol = portfolio.get("positions_by_symbol")
+            if positions_by_symbol is not None:
+                symbol_positions = positions_by_symbol.get(symbol, ())
+            else:
+                symbol_positions = [p for p in portfolio.get("positions", []) if p.get("symbol") == symbol]
+            held = tuple(sorted(p.get("side", "") for p in symbol_positions))
+            return (
+                symbol,
+                market_data.get("regime"),
+                round(math.log(price) * 1000) if price > 0 else 0,
+                round(rsi),
+                round(volume_ratio, 1),
+                day_number,
+                held,
+            )
+        except (TypeError, ValueError):
+            # Unusable inputs (e.g. NaN RSI) - don't cache
+            return None
+
+    def _lookup_decision(self, key: tuple) -> Dict | None:
+        """
+        Return a copy of a fresh cached decision, or None.
+        A regime change on the symbol drops all of its cached decisions.
+        """
+        symbol, regime = key[0], key[1]
+        with self._lock:
+            if self.last_regime.get(symbol, regime) != regime:
+                stale = [k for k in self.decision_cache if k[0] == symbol]
+                for k in stale:
+                    del self.decision_cache[k]
+            self.last_regime[symbol] = regime
+
+            cached = self.decision_cache.get(key)
+            if cached and time.monotonic() - cached[0] < DECISION_CACHE_TTL_SECONDS:
+                self.decision_cache.move_to_end(key)
+                self.cache_hits += 1
+                return dict(cached[1])
+            self.cache_misses += 1
+            return None
+
+    def _store_decision(self, key: tuple, decision: Dict) -> None:
+        """Cache a validated decision, evicting expired then least recently used entries."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                k for k, (ts, _) in self.decision_cache.items()
+                if now - ts >= DECISION_CACHE_TTL_SECONDS
+            ]
+            for k in expired:
+                del self.decision_cache[k]
+            self.decision_cache[key] = (now, dict(decision))
+            self.decision_cache.move_to_end(key)
+            while len(self.decision_cache) > DECISION_CACHE_SIZE:
+                self.decision_cache.popitem(last=False)
+
     def _query_openrouter(self, prompt: str) -> str:
         """Call OpenRouter with exponential back-off."""
-        self.total_api_calls += 1
-
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": OPENROUTER_TEMPERATURE,
-            "max_tokens": OPENROUTER_MAX_TOKENS,
-            "response_format": {"type": "json_object"},
-        }
+        with self._lock:
+            self.total_api_calls += 1
+
+        payload = self._payload_head + orjson.dumps(prompt) + self._payload_tail
 
         for attempt in range(MAX_API_RETRIES):
             try:
-                resp = requests.post(
+                resp = self.session.post(
                     self.api_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        # Optional but recommended per OpenRouter docs
-                        "HTTP-Referer": os.getenv("OPENROUTER_REFERER", "http://localhost"),
-                        "X-Title": os.getenv("OPENROUTER_TITLE", "AI Trading Bot"),
-                    },
-                    json=payload,
+                    data=payload,
                     timeout=OPENROUTER_TIMEOUT,
                 )
 
                 if resp.status_code == 200:
-                    data = resp.json()
+                    data = orjson.loads(resp.content)
                     return data["choices"][0]["message"]["content"]
 
                 # non-200 → log & retry
                 err = f"OpenRouter API error {resp.status_code}: {resp.text}"
-                print(err)
+                self.log.warning(err)
 
             except requests.exceptions.Timeout:
-                print(f"OpenRouter timeout (attempt {attempt + 1}/{MAX_API_RETRIES})")
+                self.log.warning(f"OpenRouter timeout (attempt {attempt + 1}/{MAX_API_RETRIES})")
             except Exception as exc:  # pylint: disable=broad-except
-                print(f"OpenRouter request exception: {exc}")
+                self.log.warning(f"OpenRouter request exception: {exc}")
 
             # back-off before next try
             if attempt < MAX_API_RETRIES - 1:
                 wait = RETRY_BACKOFF_MULTIPLIER ** attempt
-                print(f"Retrying in {wait}s...")
+                self.log.info(f"Retrying in {wait}s...")
                 time.sleep(wait)
 
         raise RuntimeError("OpenRouter API max retries exceeded")
@@ -130,8 +265,8 @@ class DeepSeekAgent:
     def _parse_json_response(self, text: str) -> Dict:
         """Robust JSON extraction – handles markdown fences, stray text, etc."""
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
             pass
 
         # try markdown code blocks
@@ -141,8 +276,8 @@ class DeepSeekAgent:
                 end = text.find("```", start)
                 if end != -1:
                     try:
-                        return json.loads(text[start:end].strip())
-                    except json.JSONDecodeError:
+                        return orjson.loads(text[start:end].strip())
+                    except orjson.JSONDecodeError:
                         pass
 
         # last-ditch: grab first { … } block
@@ -150,11 +285,11 @@ class DeepSeekAgent:
         end = text.rfind("}") + 1
         if start != -1 and end > start:
             try:
-                return json.loads(text[start:end])
-            except json.JSONDecodeError:
+                return orjson.loads(text[start:end])
+            except orjson.JSONDecodeError:
                 pass
 
-        print(f"[DeepSeekAgent] Could not parse response: {text[:200]}")
+        self.log.warning(f"[DeepSeekAgent] Could not parse response: {text[:200]}")
         return self._hold_decision("Unparsable LLM output")
 
     # --------------------------------------------------------------------- #
@@ -172,12 +307,12 @@ class DeepSeekAgent:
         }
         missing = required - decision.keys()
         if missing:
-            print(f"Missing fields: {missing}")
+            self.log.warning(f"Missing fields: {missing}")
             return False
 
         # action
         if decision["action"] not in {"LONG", "SHORT", "CLOSE", "HOLD"}:
-            print(f"Invalid action: {decision['action']}")
+            self.log.warning(f"Invalid action: {decision['action']}")
             return False
 
         # numeric ranges
@@ -289,7 +424,7 @@ class DeepSeekAgent:
     # --------------------------------------------------------------------- #
     def get_fallback_decision(self, market_data: Dict, portfolio: Dict) -> Dict:
         """Simple rule-based fallback when OpenRouter is unreachable."""
-        print("Using fallback decision logic")
+        self.log.info("Using fallback decision logic")
         for pos in portfolio.get("positions", []):
             if pos.get("pnl_percent", 0) < -5:
                 return {
@@ -315,6 +450,9 @@ class DeepSeekAgent:
             "total_api_calls": self.total_api_calls,
             "failed_api_calls": self.failed_api_calls,
             "success_rate_%": round(success, 2),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_size": len(self.decision_cache),
         }
 
 
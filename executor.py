@@ -4,31 +4,96 @@ Handles trade execution, position management, stop-loss and take-profit orders
 """
 from typing import Dict, List, Optional
 import math
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from config import (
-    BINANCE_API_KEY, BINANCE_API_SECRET, TRAILING_STOP_ACTIVATION,
-    SCALED_TP_LEVELS, INITIAL_CAPITAL, STALE_POSITION_MINUTES, STALE_PNL_BAND
+    get_binance_client, TRAILING_STOP_ACTIVATION,
+    SCALED_TP_LEVELS, INITIAL_CAPITAL, STALE_POSITION_MINUTES, STALE_PNL_BAND,
+    CLOSE_ALL_TIMEOUT_SECONDS, CLOSE_ALL_WORKERS, PORTFOLIO_CACHE_SECONDS,
+    EXCHANGE_INFO_REFRESH_SECONDS
 )
 from time_filters import get_entry_hour_utc
+from logger import get_console
+
+# Maximum orders Binance accepts in one batchOrders request
+BATCH_ORDER_LIMIT = 5
 
 
 class Executor:
     """Executes trades and manages positions on Binance Futures"""
     
     def __init__(self):
-        self.client = Client(
-            api_key=BINANCE_API_KEY,
-            api_secret=BINANCE_API_SECRET,
-            testnet=True
-        )
+        self.log = get_console('trading_bot.executor')
+        self.client = get_binance_client()
         self.open_positions = {}
         self.position_entry_prices = {}
         self.stop_loss_orders = {}
+        self.stale_stop_orders = {}  # symbol -> replaced stop order ids whose cancel failed (retried)
         self.take_profit_orders = {}
         self.trailing_stops = {}
+        
+        # Portfolio snapshot cached for the duration of one trading cycle
+        self.cycle_id = None
+        self._portfolio_cache = None
+        self._portfolio_cache_cycle = None
+        self._portfolio_cache_time = 0.0
+        self._portfolio_generation = 0  # Bumped by every invalidation
+        self._portfolio_state_lock = threading.Lock()  # Guards generation + cache store (never held across I/O)
+        self._portfolio_lock = threading.Lock()  # One Binance fetch when several workers miss
+        
+        # symbol -> exchange symbol info, re-pulled every EXCHANGE_INFO_REFRESH_SECONDS
+        self._symbol_info = {}
+        self._symbol_info_time = float('-inf')
+        self._symbol_info_lock = threading.Lock()
+    
+    def begin_cycle(self):
+        """Start a new trading cycle - the next portfolio read hits Binance again"""
+        self.cycle_id = 0 if self.cycle_id is None else self.cycle_id + 1
+    
+    def invalidate_portfolio_cache(self):
+        """
+        Drop the cached portfolio snapshot (call after anything that changes positions)
+        A fetch already in flight was started before the change and won't be cached
+        """
+        with self._portfolio_state_lock:
+            self._portfolio_generation += 1
+            self._portfolio_cache = None
+    
+    def get_symbol_info(self, symbol: str) -> Optional[Dict]:
+        """
+        Exchange info for symbol from the cached futures_exchange_info, or None if unknown
+        Adds 'filters_by_type' (filterType -> filter) and 'tick_precision' (decimals of the tick size)
+        """
+        if time.monotonic() - self._symbol_info_time > EXCHANGE_INFO_REFRESH_SECONDS:
+            with self._symbol_info_lock:
+                if time.monotonic() - self._symbol_info_time > EXCHANGE_INFO_REFRESH_SECONDS:
+                    exchange_info = self.client.futures_exchange_info()
+                    symbol_info = {}
+                    for info in exchange_info['symbols']:
+                        filters_by_type = {f['filterType']: f for f in info['filters']}
+                        tick_precision = 2
+                        price_filter = filters_by_type.get('PRICE_FILTER')
+                        if price_filter:
+                            tick_size = float(price_filter['tickSize'])
+                            if tick_size > 0:
+                                tick_precision = max(0, len(str(tick_size).rstrip('0').split('.')[-1]))
+                        symbol_info[info['symbol']] = {
+                            **info, 'filters_by_type': filters_by_type, 'tick_precision': tick_precision
+                        }
+                    self._symbol_info = symbol_info
+                    self._symbol_info_time = time.monotonic()
+        return self._symbol_info.get(symbol)
+    
+    def get_price_precision(self, symbol: str) -> int:
+        """Price precision from the symbol's tick size (2 if unavailable)"""
+        try:
+            symbol_info = self.get_symbol_info(symbol)
+        except Exception:
+            return 2
+        return symbol_info['tick_precision'] if symbol_info else 2
     
     def execute_trade(
         self,
@@ -50,7 +115,7 @@ class Executor:
             elif action == 'CLOSE':
                 return self.close_position(symbol)
             
-            elif action in ['LONG', 'SHORT']:
+            elif action in {'LONG', 'SHORT'}:
                 return self._open_position(
                     symbol, action, position_size_dollars, leverage, decision
                 )
@@ -59,7 +124,7 @@ class Executor:
                 return {'status': 'ERROR', 'message': f'Unknown action: {action}'}
                 
         except Exception as e:
-            print(f"Error executing trade for {symbol}: {e}")
+            self.log.info(f"Error executing trade for {symbol}: {e}")
             return {'status': 'ERROR', 'message': str(e)}
     
     def _open_position(
@@ -80,8 +145,7 @@ class Executor:
             current_price = float(ticker['price'])
             
             # Get symbol info for precision
-            exchange_info = self.client.futures_exchange_info()
-            symbol_info = next((s for s in exchange_info['symbols'] if s['symbol'] == symbol), None)
+            symbol_info = self.get_symbol_info(symbol)
             
             if not symbol_info:
                 return {'status': 'ERROR', 'message': f'Symbol {symbol} not found'}
@@ -139,6 +203,7 @@ class Executor:
                 type='MARKET',
                 quantity=quantity
             )
+            self.invalidate_portfolio_cache()
             
             # Determine fill price robustly
             fill_price = float(order.get('avgPrice') or 0.0)
@@ -171,7 +236,7 @@ class Executor:
                 except Exception:
                     pass
             
-            print(f"✅ Opened {side} position: {symbol} @ ${fill_price:,.2f} | Qty: {quantity} | Leverage: {leverage}x")
+            self.log.info(f"✅ Opened {side} position: {symbol} @ ${fill_price:,.2f} | Qty: {quantity} | Leverage: {leverage}x")
             
             # Determine if this is a pyramid position
             is_pyramid = decision.get('is_pyramid', False)
@@ -210,7 +275,7 @@ class Executor:
             
             # If pyramid, use special stop loss at first position's current price
             if is_pyramid and pyramid_stop_price:
-                print(f"   🏗️  PYRAMID STOP: Setting stop at first position entry: ${pyramid_stop_price:,.2f}")
+                self.log.info(f"   🏗️  PYRAMID STOP: Setting stop at first position entry: ${pyramid_stop_price:,.2f}")
                 self.set_stop_loss(
                     symbol, side, pyramid_stop_price, quantity, 0, price_precision, move_to_breakeven=False
                 )
@@ -234,7 +299,7 @@ class Executor:
             if sl_order_id:
                 total_orders += 1
             total_orders += len(tp_order_ids)
-            print(f"   📋 Total orders created for {symbol}: {total_orders} (1 entry + {1 if sl_order_id else 0} stop-loss + {len(tp_order_ids)} take-profit)")
+            self.log.info(f"   📋 Total orders created for {symbol}: {total_orders} (1 entry + {1 if sl_order_id else 0} stop-loss + {len(tp_order_ids)} take-profit)")
 
             # Verify order status for diagnostics
             order_status = None
@@ -258,10 +323,10 @@ class Executor:
             }
             
         except BinanceAPIException as e:
-            print(f"Binance API error opening position: {e}")
+            self.log.info(f"Binance API error opening position: {e}")
             return {'status': 'ERROR', 'message': str(e)}
         except Exception as e:
-            print(f"Error opening position: {e}")
+            self.log.info(f"Error opening position: {e}")
             return {'status': 'ERROR', 'message': str(e)}
     
     def set_stop_loss(
@@ -326,14 +391,14 @@ class Executor:
                 self.open_positions[symbol]['current_stop_loss_price'] = stop_price
             
             if move_to_breakeven:
-                print(f"   🛡️ Stop Loss moved to breakeven @ ${stop_price:,.2f}")
+                self.log.info(f"   🛡️ Stop Loss moved to breakeven @ ${stop_price:,.2f}")
             else:
-                print(f"   🛡️ Stop Loss set @ ${stop_price:,.2f} ({stop_loss_percent}%)")
+                self.log.info(f"   🛡️ Stop Loss set @ ${stop_price:,.2f} ({stop_loss_percent}%)")
             
             return order_id
             
         except Exception as e:
-            print(f"Error setting stop loss for {symbol}: {e}")
+            self.log.info(f"Error setting stop loss for {symbol}: {e}")
             return None
     
     def set_take_profit(
@@ -354,14 +419,13 @@ class Executor:
         order_ids = []
         
         try:
-            # Fetch symbol filters for proper rounding
-            exchange_info = self.client.futures_exchange_info()
-            symbol_info = next((s for s in exchange_info['symbols'] if s['symbol'] == symbol), None)
+            # Symbol filters for proper rounding
+            symbol_info = self.get_symbol_info(symbol)
             if not symbol_info:
                 raise ValueError(f"Symbol info not found for {symbol}")
             
             # LOT_SIZE filter
-            lot_filter = next(f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE')
+            lot_filter = symbol_info['filters_by_type']['LOT_SIZE']
             step_size = float(lot_filter['stepSize'])
             min_qty = float(lot_filter['minQty'])
             
@@ -389,7 +453,7 @@ class Executor:
                 
                 # Skip if below minimum quantity
                 if tp_quantity < min_qty or tp_quantity <= 0:
-                    print(f"   ⚠️ TP{i+1} skipped: quantity {tp_quantity} below minimum {min_qty}")
+                    self.log.info(f"   ⚠️ TP{i+1} skipped: quantity {tp_quantity} below minimum {min_qty}")
                     continue
                 
                 # Calculate TP price based on direction
@@ -403,7 +467,7 @@ class Executor:
                 
                 # Validate price
                 if tp_price <= 0:
-                    print(f"   ⚠️ TP{i+1} skipped: invalid price {tp_price}")
+                    self.log.info(f"   ⚠️ TP{i+1} skipped: invalid price {tp_price}")
                     continue
                 
                 # Round price to precision
@@ -418,47 +482,75 @@ class Executor:
                     'order_side': order_side
                 })
             
-            # Place TP orders
-            for tp_level in tp_levels:
-                try:
-                    order = self.client.futures_create_order(
-                        symbol=symbol,
-                        side=tp_level['order_side'],
-                        type='TAKE_PROFIT_MARKET',
-                        stopPrice=tp_level['price'],
-                        quantity=tp_level['quantity'],
-                        timeInForce='GTC'
-                    )
-                    
-                    order_id = str(order['orderId'])
-                    order_ids.append(order_id)
-                    
-                    print(f"   🎯 TP{tp_level['level']}: {tp_level['percent_of_position']}% @ ${tp_level['price']:,.2f} ({tp_level['profit_target']:.1f}% profit) | qty={tp_level['quantity']}")
-                    
-                except BinanceAPIException as e:
-                    print(f"   ⚠️ Failed to place TP{tp_level['level']} for {symbol}: {e}")
+            # Place all TP orders in a single batch request
+            responses = self._place_orders_batch([
+                {
+                    'symbol': symbol,
+                    'side': tp_level['order_side'],
+                    'type': 'TAKE_PROFIT_MARKET',
+                    'stopPrice': tp_level['price'],
+                    'quantity': tp_level['quantity'],
+                    'timeInForce': 'GTC'
+                }
+                for tp_level in tp_levels
+            ])
+            
+            for tp_level, order in zip(tp_levels, responses):
+                if 'orderId' not in order:
                     # Continue with other TPs even if one fails
+                    self.log.info(f"   ⚠️ Failed to place TP{tp_level['level']} for {symbol}: {order.get('msg', order)}")
                     continue
-                except Exception as e:
-                    print(f"   ⚠️ Error placing TP{tp_level['level']} for {symbol}: {e}")
-                    continue
+                
+                order_id = str(order['orderId'])
+                order_ids.append(order_id)
+                
+                self.log.info(f"   🎯 TP{tp_level['level']}: {tp_level['percent_of_position']}% @ ${tp_level['price']:,.2f} ({tp_level['profit_target']:.1f}% profit) | qty={tp_level['quantity']}")
             
             # Verify at least one TP was placed
             if not order_ids:
-                print(f"   ❌ WARNING: No take profit orders placed for {symbol}")
+                self.log.info(f"   ❌ WARNING: No take profit orders placed for {symbol}")
                 return []
             
             # Store TP order IDs
             self.take_profit_orders[symbol] = order_ids
             
-            print(f"   ✅ Placed {len(order_ids)}/3 take profit orders for {symbol}")
+            self.log.info(f"   ✅ Placed {len(order_ids)}/3 take profit orders for {symbol}")
             
             return order_ids
             
         except Exception as e:
-            print(f"Error setting take profit for {symbol}: {e}")
+            self.log.info(f"Error setting take profit for {symbol}: {e}")
             return []
     
+    def _place_orders_batch(self, orders: List[Dict]) -> List[Dict]:
+        """
+        Submit orders through Binance's batchOrders endpoint (5 orders per request)
+        Returns one entry per order: the order response, or a dict with 'code'/'msg'
+        when that order was rejected
+        """
+        results = []
+        for start in range(0, len(orders), BATCH_ORDER_LIMIT):
+            chunk = orders[start:start + BATCH_ORDER_LIMIT]
+            try:
+                results.extend(self.client.futures_place_batch_order(
+                    batchOrders=[{k: str(v) for k, v in order.items()} for order in chunk]
+                ))
+                continue
+            except BinanceAPIException as e:
+                # Whole batch rejected before any order was placed - retry one by one
+                self.log.info(f"   ⚠️ Batch order request rejected ({e}), placing orders individually")
+            except Exception as e:
+                # Outcome unknown (e.g. timeout) - don't risk placing duplicates
+                results.extend({'code': -1, 'msg': str(e)} for _ in chunk)
+                continue
+            
+            for order in chunk:
+                try:
+                    results.append(self.client.futures_create_order(**order))
+                except Exception as e:
+                    results.append({'code': getattr(e, 'code', -1), 'msg': str(e)})
+        return results
+    
     def close_position(self, symbol: str) -> Dict:
         """Close an open position"""
         try:
@@ -497,6 +589,7 @@ class Executor:
                 type='MARKET',
                 quantity=quantity
             )
+            self.invalidate_portfolio_cache()
             
             exit_price = float(order.get('avgPrice', 0))
             
@@ -509,7 +602,7 @@ class Executor:
             leverage = position.get('leverage', 1)
             pnl_percent *= leverage  # Account for leverage
             
-            print(f"✅ Closed {side} position: {symbol} @ ${exit_price:,.2f} | PnL: {pnl_percent:+.2f}%")
+            self.log.info(f"✅ Closed {side} position: {symbol} @ ${exit_price:,.2f} | PnL: {pnl_percent:+.2f}%")
             
             # Cancel any open stop loss / take profit orders
             self._cancel_orders(symbol)
@@ -530,7 +623,7 @@ class Executor:
             }
             
         except Exception as e:
-            print(f"Error closing position for {symbol}: {e}")
+            self.log.info(f"Error closing position for {symbol}: {e}")
             return {'status': 'ERROR', 'message': str(e)}
     
     def execute_tiered_exit(self, position: Dict, exit_signal: Dict) -> Dict:
@@ -584,6 +677,7 @@ class Executor:
                 partial_result = self.close_partial_position(symbol, percentage)
                 
                 if partial_result.get('status') == 'SUCCESS':
+                    self.invalidate_portfolio_cache()
                     close_price = partial_result.get('close_price', 0)
                     remaining_qty = partial_result.get('remaining_quantity', 0)
                     
@@ -596,17 +690,7 @@ class Executor:
                         'reason': ' | '.join(exit_signal.get('reasons', []))
                     })
                     
-                    price_precision = 2
-                    try:
-                        exchange_info = self.client.futures_exchange_info()
-                        symbol_info = next((s for s in exchange_info['symbols'] if s['symbol'] == symbol), None)
-                        if symbol_info:
-                            price_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'PRICE_FILTER'), None)
-                            if price_filter:
-                                tick_size = float(price_filter['tickSize'])
-                                price_precision = max(0, len(str(tick_size).rstrip('0').split('.')[-1]))
-                    except Exception:
-                        pass
+                    price_precision = self.get_price_precision(symbol)
                     
                     self.set_stop_loss(symbol, side, entry_price, remaining_qty, 0, price_precision, move_to_breakeven=True)
                     
@@ -620,7 +704,7 @@ class Executor:
                     decision = {'take_profit_percent': 15.0}
                     self.set_take_profit(symbol, side, entry_price, remaining_qty, decision['take_profit_percent'], price_precision)
                     
-                    print(f"   ✅ Exit tier PARTIAL_60: Closed {percentage:.0%} at ${close_price:,.2f}, stop moved to breakeven")
+                    self.log.info(f"   ✅ Exit tier PARTIAL_60: Closed {percentage:.0%} at ${close_price:,.2f}, stop moved to breakeven")
                 
                 return partial_result
             
@@ -633,6 +717,7 @@ class Executor:
                 partial_result = self.close_partial_position(symbol, percentage)
                 
                 if partial_result.get('status') == 'SUCCESS':
+                    self.invalidate_portfolio_cache()
                     close_price = partial_result.get('close_price', 0)
                     remaining_qty = partial_result.get('remaining_quantity', 0)
                     
@@ -648,17 +733,7 @@ class Executor:
                         'reason': ' | '.join(exit_signal.get('reasons', []))
                     })
                     
-                    price_precision = 2
-                    try:
-                        exchange_info = self.client.futures_exchange_info()
-                        symbol_info = next((s for s in exchange_info['symbols'] if s['symbol'] == symbol), None)
-                        if symbol_info:
-                            price_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'PRICE_FILTER'), None)
-                            if price_filter:
-                                tick_size = float(price_filter['tickSize'])
-                                price_precision = max(0, len(str(tick_size).rstrip('0').split('.')[-1]))
-                    except Exception:
-                        pass
+                    price_precision = self.get_price_precision(symbol)
                     
                     if side == 'LONG':
                         new_stop = current_price * 0.99
@@ -677,14 +752,14 @@ class Executor:
                     decision = {'take_profit_percent': 15.0}
                     self.set_take_profit(symbol, side, entry_price, remaining_qty, decision['take_profit_percent'], price_precision)
                     
-                    print(f"   ✅ Exit tier PARTIAL_40: Closed {percentage:.0%} at ${close_price:,.2f}, stop tightened to ${new_stop:,.2f} (1% away)")
+                    self.log.info(f"   ✅ Exit tier PARTIAL_40: Closed {percentage:.0%} at ${close_price:,.2f}, stop tightened to ${new_stop:,.2f} (1% away)")
                 
                 return partial_result
             
             return {'status': 'ERROR', 'message': f'Unknown exit action: {exit_action}'}
             
         except Exception as e:
-            print(f"Error executing tiered exit for {symbol}: {e}")
+            self.log.info(f"Error executing tiered exit for {symbol}: {e}")
             return {'status': 'ERROR', 'message': str(e)}
     
     def _cancel_orders(self, symbol: str):
@@ -695,6 +770,7 @@ class Executor:
             # Remove from tracking
             if symbol in self.stop_loss_orders:
                 del self.stop_loss_orders[symbol]
+            self.stale_stop_orders.pop(symbol, None)
             if symbol in self.take_profit_orders:
                 del self.take_profit_orders[symbol]
             if symbol in self.trailing_stops:
@@ -705,7 +781,7 @@ class Executor:
                 self.open_positions[symbol]['tp2_hit'] = False
                 
         except Exception as e:
-            print(f"Error canceling orders for {symbol}: {e}")
+            self.log.info(f"Error canceling orders for {symbol}: {e}")
     
     def get_open_positions(self) -> List[Dict]:
         """Get all open positions"""
@@ -785,12 +861,38 @@ class Executor:
                             self.open_positions[symbol]['highest_price_reached'] = mark_price
             
         except Exception as e:
-            print(f"Error fetching positions: {e}")
+            self.log.info(f"Error fetching positions: {e}")
         
         return positions
     
     def get_portfolio_status(self) -> Dict:
-        """Get complete portfolio status"""
+        """
+        Get complete portfolio status
+        Within a trading cycle (see begin_cycle) the snapshot is served from memory
+        until an order invalidates it or it is PORTFOLIO_CACHE_SECONDS old
+        """
+        # Read the attribute once - invalidate_portfolio_cache may clear it at any time
+        cache = self._portfolio_cache
+        if self._portfolio_cache_valid(cache):
+            return cache
+        
+        with self._portfolio_lock:
+            # Another worker may have refreshed it while we waited
+            cache = self._portfolio_cache
+            if self._portfolio_cache_valid(cache):
+                return cache
+            return self._fetch_portfolio_status()
+    
+    def _portfolio_cache_valid(self, cache: Optional[Dict]) -> bool:
+        """True if cache (a read of _portfolio_cache) belongs to this cycle and is still fresh"""
+        return (cache is not None
+                and self.cycle_id is not None
+                and self._portfolio_cache_cycle == self.cycle_id
+                and time.monotonic() - self._portfolio_cache_time < PORTFOLIO_CACHE_SECONDS)
+    
+    def _fetch_portfolio_status(self) -> Dict:
+        """Read account and positions from Binance and cache the snapshot"""
+        generation = self._portfolio_generation
         try:
             # Get account info
             account = self.client.futures_account()
@@ -804,27 +906,40 @@ class Executor:
             peak_value = max(total_value, INITIAL_CAPITAL)
             drawdown_percent = ((peak_value - total_value) / peak_value) * 100 if peak_value > 0 else 0
             
-            # Get open positions
+            # Get open positions (plus a per-symbol index for O(1) lookups)
             positions = self.get_open_positions()
+            positions_by_symbol = {}
+            for pos in positions:
+                positions_by_symbol.setdefault(pos['symbol'], []).append(pos)
             
-            return {
+            portfolio = {
                 'total_value': total_value,
                 'total_balance': total_balance,
                 'available_balance': available_balance,
                 'unrealized_pnl': unrealized_pnl,
                 'drawdown_percent': drawdown_percent,
                 'positions': positions,
+                'positions_by_symbol': positions_by_symbol,
                 'position_count': len(positions)
             }
             
+            # An order invalidated the cache mid-fetch - this snapshot may predate it
+            with self._portfolio_state_lock:
+                if generation == self._portfolio_generation:
+                    self._portfolio_cache_cycle = self.cycle_id
+                    self._portfolio_cache_time = time.monotonic()
+                    self._portfolio_cache = portfolio
+            return portfolio
+            
         except Exception as e:
-            print(f"Error getting portfolio status: {e}")
+            self.log.info(f"Error getting portfolio status: {e}")
             return {
                 'total_value': INITIAL_CAPITAL,
                 'available_balance': INITIAL_CAPITAL,
                 'unrealized_pnl': 0,
                 'drawdown_percent': 0,
                 'positions': [],
+                'positions_by_symbol': {},
                 'position_count': 0
             }
     
@@ -845,7 +960,7 @@ class Executor:
                         self.trailing_stops[symbol] = pnl_percent
                         
         except Exception as e:
-            print(f"Error updating trailing stops: {e}")
+            self.log.info(f"Error updating trailing stops: {e}")
     
     def update_dynamic_trailing_stop(self, position: Dict, market_data: Dict) -> bool:
         """
@@ -856,14 +971,22 @@ class Executor:
         Returns:
             bool: True if trailing stop was updated, False otherwise
         """
+        plan = self.plan_trailing_stop(position, market_data)
+        return plan is not None and bool(self.apply_trailing_stops([plan]))
+    
+    def plan_trailing_stop(self, position: Dict, market_data: Dict) -> Optional[Dict]:
+        """
+        Work out whether position's trailing stop should move (no orders are placed)
+        Returns the stop update for apply_trailing_stops, or None if the stop stays
+        """
+        symbol = position.get('symbol')
         try:
-            symbol = position['symbol']
             side = position['side']
             entry_price = position.get('entry_price', 0)
             current_price = position.get('current_price', 0)
             
             if not entry_price or not current_price or entry_price <= 0:
-                return False
+                return None
             
             # Get indicators from market_data
             indicators = market_data.get('indicators', {})
@@ -877,7 +1000,7 @@ class Executor:
             
             # Check if position is in tracked positions
             if symbol not in self.open_positions:
-                return False
+                return None
             
             tracked_position = self.open_positions[symbol]
             
@@ -891,7 +1014,7 @@ class Executor:
             
             # Start trailing at 3% profit (not 5%)
             if profit_percent < 3.0:
-                return False
+                return None
             
             # Calculate ATR ratio
             atr_ratio = (atr / current_price) if current_price > 0 else 0
@@ -930,13 +1053,12 @@ class Executor:
                     should_update = True
             
             if not should_update:
-                return False
+                return None
             
             # Get precision for price rounding
-            exchange_info = self.client.futures_exchange_info()
-            symbol_info = next((s for s in exchange_info['symbols'] if s['symbol'] == symbol), None)
+            symbol_info = self.get_symbol_info(symbol)
             if not symbol_info:
-                return False
+                return None
             
             price_precision = int(symbol_info.get('pricePrecision', 2))
             new_stop = round(new_stop, price_precision)
@@ -956,113 +1078,126 @@ class Executor:
                     pass
             
             if quantity <= 0:
-                print(f"   ⚠️ Cannot update trailing stop for {symbol}: quantity is 0")
-                return False
-            
-            # Check if stop loss order exists
-            stop_order_id = self.stop_loss_orders.get(symbol)
-            if not stop_order_id:
-                # Create new stop loss order
-                return self._create_stop_loss_order(
-                    symbol, side, new_stop, quantity, price_precision, trail_type
-                )
+                self.log.info(f"   ⚠️ Cannot update trailing stop for {symbol}: quantity is 0")
+                return None
             
-            # Modify existing stop loss order with retry logic
-            max_retries = 2
-            for attempt in range(max_retries):
-                try:
-                    # Binance doesn't have modify_order for futures, so cancel and recreate
-                    try:
-                        self.client.futures_cancel_order(symbol=symbol, orderId=stop_order_id)
-                    except Exception:
-                        pass  # Order might already be filled or canceled
-                    
-                    # Create new stop loss order at new price
-                    order = self.client.futures_create_order(
-                        symbol=symbol,
-                        side=order_side,
-                        type='STOP_MARKET',
-                        stopPrice=new_stop,
-                        quantity=quantity,
-                        timeInForce='GTC'
-                    )
-                    
-                    new_order_id = str(order['orderId'])
-                    self.stop_loss_orders[symbol] = new_order_id
-                    
-                    # Update tracking
-                    tracked_position['current_stop_loss_price'] = new_stop
-                    tracked_position['trail_type'] = trail_type
-                    
-                    if not tracked_position.get('is_trailing', False):
-                        tracked_position['is_trailing'] = True
-                        tracked_position['trail_started_at'] = datetime.now(timezone.utc).isoformat()
-                        print(f"   🎯 Trailing stop ACTIVATED for {symbol} @ {profit_percent:.2f}% profit")
-                    
-                    print(f"   📈 Trailing stop UPDATED for {symbol}: ${new_stop:,.2f} ({trail_type}, {trail_distance_pct:.1f}% from ${current_price:,.2f})")
-                    return True
-                    
-                except BinanceAPIException as e:
-                    if attempt < max_retries - 1:
-                        time.sleep(0.5)  # Brief delay before retry
-                        continue
-                    else:
-                        print(f"   ❌ CRITICAL: Failed to update trailing stop for {symbol} after {max_retries} attempts: {e}")
-                        return False
-                except Exception as e:
-                    if attempt < max_retries - 1:
-                        time.sleep(0.5)
-                        continue
-                    else:
-                        print(f"   ❌ CRITICAL: Error updating trailing stop for {symbol}: {e}")
-                        return False
-            
-            return False
+            return {
+                'symbol': symbol,
+                'order_side': order_side,
+                'new_stop': new_stop,
+                'quantity': quantity,
+                'trail_type': trail_type,
+                'trail_distance_pct': trail_distance_pct,
+                'current_price': current_price,
+                'profit_percent': profit_percent,
+            }
             
         except Exception as e:
-            print(f"Error in update_dynamic_trailing_stop for {symbol}: {e}")
-            return False
+            self.log.info(f"Error in update_dynamic_trailing_stop for {symbol}: {e}")
+            return None
     
-    def _create_stop_loss_order(self, symbol: str, side: str, stop_price: float, 
-                                quantity: float, price_precision: int, trail_type: str) -> bool:
-        """Helper to create a new stop loss order"""
-        try:
-            if side == 'LONG':
-                order_side = 'SELL'
-            else:
-                order_side = 'BUY'
-            
-            order = self.client.futures_create_order(
-                symbol=symbol,
-                side=order_side,
-                type='STOP_MARKET',
-                stopPrice=round(stop_price, price_precision),
-                quantity=quantity,
-                timeInForce='GTC'
-            )
-            
-            order_id = str(order['orderId'])
-            self.stop_loss_orders[symbol] = order_id
-            
-            if symbol in self.open_positions:
-                self.open_positions[symbol]['current_stop_loss_price'] = stop_price
-                self.open_positions[symbol]['trail_type'] = trail_type
-                self.open_positions[symbol]['is_trailing'] = True
-                self.open_positions[symbol]['trail_started_at'] = datetime.now(timezone.utc).isoformat()
+    def apply_trailing_stops(self, plans: List[Dict]) -> List[str]:
+        """
+        Move the stops planned by plan_trailing_stop
+        All new stops go out through batchOrders first; a symbol's old stop is cancelled
+        only once its replacement is confirmed, so a failed update leaves the old stop in place
+        Returns the symbols whose stop was moved
+        """
+        if not plans:
+            return []
+        
+        # Replaced stops that failed to cancel last time get another try first
+        for symbol in list(self.stale_stop_orders):
+            self._cancel_replaced_stops(symbol)
+        
+        orders = [
+            {
+                'symbol': plan['symbol'],
+                'side': plan['order_side'],
+                'type': 'STOP_MARKET',
+                'stopPrice': plan['new_stop'],
+                'quantity': plan['quantity'],
+                'reduceOnly': 'true',  # Old and new stop are briefly both live - neither may open a position
+                'timeInForce': 'GTC'
+            }
+            for plan in plans
+        ]
+        responses = self._place_orders_batch(orders)
+        
+        updated = []
+        for plan, response in zip(plans, responses):
+            symbol = plan['symbol']
+            old_order_id = self.stop_loss_orders.get(symbol)
+            new_order_id = response.get('orderId')
+            if new_order_id is None:
+                # Rejected or outcome unknown - the new stop may still have reached the exchange
+                new_order_id = self._find_open_stop(symbol, plan['new_stop'], old_order_id)
+                if new_order_id is None:
+                    self.log.info(f"   ❌ Failed to update trailing stop for {symbol}, previous stop kept: {response.get('msg', response)}")
+                    continue
             
-            return True
+            # Binance has no modify for futures stops - drop the old one now the new one is live
+            self.stop_loss_orders[symbol] = str(new_order_id)
+            if old_order_id and str(old_order_id) != str(new_order_id):
+                self.stale_stop_orders.setdefault(symbol, []).append(old_order_id)
+                self._cancel_replaced_stops(symbol)
+            
+            # Update tracking
+            tracked_position = self.open_positions.get(symbol)
+            if tracked_position is not None:
+                tracked_position['current_stop_loss_price'] = plan['new_stop']
+                tracked_position['trail_type'] = plan['trail_type']
+                
+                if not tracked_position.get('is_trailing', False):
+                    tracked_position['is_trailing'] = True
+                    tracked_position['trail_started_at'] = datetime.now(timezone.utc).isoformat()
+                    self.log.info(f"   🎯 Trailing stop ACTIVATED for {symbol} @ {plan['profit_percent']:.2f}% profit")
             
+            self.log.info(f"   📈 Trailing stop UPDATED for {symbol}: ${plan['new_stop']:,.2f} ({plan['trail_type']}, {plan['trail_distance_pct']:.1f}% from ${plan['current_price']:,.2f})")
+            updated.append(symbol)
+        
+        return updated
+    
+    def _cancel_replaced_stops(self, symbol: str):
+        """Cancel symbol's replaced stop orders; ones that fail stay queued for the next attempt"""
+        remaining = []
+        for order_id in self.stale_stop_orders.pop(symbol, ()):
+            try:
+                self.client.futures_cancel_order(symbol=symbol, orderId=order_id)
+            except BinanceAPIException as e:
+                if e.code == -2011:
+                    continue  # Unknown order - already filled or canceled
+                self.log.info(f"   ⚠️ Could not cancel replaced stop {order_id} for {symbol}, will retry: {e}")
+                remaining.append(order_id)
+            except Exception as e:
+                self.log.info(f"   ⚠️ Could not cancel replaced stop {order_id} for {symbol}, will retry: {e}")
+                remaining.append(order_id)
+        if remaining:
+            self.stale_stop_orders[symbol] = remaining
+    
+    def _find_open_stop(self, symbol: str, stop_price: float, exclude_order_id) -> Optional[str]:
+        """orderId of an open STOP_MARKET for symbol at stop_price (other than exclude_order_id), or None"""
+        try:
+            open_orders = self.client.futures_get_open_orders(symbol=symbol)
         except Exception as e:
-            print(f"Error creating stop loss order for {symbol}: {e}")
-            return False
+            self.log.info(f"   ⚠️ Could not check open orders for {symbol}: {e}")
+            return None
+        for order in open_orders:
+            if (order.get('type') == 'STOP_MARKET'
+                    and str(order.get('orderId')) != str(exclude_order_id)
+                    and float(order.get('stopPrice', 0)) == stop_price):
+                return str(order['orderId'])
+        return None
     
-    def check_tp_hits_and_convert_tp3(self):
+    def check_tp_hits_and_convert_tp3(self, positions: Optional[List[Dict]] = None):
         """
         Check if TP2 has been hit, and if so, convert TP3 to trailing stop
         This runs periodically to monitor TP execution
+        positions: the cycle's open positions if already fetched
         """
         try:
-            positions = self.get_open_positions()
+            if positions is None:
+                positions = self.get_open_positions()
             
             for pos in positions:
                 symbol = pos['symbol']
@@ -1090,12 +1225,12 @@ class Executor:
                 if profit_percent >= 12.0 and symbol in self.open_positions:
                     if not self.open_positions[symbol].get('tp2_hit', False):
                         # TP2 hit! Convert TP3 to trailing stop
-                        print(f"   🎉 TP2 hit for {symbol}! Converting TP3 to trailing stop...")
+                        self.log.info(f"   🎉 TP2 hit for {symbol}! Converting TP3 to trailing stop...")
                         self.open_positions[symbol]['tp2_hit'] = True
                         self._convert_tp3_to_trailing_stop(symbol, pos)
                         
         except Exception as e:
-            print(f"Error checking TP hits: {e}")
+            self.log.info(f"Error checking TP hits: {e}")
     
     def _convert_tp3_to_trailing_stop(self, symbol: str, position: Dict):
         """
@@ -1109,22 +1244,22 @@ class Executor:
                 tp3_order_id = tp_orders[2]  # Third TP order
                 try:
                     self.client.futures_cancel_order(symbol=symbol, orderId=tp3_order_id)
-                    print(f"   ✅ Canceled TP3 order {tp3_order_id} for {symbol}")
+                    self.log.info(f"   ✅ Canceled TP3 order {tp3_order_id} for {symbol}")
                     
                     # Remove from tracking
                     if symbol in self.take_profit_orders:
                         self.take_profit_orders[symbol] = tp_orders[:2]  # Keep only TP1 and TP2
                 except Exception as e:
-                    print(f"   ⚠️ Could not cancel TP3 order: {e}")
+                    self.log.info(f"   ⚠️ Could not cancel TP3 order: {e}")
             
             # Set aggressive trailing flag for remaining 30% position
             if symbol in self.open_positions:
                 self.open_positions[symbol]['aggressive_trailing'] = True
                 self.open_positions[symbol]['trail_type'] = 'aggressive'
-                print(f"   🔄 TP3 converted to AGGRESSIVE trailing stop for {symbol} (1.5% distance, 30% remaining)")
+                self.log.info(f"   🔄 TP3 converted to AGGRESSIVE trailing stop for {symbol} (1.5% distance, 30% remaining)")
                 
         except Exception as e:
-            print(f"Error converting TP3 to trailing stop for {symbol}: {e}")
+            self.log.info(f"Error converting TP3 to trailing stop for {symbol}: {e}")
     
     def _manage_tp3_trailing_stop(self, position: Dict):
         """
@@ -1136,14 +1271,15 @@ class Executor:
         # when aggressive_trailing flag is True
         pass
 
-    def close_stale_positions(self):
+    def close_stale_positions(self, positions: Optional[List[Dict]] = None):
         """Close positions that haven't moved (flat PnL) for a while to free capital."""
         try:
-            positions = self.get_open_positions()
+            if positions is None:
+                positions = self.get_open_positions()
             if not positions:
                 return
             # Fetch recent account trades times as proxy for last activity
-            now = datetime.utcnow()
+            now_ms = time.time() * 1000  # Epoch ms, same clock as Binance trade times
             for pos in positions:
                 symbol = pos['symbol']
                 try:
@@ -1159,13 +1295,13 @@ class Executor:
 
                 minutes_since = 9999
                 if last_ms:
-                    minutes_since = max(0, int((now.timestamp()*1000 - last_ms) / 60000))
+                    minutes_since = max(0, int((now_ms - last_ms) / 60000))
 
                 if minutes_since >= STALE_POSITION_MINUTES and abs(pos.get('pnl_percent', 0)) <= (STALE_PNL_BAND):
-                    print(f"⏳ Closing stale position {symbol} (pnl {pos.get('pnl_percent', 0):+.2f}% for {minutes_since}m)")
+                    self.log.info(f"⏳ Closing stale position {symbol} (pnl {pos.get('pnl_percent', 0):+.2f}% for {minutes_since}m)")
                     self.close_position(symbol)
         except Exception as e:
-            print(f"Error closing stale positions: {e}")
+            self.log.info(f"Error closing stale positions: {e}")
     
     def _update_stop_to_breakeven(self, position: Dict):
         """Move stop loss to breakeven"""
@@ -1203,23 +1339,37 @@ class Executor:
             )
             
             self.stop_loss_orders[symbol] = str(order['orderId'])
-            print(f"   🔄 Trailing stop activated for {symbol} @ breakeven")
+            self.log.info(f"   🔄 Trailing stop activated for {symbol} @ breakeven")
             
         except Exception as e:
-            print(f"Error updating stop to breakeven for {symbol}: {e}")
+            self.log.info(f"Error updating stop to breakeven for {symbol}: {e}")
     
-    def close_all_positions(self):
-        """Close all open positions (emergency or end of competition)"""
-        print("🚨 Closing all open positions...")
+    def close_all_positions(self, timeout: float = CLOSE_ALL_TIMEOUT_SECONDS):
+        """
+        Close all open positions (emergency or end of competition)
+        Close orders are sent concurrently; returns after at most `timeout`
+        seconds so shutdown can still write the final report.
+        """
+        self.log.info("🚨 Closing all open positions...")
+        
+        symbols = list(dict.fromkeys(pos['symbol'] for pos in self.get_open_positions()))
+        if not symbols:
+            return
         
-        positions = self.get_open_positions()
+        pool = ThreadPoolExecutor(max_workers=min(len(symbols), CLOSE_ALL_WORKERS))
+        futures = {pool.submit(self.close_position, symbol): symbol for symbol in symbols}
+        done, pending = wait(futures, timeout=timeout)
+        pool.shutdown(wait=False, cancel_futures=True)
         
-        for pos in positions:
-            result = self.close_position(pos['symbol'])
+        for future in done:
+            symbol = futures[future]
+            result = future.result()
             if result['status'] == 'SUCCESS':
-                print(f"   ✅ Closed {pos['symbol']}")
+                self.log.info(f"   ✅ Closed {symbol}")
             else:
-                print(f"   ❌ Failed to close {pos['symbol']}: {result.get('message')}")
+                self.log.info(f"   ❌ Failed to close {symbol}: {result.get('message')}")
+        for future in pending:
+            self.log.info(f"   ⏱️ Close of {futures[future]} still pending after {timeout}s")
 
 
 # Global executor instance
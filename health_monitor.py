@@ -8,34 +8,40 @@ from typing import Dict, Optional
 from datetime import datetime, timedelta, timezone
 import requests
 from config import ALERT_WEBHOOK_URL
+from logger import get_console, get_logger
+
+# Main loop counts as stuck after 10 minutes without a successful cycle
+LOOP_STALL_NS = 600 * 1_000_000_000
 
 
 class HealthMonitor:
     """Monitors system health and implements self-healing mechanisms"""
     
     def __init__(self):
-        self.last_successful_cycle = datetime.now(timezone.utc)
+        # Monotonic timestamps (ns): no datetime allocation, immune to clock steps
+        self.last_successful_cycle_ns = time.monotonic_ns()
         self.error_count = 0
         self.consecutive_errors = 0
         self.api_health = {
             'binance': True,
             'openrouter': True
         }
-        self.last_health_check = datetime.now(timezone.utc)
+        self.last_health_check_ns = self.last_successful_cycle_ns
         self.recovery_attempts = 0
         self.max_recovery_attempts = 5
         self.critical_errors = []
+        self.log = get_console('trading_bot.health')
     
     def monitor_health(self) -> Dict[str, bool]:
         """
         Check overall system health
         Returns: Dictionary of health indicators
         """
-        current_time = datetime.now(timezone.utc)
+        now_ns = time.monotonic_ns()
         
         # Check if main loop is stuck
-        time_since_cycle = (current_time - self.last_successful_cycle).total_seconds()
-        loop_healthy = time_since_cycle < 600  # Should cycle at least every 10 minutes
+        since_cycle_ns = now_ns - self.last_successful_cycle_ns
+        loop_healthy = since_cycle_ns < LOOP_STALL_NS  # Should cycle at least every 10 minutes
         
         # Check error rate
         error_rate_healthy = self.consecutive_errors < 5
@@ -51,19 +57,22 @@ class HealthMonitor:
             'loop_running': loop_healthy,
             'error_rate_ok': error_rate_healthy,
             'apis_ok': apis_healthy,
-            'time_since_cycle': time_since_cycle,
+            'time_since_cycle': since_cycle_ns / 1e9,
             'consecutive_errors': self.consecutive_errors,
             'total_errors': self.error_count
         }
         
-        self.last_health_check = current_time
+        self.last_health_check_ns = now_ns
         
         return health_status
     
-    def handle_error(self, error: Exception, context: Dict = None):
+    def handle_error(self, error: Exception, context: Dict = None, tb: Optional[str] = None):
         """
         Handle an error with recovery logic
+        tb: the formatted traceback if the caller already has it
         """
+        if tb is None:
+            tb = traceback.format_exc()
         self.error_count += 1
         self.consecutive_errors += 1
         
@@ -72,13 +81,11 @@ class HealthMonitor:
             'message': str(error),
             'context': context or {},
             'timestamp': datetime.now(timezone.utc).isoformat(),
-            'traceback': traceback.format_exc()
+            'traceback': tb
         }
         
         # Log error
-        from logger import get_logger
-        logger = get_logger()
-        logger.log_error(error, context)
+        get_logger().log_error(error, context, tb)
         
         # Determine error severity
         if self._is_critical_error(error):
@@ -102,30 +109,30 @@ class HealthMonitor:
     
     def _handle_critical_error(self, error: Exception, context: Dict):
         """Handle critical errors"""
-        print(f"🚨 CRITICAL ERROR: {error}")
+        self.log.error(f"🚨 CRITICAL ERROR: {error}")
         self.send_critical_alert(f"Critical Error: {error}")
         
         # Don't attempt too many recoveries
         if self.recovery_attempts >= self.max_recovery_attempts:
-            print("⚠️ Max recovery attempts reached. Manual intervention may be required.")
+            self.log.error("⚠️ Max recovery attempts reached. Manual intervention may be required.")
             return
         
         self.recovery_attempts += 1
     
     def _handle_recoverable_error(self, error: Exception, context: Dict):
         """Handle recoverable errors"""
-        print(f"⚠️ Recoverable error: {error}")
+        self.log.warning(f"⚠️ Recoverable error: {error}")
         
         # Implement backoff strategy
         backoff_time = min(2 ** self.consecutive_errors, 60)  # Max 60 seconds
-        print(f"   Backing off for {backoff_time}s before retry...")
+        self.log.info(f"   Backing off for {backoff_time}s before retry...")
         time.sleep(backoff_time)
     
     def handle_api_failure(self, service: str, error: Exception):
         """
         Handle API failures with specific recovery logic
         """
-        print(f"📡 API failure detected: {service}")
+        self.log.warning(f"📡 API failure detected: {service}")
         
         self.api_health[service] = False
         
@@ -140,7 +147,7 @@ class HealthMonitor:
     
     def _recover_binance_connection(self):
         """Attempt to recover Binance connection"""
-        print("   Attempting to recover Binance connection...")
+        self.log.info("   Attempting to recover Binance connection...")
         
         try:
             from data_pipeline import DataPipeline
@@ -148,19 +155,19 @@ class HealthMonitor:
             
             if pipeline.test_connection():
                 self.api_health['binance'] = True
-                print("   ✅ Binance connection recovered")
+                self.log.info("   ✅ Binance connection recovered")
                 return True
             else:
-                print("   ❌ Binance connection recovery failed")
+                self.log.error("   ❌ Binance connection recovery failed")
                 return False
                 
         except Exception as e:
-            print(f"   ❌ Error recovering Binance connection: {e}")
+            self.log.error(f"   ❌ Error recovering Binance connection: {e}")
             return False
     
     def _recover_openrouter_connection(self):
         """Attempt to recover OpenRouter connection"""
-        print("   Attempting to recover OpenRouter connection...")
+        self.log.info("   Attempting to recover OpenRouter connection...")
         
         try:
             # Simple test query
@@ -171,11 +178,11 @@ class HealthMonitor:
             test_decision = agent._hold_decision("Connection test")
             if test_decision:
                 self.api_health['openrouter'] = True
-                print("   ✅ OpenRouter connection recovered")
+                self.log.info("   ✅ OpenRouter connection recovered")
                 return True
             
         except Exception as e:
-            print(f"   ❌ Error recovering OpenRouter connection: {e}")
+            self.log.error(f"   ❌ Error recovering OpenRouter connection: {e}")
             return False
     
     def validate_data_integrity(self, data: Dict) -> bool:
@@ -193,7 +200,7 @@ class HealthMonitor:
         if 'symbol' in data:
             required_fields = ['price', 'indicators', 'regime']
             if not all(field in data for field in required_fields):
-                print(f"⚠️ Incomplete market data for {data.get('symbol')}")
+                self.log.warning(f"⚠️ Incomplete market data for {data.get('symbol')}")
                 return False
         
         # Check for NaN or invalid values
@@ -201,14 +208,14 @@ class HealthMonitor:
             indicators = data['indicators']
             for key, value in indicators.items():
                 if value is None or (isinstance(value, float) and (value != value)):  # NaN check
-                    print(f"⚠️ Invalid indicator value: {key} = {value}")
+                    self.log.warning(f"⚠️ Invalid indicator value: {key} = {value}")
                     return False
         
         return True
     
     def record_successful_cycle(self):
         """Record that a trading cycle completed successfully"""
-        self.last_successful_cycle = datetime.now(timezone.utc)
+        self.last_successful_cycle_ns = time.monotonic_ns()
         self.consecutive_errors = 0
         self.recovery_attempts = 0
     
@@ -220,21 +227,21 @@ class HealthMonitor:
         health = self.monitor_health()
         
         if not health['overall']:
-            print("⚠️ Health check failed, attempting recovery...")
+            self.log.warning("⚠️ Health check failed, attempting recovery...")
             
             # Try auto-healing
             if self._attempt_auto_heal():
-                print("✅ Auto-healing successful")
+                self.log.info("✅ Auto-healing successful")
                 return False  # Don't need to restart
             else:
-                print("❌ Auto-healing failed, restart may be needed")
+                self.log.error("❌ Auto-healing failed, restart may be needed")
                 return True  # Signal that restart is needed
         
         return False
     
     def _attempt_auto_heal(self) -> bool:
         """Attempt automatic healing of known issues"""
-        print("🔧 Attempting auto-heal...")
+        self.log.info("🔧 Attempting auto-heal...")
         
         # Check and fix API connections
         for service, healthy in self.api_health.items():
@@ -249,7 +256,7 @@ class HealthMonitor:
                         continue
                     else:
                         # OpenRouter down is not fatal - we have fallback
-                        print("   ℹ️ OpenRouter unavailable, will use fallback logic")
+                        self.log.warning("   ℹ️ OpenRouter unavailable, will use fallback logic")
         
         # Clear error counters if we made it this far
         self.consecutive_errors = 0
@@ -274,12 +281,12 @@ class HealthMonitor:
             )
             
             if response.status_code == 200:
-                print(f"   📤 Alert sent: {message}")
+                self.log.info(f"   📤 Alert sent: {message}")
             else:
-                print(f"   ⚠️ Failed to send alert: {response.status_code}")
+                self.log.warning(f"   ⚠️ Failed to send alert: {response.status_code}")
                 
         except Exception as e:
-            print(f"   ⚠️ Error sending alert: {e}")
+            self.log.warning(f"   ⚠️ Error sending alert: {e}")
     
     def get_health_summary(self) -> Dict:
         """Get comprehensive health summary"""
@@ -287,7 +294,7 @@ class HealthMonitor:
         
         return {
             'status': 'HEALTHY' if health['overall'] else 'UNHEALTHY',
-            'uptime_seconds': (datetime.now(timezone.utc) - self.last_successful_cycle).total_seconds(),
+            'uptime_seconds': (time.monotonic_ns() - self.last_successful_cycle_ns) / 1e9,
             'total_errors': self.error_count,
             'consecutive_errors': self.consecutive_errors,
             'critical_errors': len(self.critical_errors),
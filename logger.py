@@ -2,19 +2,60 @@
 Logging & Monitoring Module
 Handles all logging, performance tracking, and report generation
 """
+import itertools
 import json
+import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime, timezone
 from typing import Dict, List, Any
+import orjson
 import pandas as pd
 import numpy as np
 from config import (
     LOG_DIR, DECISION_LOG_FILE, TRADE_LOG_FILE,
     PERFORMANCE_LOG_FILE, ERROR_LOG_FILE, INITIAL_CAPITAL,
-    ASSESSMENT_LOG_FILE
+    ASSESSMENT_LOG_FILE, CONSOLE_LOG_FILE, CONSOLE_LOG_LEVEL, CONSOLE_REPEAT_WINDOW_SECONDS
 )
 
 
+# Decisions are only kept in memory for inspection; the full history lives in DECISION_LOG_FILE
+DECISION_HISTORY_LIMIT = 500
+
+# Pending log records waiting for the background writer
+LOG_QUEUE_SIZE = 10000
+
+# orjson options for JSONL records: newline-terminated, numpy values and
+# non-string keys serialized like json.dumps would
+_ORJSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _serialize(log_entry: Dict) -> bytes:
+    """One JSONL line for log_entry"""
+    try:
+        return orjson.dumps(log_entry, option=_ORJSON_OPTIONS)
+    except TypeError:
+        # Types orjson rejects (e.g. pandas objects) - fall back to their str()
+        return (json.dumps(log_entry, default=str) + '\n').encode()
+
+
+def loads_jsonl_line(line: bytes):
+    """Parse one JSONL record; None if it isn't valid JSON"""
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError:
+        # Older records may carry NaN/Infinity, which only json accepts
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+
 class BotLogger:
     """Centralized logging system for the trading bot"""
     
@@ -22,12 +63,74 @@ class BotLogger:
         self.start_time = datetime.now(timezone.utc)
         self.initial_capital = INITIAL_CAPITAL
         self.trades = []
-        self.decisions = []
+        self.decisions = deque(maxlen=DECISION_HISTORY_LIMIT)
         self.performance_snapshots = []
         
+        # Bumped on every trade / snapshot; calculate_metrics caches the trade-derived
+        # and snapshot-derived parts separately, each keyed by its own version
+        self._trade_versions = itertools.count(1)
+        self._trade_version = 0
+        self._trade_metrics_cache = None  # (trade version, trade metrics)
+        self._snapshot_versions = itertools.count(1)
+        self._snapshot_version = 0
+        self._snapshot_metrics_cache = None  # (snapshot version, snapshot metrics)
+        
         # Ensure log directory exists
         os.makedirs(log_dir, exist_ok=True)
         self.log_dir = log_dir
+        
+        # JSONL records are written by a background thread so disk latency
+        # never delays the trading loop
+        self._write_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._writer = threading.Thread(target=self._write_worker, name='log-writer', daemon=True)
+        self._writer.start()
+    
+    def _write(self, path: str, log_entry: Dict):
+        """Queue a record for the background writer (drops the oldest record if full)"""
+        if not self._writer.is_alive():
+            # Writer already stopped (shutdown) - write synchronously
+            with open(path, 'ab') as f:
+                f.write(_serialize(log_entry))
+            return
+        
+        try:
+            self._write_queue.put_nowait((path, log_entry))
+        except queue.Full:
+            try:
+                self._write_queue.get_nowait()
+                self._write_queue.task_done()
+            except queue.Empty:
+                pass
+            try:
+                self._write_queue.put_nowait((path, log_entry))
+            except queue.Full:
+                pass
+    
+    def _write_worker(self):
+        """Drain the write queue, keeping log files open between records"""
+        files = {}
+        try:
+            while True:
+                item = self._write_queue.get()
+                try:
+                    if item is None:
+                        break
+                    path, log_entry = item
+                    f = files.get(path)
+                    if f is None:
+                        f = files[path] = open(path, 'ab')
+                    f.write(_serialize(log_entry))
+                    # Flush once the burst is written so readers (web UI) see it
+                    if self._write_queue.empty():
+                        for handle in files.values():
+                            handle.flush()
+                except Exception as e:
+                    print(f"⚠️  Log writer error: {e}")
+                finally:
+                    self._write_queue.task_done()
+        finally:
+            for handle in files.values():
+                handle.close()
     
     def log_decision(self, decision: Dict, market_data: Dict, execution_result: Dict = None):
         """Log a trading decision"""
@@ -50,9 +153,8 @@ class BotLogger:
         
         self.decisions.append(log_entry)
         
-        # Append to file
-        with open(DECISION_LOG_FILE, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        # Queue for the background writer
+        self._write(DECISION_LOG_FILE, log_entry)
     
     def log_trade(self, trade_details: Dict, strategy: str = None, regime: str = None, confidence: float = None):
         """Log a trade execution with optional strategy/regime for performance tracking"""
@@ -76,10 +178,10 @@ class BotLogger:
         }
         
         self.trades.append(log_entry)
+        self._trade_version = next(self._trade_versions)
         
-        # Append to file
-        with open(TRADE_LOG_FILE, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        # Queue for the background writer
+        self._write(TRADE_LOG_FILE, log_entry)
     
     def log_performance_snapshot(self, portfolio: Dict):
         """Log current portfolio performance"""
@@ -94,28 +196,30 @@ class BotLogger:
         }
         
         self.performance_snapshots.append(log_entry)
+        self._snapshot_version = next(self._snapshot_versions)
         
-        # Append to file
-        with open(PERFORMANCE_LOG_FILE, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        # Queue for the background writer
+        self._write(PERFORMANCE_LOG_FILE, log_entry)
     
-    def log_error(self, error: Exception, context: Dict = None):
-        """Log an error with context"""
+    def log_error(self, error: Exception, context: Dict = None, tb: str = None):
+        """Log an error with context (and its traceback, kept in the error log only)"""
         log_entry = {
             'timestamp': datetime.now(timezone.utc).isoformat(),
             'error_type': type(error).__name__,
             'error_message': str(error),
             'context': context or {}
         }
+        if tb:
+            log_entry['traceback'] = tb
         
-        # Append to file
-        with open(ERROR_LOG_FILE, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        # Queue for the background writer
+        self._write(ERROR_LOG_FILE, log_entry)
         
-        # Also print to console for visibility
-        print(f"❌ ERROR [{log_entry['timestamp']}]: {error}")
+        # Also show on the console for visibility
+        log = get_console('trading_bot.logger')
+        log.error(f"❌ ERROR [{log_entry['timestamp']}]: {error}")
         if context:
-            print(f"   Context: {context}")
+            log.error(f"   Context: {context}")
 
     def log_assessment(self, assessment: Dict):
         """Log detailed market assessment/thoughts for an asset and cycle."""
@@ -123,13 +227,19 @@ class BotLogger:
             'timestamp': datetime.now(timezone.utc).isoformat(),
             **assessment,
         }
-        # Append to file
-        with open(ASSESSMENT_LOG_FILE, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        # Queue for the background writer
+        self._write(ASSESSMENT_LOG_FILE, log_entry)
     
     def calculate_metrics(self) -> Dict:
-        """Calculate performance metrics"""
-        if not self.trades:
+        """Calculate performance metrics (trade stats cached until the next trade)"""
+        version = self._trade_version
+        cached = self._trade_metrics_cache
+        if cached is None or cached[0] != version:
+            cached = (version, self._compute_trade_metrics())
+            self._trade_metrics_cache = cached
+        trade_metrics = cached[1]
+        
+        if trade_metrics is None:
             return {
                 'total_trades': 0,
                 'win_rate': 0,
@@ -141,6 +251,28 @@ class BotLogger:
                 'total_return': 0
             }
         
+        sharpe_ratio, max_drawdown, total_return = self._snapshot_metrics()
+        if trade_metrics['completed']:
+            sharpe_ratio = round(sharpe_ratio, 2)
+            max_drawdown = round(max_drawdown, 2)
+            total_return = round(total_return, 2)
+        
+        return {
+            'total_trades': trade_metrics['total_trades'],
+            'win_rate': trade_metrics['win_rate'],
+            'avg_win': trade_metrics['avg_win'],
+            'avg_loss': trade_metrics['avg_loss'],
+            'profit_factor': trade_metrics['profit_factor'],
+            'sharpe_ratio': sharpe_ratio,
+            'max_drawdown': max_drawdown,
+            'total_return': total_return
+        }
+    
+    def _compute_trade_metrics(self) -> Dict:
+        """Calculate trade statistics from the trade history (None when there are no trades)"""
+        if not self.trades:
+            return None
+        
         trades_df = pd.DataFrame(self.trades)
         
         # Filter completed trades with PnL
@@ -149,17 +281,12 @@ class BotLogger:
         if len(completed_trades) == 0:
             # Ensure full metrics schema even when no completed trades yet
             return {
+                'completed': False,
                 'total_trades': len(trades_df),
                 'win_rate': 0,
                 'avg_win': 0,
                 'avg_loss': 0,
-                'profit_factor': 0,
-                'sharpe_ratio': self._calculate_sharpe_ratio(),
-                'max_drawdown': self._calculate_max_drawdown(),
-                'total_return': (
-                    ((self.performance_snapshots[-1]['portfolio_value'] - INITIAL_CAPITAL) / INITIAL_CAPITAL) * 100
-                    if self.performance_snapshots else 0
-                )
+                'profit_factor': 0
             }
         
         # Calculate metrics
@@ -174,6 +301,22 @@ class BotLogger:
         total_losses = abs(losing_trades['pnl'].sum()) if len(losing_trades) > 0 else 1
         profit_factor = total_wins / total_losses if total_losses > 0 else 0
         
+        return {
+            'completed': True,
+            'total_trades': len(completed_trades),
+            'win_rate': round(win_rate, 2),
+            'avg_win': round(avg_win, 2),
+            'avg_loss': round(avg_loss, 2),
+            'profit_factor': round(profit_factor, 2)
+        }
+    
+    def _snapshot_metrics(self) -> tuple:
+        """Sharpe ratio, max drawdown and total return (cached until the next snapshot)"""
+        version = self._snapshot_version
+        cached = self._snapshot_metrics_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
         # Calculate Sharpe ratio from performance snapshots
         sharpe_ratio = self._calculate_sharpe_ratio()
         
@@ -187,16 +330,9 @@ class BotLogger:
         else:
             total_return = 0
         
-        return {
-            'total_trades': len(completed_trades),
-            'win_rate': round(win_rate, 2),
-            'avg_win': round(avg_win, 2),
-            'avg_loss': round(avg_loss, 2),
-            'profit_factor': round(profit_factor, 2),
-            'sharpe_ratio': round(sharpe_ratio, 2),
-            'max_drawdown': round(max_drawdown, 2),
-            'total_return': round(total_return, 2)
-        }
+        metrics = (sharpe_ratio, max_drawdown, total_return)
+        self._snapshot_metrics_cache = (version, metrics)
+        return metrics
     
     def _calculate_sharpe_ratio(self) -> float:
         """Calculate Sharpe ratio from returns"""
@@ -326,7 +462,11 @@ class BotLogger:
         print(f"ℹ️  [{timestamp}] {message}")
 
     def close(self):
-        pass
+        """Flush pending log records and stop the background writer"""
+        if self._writer.is_alive():
+            self._write_queue.join()
+            self._write_queue.put(None)
+            self._writer.join(timeout=5)
 
     def get_realized_pnl(self):
         """Sum realized PnL across all closed trades (where 'pnl' is present)."""
@@ -335,6 +475,110 @@ class BotLogger:
         return sum([t['pnl'] for t in self.trades if t.get('pnl') is not None])
 
 
+# Console output: records are queued by the trading thread and written to
+# stdout + CONSOLE_LOG_FILE by a QueueListener thread
+_console_listener = None
+_console_queue_handler = None  # Feeds _console_listener from the 'trading_bot' logger
+_console_direct_handler = None  # Writes straight to stdout after stop_console
+
+class _DeferredFlush:
+    """Handler mixin: emit() no longer flushes after every record"""
+    def flush(self):
+        pass
+    
+    def flush_stream(self):
+        logging.StreamHandler.flush(self)
+
+class _BufferedStreamHandler(_DeferredFlush, logging.StreamHandler):
+    pass
+
+class _BufferedFileHandler(_DeferredFlush, logging.FileHandler):
+    pass
+
+class _ConsoleListener(logging.handlers.QueueListener):
+    """Writes a burst of records, then flushes once when the queue runs dry"""
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush_stream()
+
+class _RepeatFilter(logging.Filter):
+    """Drops a record whose message was already let through within the last `window` seconds"""
+    def __init__(self, window: float):
+        super().__init__()
+        self.window = window
+        self._last_seen = {}  # message -> monotonic time it was last let through
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_seen.get(message)
+            if last is not None and now - last < self.window:
+                return False
+            if len(self._last_seen) > 1000:
+                self._last_seen.clear()
+            self._last_seen[message] = now
+        return True
+
+def get_console(name: str = 'trading_bot', suppress_repeats: bool = False) -> logging.Logger:
+    """
+    Get a console logger whose output is written off the trading thread
+    suppress_repeats: show identical messages from this logger once per CONSOLE_REPEAT_WINDOW_SECONDS
+    (for per-symbol errors and warnings that would otherwise repeat every cycle)
+    """
+    global _console_listener, _console_queue_handler, _console_direct_handler
+    if _console_listener is None:
+        root = logging.getLogger('trading_bot')
+        if _console_direct_handler is not None:
+            root.removeHandler(_console_direct_handler)
+            _console_direct_handler = None
+        log_queue = queue.Queue(-1)
+        
+        stream_handler = _BufferedStreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter('%(message)s'))
+        file_handler = _BufferedFileHandler(CONSOLE_LOG_FILE, encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        
+        _console_listener = _ConsoleListener(
+            log_queue, stream_handler, file_handler, respect_handler_level=True
+        )
+        _console_listener.start()
+        
+        _console_queue_handler = logging.handlers.QueueHandler(log_queue)
+        root.addHandler(_console_queue_handler)
+        root.setLevel(CONSOLE_LOG_LEVEL)
+        root.propagate = False
+    log = logging.getLogger(name)
+    if suppress_repeats and CONSOLE_REPEAT_WINDOW_SECONDS > 0 and not any(
+        isinstance(f, _RepeatFilter) for f in log.filters
+    ):
+        log.addFilter(_RepeatFilter(CONSOLE_REPEAT_WINDOW_SECONDS))
+    return log
+
+def stop_console():
+    """
+    Flush queued console output and stop the listener thread
+    Anything logged afterwards (e.g. close workers outliving a shutdown timeout)
+    is written to stdout directly instead of into a queue nobody drains
+    """
+    global _console_listener, _console_queue_handler, _console_direct_handler
+    if _console_listener is not None:
+        root = logging.getLogger('trading_bot')
+        root.removeHandler(_console_queue_handler)
+        _console_queue_handler = None
+        _console_direct_handler = logging.StreamHandler(sys.stdout)
+        _console_direct_handler.setFormatter(logging.Formatter('%(message)s'))
+        root.addHandler(_console_direct_handler)
+        
+        _console_listener.stop()
+        for handler in _console_listener.handlers:
+            handler.flush_stream()
+        _console_listener = None
+
+
 # Global logger instance
 _logger_instance = None
 
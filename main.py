@@ -2,58 +2,153 @@
 Main Trading Bot Orchestrator - FIXED VERSION
 Uses actual Binance balance and proper competition date checking
 """
+import gc
+import logging
 import sys
 import time
 import signal
 import atexit
+import threading
+import traceback
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
-from typing import Dict
+from operator import itemgetter
+from typing import Dict, NamedTuple, Optional
 
 from config import (
     validate_config, COMPETITION_START_DATE, COMPETITION_DURATION_DAYS,
     CHECK_INTERVAL_SECONDS, TRADING_ASSETS, get_binance_balance, MIN_CONFIDENCE,
-    INITIAL_CAPITAL, MAX_OPEN_POSITIONS, MAX_POSITIONS_PER_SYMBOL
+    MIN_CONFIDENCE_VOLATILE, SCALP_STOP_LOSS, SCALP_TAKE_PROFIT,
+    INITIAL_CAPITAL, MAX_OPEN_POSITIONS, MAX_POSITIONS_PER_SYMBOL,
+    FORCE_INITIAL_TRADE, INITIAL_TRADE_SYMBOL, INITIAL_TRADE_SIDE,
+    INITIAL_TRADE_SIZE_PCT, INITIAL_TRADE_LEVERAGE, TRAILING_TICK_PCT,
+    STOP_REFRESH_MAX_SECONDS, ENABLE_MARKET_STREAM
 )
 from data_pipeline import DataPipeline
 from market_analyzer import get_analyzer
 from deepseek_agent import get_deepseek_agent
 from risk_manager import get_risk_manager
 from executor import get_executor
-from logger import get_logger
+from logger import get_logger, get_console, stop_console
+from market_stream import get_market_stream
 from health_monitor import get_health_monitor
 from time_filters import get_trading_period, get_entry_hour_utc, format_trading_period_summary
 
 
+# Strategy names with performance tracking / cooldowns
+STRATEGIES = ('TREND_FOLLOWING', 'BREAKOUT', 'MOMENTUM', 'REVERSAL', 'VOLATILITY_BREAKOUT', 'EMA_CROSSOVER')
+
+# Map common strategy name variations to STRATEGY_LEVERAGE keys
+_STRATEGY_MAP = MappingProxyType({
+    'trend_following': 'TREND_FOLLOWING',
+    'TREND_FOLLOWING_ENHANCED': 'TREND_FOLLOWING',
+    'momentum': 'MOMENTUM',
+    'MOMENTUM_ENHANCED': 'MOMENTUM',
+    'breakout': 'BREAKOUT',
+    'BREAKOUT_ENHANCED': 'BREAKOUT',
+    'mean_reversion': 'REVERSAL',
+    'MEAN_REVERSION': 'REVERSAL',
+    'reversal': 'REVERSAL',
+    'volatility_breakout': 'VOLATILITY_BREAKOUT',
+    'VOLATILITY_BREAKOUT': 'VOLATILITY_BREAKOUT',
+    'ema_crossover': 'EMA_CROSSOVER',
+    'EMA_CROSSOVER': 'EMA_CROSSOVER'
+})
+
+# Status summary field formatters (bound once instead of re-parsing specs every cycle)
+_RULE = '=' * 70
+_FMT_MONEY = "${:>15,.2f}".format
+_FMT_PCT = "{:>14.2f}%".format
+_FMT_INT = "{:>15d}".format
+_FMT_RATIO = "{:>15.2f}".format
+
+
+class _StepLog:
+    """Collects one asset's log lines and emits them as a single console record"""
+    __slots__ = ('_log', '_lines', '_debug')
+    
+    def __init__(self, log: logging.Logger):
+        self._log = log
+        self._lines = []
+        self._debug = log.isEnabledFor(logging.DEBUG)
+    
+    def isEnabledFor(self, level: int) -> bool:
+        return self._log.isEnabledFor(level)
+    
+    def info(self, msg: str):
+        self._lines.append(msg)
+    
+    def debug(self, msg: str, *args):
+        if self._debug:
+            self._lines.append(msg % args if args else msg)
+    
+    def flush(self):
+        """Emit the collected lines (if any) as one INFO record"""
+        if self._lines:
+            self._log.info("\n".join(self._lines))
+            self._lines.clear()
+
+
+class PosView(NamedTuple):
+    """One asset's view of the portfolio positions, computed once per call"""
+    on_asset: tuple
+    worst_on_asset: Optional[Dict]
+    count_on_asset: int
+    total_count: int
+
+
 class TradingBot:
     """Main trading bot orchestrator with enhanced signals"""
     
+    # Fixed attribute layout: the per-asset hot path reads these on every call
+    __slots__ = (
+        'log', 'initial_capital', 'data_pipeline', 'analyzer', 'deepseek_agent',
+        'executor', 'health_monitor', 'risk_manager', 'logger',
+        'start_time', 'competition_start', 'competition_end',
+        '_competition_start_mono', '_competition_end_mono', '_competition_day',
+        'running', 'cycle_count', '_forced_trade_done', '_shutdown_started',
+        '_stop_event', '_wake_event', '_pool', '_trade_lock',
+        '_last_prices', '_last_stop_update_ts', '_last_stale_check_ts',
+    )
+    
     def __init__(self):
-        print("=" * 70)
-        print("🤖 ENHANCED AUTONOMOUS AI TRADING BOT - INITIALIZING")
-        print("=" * 70)
+        self.log = get_console()
+        self.log.info("=" * 70)
+        self.log.info("🤖 ENHANCED AUTONOMOUS AI TRADING BOT - INITIALIZING")
+        self.log.info("=" * 70)
         
         # Validate configuration
         try:
             validate_config()
-            print("✅ Configuration validated")
+            self.log.info("✅ Configuration validated")
         except ValueError as e:
-            print(f"❌ Configuration error: {e}")
+            self.log.info(f"❌ Configuration error: {e}")
             sys.exit(1)
         
-        # FIXED: Get actual balance from Binance instead of using hardcoded value
-        self.initial_capital = get_binance_balance()
-        print(f"💰 Fetched Balance from Binance: ${self.initial_capital:,.2f}")
-        
-        # Initialize modules
-        self.data_pipeline = DataPipeline()
-        self.analyzer = get_analyzer()
-        self.deepseek_agent = get_deepseek_agent()
-        
-        # FIXED: Pass actual balance to risk manager
-        self.risk_manager = get_risk_manager(initial_capital=self.initial_capital)
-        self.executor = get_executor()
-        self.logger = get_logger(initial_capital=self.initial_capital)
-        self.health_monitor = get_health_monitor()
+        # Initialize modules concurrently in two waves:
+        # 1) everything independent, including the Binance balance fetch
+        # 2) modules that need the actual balance
+        with ThreadPoolExecutor(max_workers=6, thread_name_prefix='init') as pool:
+            wave_1 = {
+                'initial_capital': pool.submit(get_binance_balance),  # FIXED: actual balance, not hardcoded
+                'data_pipeline': pool.submit(DataPipeline),
+                'analyzer': pool.submit(get_analyzer),
+                'deepseek_agent': pool.submit(get_deepseek_agent),
+                'executor': pool.submit(get_executor),
+                'health_monitor': pool.submit(get_health_monitor),
+            }
+            for name, future in wave_1.items():
+                setattr(self, name, future.result())
+            self.log.info(f"💰 Fetched Balance from Binance: ${self.initial_capital:,.2f}")
+            
+            # FIXED: Pass actual balance to risk manager
+            wave_2 = {
+                'risk_manager': pool.submit(get_risk_manager, initial_capital=self.initial_capital),
+                'logger': pool.submit(get_logger, initial_capital=self.initial_capital),
+            }
+            for name, future in wave_2.items():
+                setattr(self, name, future.result())
         
         # Telegram bot integration removed
         
@@ -65,59 +160,101 @@ class TradingBot:
         # FIXED: Calculate days elapsed properly
         days_elapsed = (self.start_time - self.competition_start).total_seconds() / 86400
         
+        # Monotonic anchors for the per-cycle day/end checks (no datetime allocation,
+        # immune to wall-clock adjustments)
+        self._competition_start_mono = time.monotonic() - days_elapsed * 86400
+        self._competition_end_mono = self._competition_start_mono + COMPETITION_DURATION_DAYS * 86400
+        self._competition_day = (float('-inf'), 1)  # (valid until, day) - recomputed at day boundaries
+        
         # State
         self.running = True
         self.cycle_count = 0
-        
-        print(f"📅 Competition: Day {days_elapsed:.3f} of {COMPETITION_DURATION_DAYS}")
-        print(f"💰 Initial Capital: ${self.initial_capital:,.2f}")
-        print(f"📊 Trading Assets: {', '.join(TRADING_ASSETS)}")
-        print(f"⏱️  Check Interval: {CHECK_INTERVAL_SECONDS}s")
-        print(f"🎯 Enhanced Signals: Multi-confirmation + Smart Exits")
-        print("=" * 70)
+        self._forced_trade_done = False
+        self._shutdown_started = False
+        self._stop_event = threading.Event()  # Set on shutdown to cut any wait short
+        self._wake_event = threading.Event()  # Set on a candle close (or stop) to start the next cycle early
+        
+        # Stop maintenance only runs when marks moved or the refresh is overdue
+        self._last_prices = {}  # symbol -> mark price at the last trailing-stop update
+        self._last_stop_update_ts = float('-inf')
+        self._last_stale_check_ts = float('-inf')
+        
+        # Assets are analyzed concurrently; order placement is serialized so
+        # position limits are always checked against the latest portfolio
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(TRADING_ASSETS)), thread_name_prefix='asset')
+        self._trade_lock = threading.Lock()
+        
+        # Live tickers over WebSocket (DataPipeline falls back to REST without
+        # them); candle closes wake the main loop ahead of its fixed interval
+        if ENABLE_MARKET_STREAM:
+            get_market_stream().start(TRADING_ASSETS, on_bar_close=self._wake_event.set)
+        
+        self.log.info(f"📅 Competition: Day {days_elapsed:.3f} of {COMPETITION_DURATION_DAYS}")
+        self.log.info(f"💰 Initial Capital: ${self.initial_capital:,.2f}")
+        self.log.info(f"📊 Trading Assets: {', '.join(TRADING_ASSETS)}")
+        self.log.info(f"⏱️  Check Interval: {CHECK_INTERVAL_SECONDS}s")
+        self.log.info(f"🎯 Enhanced Signals: Multi-confirmation + Smart Exits")
+        self.log.info("=" * 70)
         
         # Register cleanup handlers
         atexit.register(self.cleanup)
-        signal.signal(signal.SIGINT, lambda s, f: self.shutdown())
-        signal.signal(signal.SIGTERM, lambda s, f: self.shutdown())
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGTERM, self._request_stop)
         
         # Test connections
         if not self._test_connections():
-            print("❌ Connection tests failed. Please check your API keys.")
+            self.log.info("❌ Connection tests failed. Please check your API keys.")
             sys.exit(1)
     
+    def _request_stop(self, signum, frame):
+        """Signal handler: ask the main loop to stop after the current step"""
+        self._stop_event.set()
+        self._wake_event.set()
+    
     def _test_connections(self) -> bool:
         """Test all external connections"""
-        print("\n🔌 Testing connections...")
+        self.log.info("\n🔌 Testing connections...")
         
         # Test Binance
         if not self.data_pipeline.test_connection():
             return False
         
-        print("✅ All connections successful\n")
+        self.log.info("✅ All connections successful\n")
         return True
     
     def run(self):
         """Main trading loop"""
-        print("🚀 STARTING ENHANCED AUTONOMOUS TRADING")
-        print("=" * 70)
-        print("⚠️  Bot will run continuously for 14 days")
-        print("⚠️  Do not interrupt unless absolutely necessary")
-        print("=" * 70)
-        print()
-        
+        self.log.info("🚀 STARTING ENHANCED AUTONOMOUS TRADING")
+        self.log.info("=" * 70)
+        self.log.info("⚠️  Bot will run continuously for 14 days")
+        self.log.info("⚠️  Do not interrupt unless absolutely necessary")
+        self.log.info("=" * 70)
+        self.log.info("")
+        
+        # Cycles run on a fixed schedule of deadlines CHECK_INTERVAL_SECONDS apart:
+        # the wait below only covers what is left until the next deadline
+        next_tick = time.monotonic()
+        missed_deadlines = 0
         while self.running:
+            cycle_start = time.monotonic()
             try:
+                # Stop requested by a signal - shut down from the loop, not the handler
+                if self._stop_event.is_set():
+                    self.log.info("\n🛑 Stop requested")
+                    self.shutdown()
+                    break
+                
                 # Check if competition has ended
                 if self._competition_ended():
-                    print("\n🏁 Competition period completed!")
+                    self.log.info("\n🏁 Competition period completed!")
                     self.shutdown()
                     break
                 
                 # Health check
                 if not self._health_check():
-                    print("⚠️ Health check failed, attempting recovery...")
-                    time.sleep(60)
+                    self.log.info("⚠️ Health check failed, attempting recovery...")
+                    self._stop_event.wait(max(0.0, cycle_start + 60 - time.monotonic()))
+                    next_tick = time.monotonic()
                     continue
                 
                 # Execute trading cycle
@@ -127,16 +264,26 @@ class TradingBot:
                 self.health_monitor.record_successful_cycle()
                 self.cycle_count += 1
                 
-                # Sleep until next cycle
-                time.sleep(CHECK_INTERVAL_SECONDS)
-                
-            except KeyboardInterrupt:
-                print("\n⚠️ Keyboard interrupt received")
-                self.shutdown()
-                break
+                # Sleep until the next cycle's deadline (returns early on a stop request)
+                next_tick += CHECK_INTERVAL_SECONDS
+                sleep_for = next_tick - time.monotonic()
+                if sleep_for > 0:
+                    missed_deadlines = 0
+                    # A candle close cuts the wait short; the schedule then restarts from it
+                    if self._wake_event.wait(sleep_for):
+                        self._wake_event.clear()
+                        next_tick = time.monotonic()
+                else:
+                    # An overrun cycle is followed immediately by the next one; after
+                    # 3 in a row, restart the schedule instead of chasing old deadlines
+                    missed_deadlines += 1
+                    if missed_deadlines >= 3:
+                        self.log.info(f"⚠️ {missed_deadlines} cycles overran {CHECK_INTERVAL_SECONDS}s, resyncing schedule")
+                        next_tick = time.monotonic()
+                        missed_deadlines = 0
                 
             except Exception as e:
-                print(f"\n❌ Error in main loop: {e}")
+                self.log.info(f"\n❌ Error in main loop: {e}")
                 self.health_monitor.handle_error(e, {'location': 'main_loop'})
                 # No auto-restart or auto-continue on unexpected errors
                 self.shutdown()
@@ -144,174 +291,309 @@ class TradingBot:
     
     def _trading_cycle(self):
         """Execute one complete trading cycle"""
+        # Bind hot attributes to locals once for the whole cycle
+        log = self.log
+        executor = self.executor
+        risk_manager = self.risk_manager
+        analyzer = self.analyzer
+        logger = self.logger
+        
+        # One wall-clock read per cycle, shared by the time filters and the logs
+        now = datetime.now(timezone.utc)
         current_day = self._get_competition_day()
         
         # Get trading period (time-based filters)
-        trading_period = get_trading_period()
+        trading_period = get_trading_period(now)
         
         # Log cycle start
         if self.cycle_count % 12 == 0:  # Every hour (12 * 5min)
             period_summary = format_trading_period_summary(trading_period)
-            print(f"\n⏰ [{datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}] Day {current_day}/14 | Cycle #{self.cycle_count}")
-            print(f"   {period_summary}")
+            log.info(f"\n⏰ [{now.strftime('%Y-%m-%d %H:%M:%S')}] Day {current_day}/14 | Cycle #{self.cycle_count}")
+            log.info(f"   {period_summary}")
         
-        # Get portfolio status first
-        portfolio = self.executor.get_portfolio_status()
+        # Get portfolio status first (cached by the executor for the rest of the cycle)
+        executor.begin_cycle()
+        portfolio = executor.get_portfolio_status()
         
         # Update risk manager with current portfolio value
-        self.risk_manager.update_portfolio_metrics(portfolio['total_value'])
+        risk_manager.update_portfolio_metrics(portfolio['total_value'], now)
         
         # Log performance snapshot
-        self.logger.log_performance_snapshot(portfolio)
+        logger.log_performance_snapshot(portfolio)
+        
+        # Check circuit breakers first - while trading is halted nothing below
+        # (strategy bookkeeping, forced entry, stops, per-asset analysis) runs
+        can_trade, reason = risk_manager.check_circuit_breakers(now)
+        if not can_trade:
+            log.info(f"🛑 Trading halted: {reason}")
+            
+            # If circuit breaker active, close risky positions
+            if risk_manager.circuit_breaker_level in {'LEVEL_2', 'LEVEL_3', 'LEVEL_4'}:
+                for symbol, symbol_positions in portfolio.get('positions_by_symbol', {}).items():
+                    worst_pnl = min(p['pnl_percent'] for p in symbol_positions)
+                    if worst_pnl < -3:  # Close losing positions
+                        log.info(f"   Closing losing position: {symbol} ({worst_pnl:.1f}%)")
+                        executor.close_position(symbol)
+            
+            return
         
         # Update strategy cooldowns (check every hour)
         if self.cycle_count % 12 == 0:
-            strategies = ['TREND_FOLLOWING', 'BREAKOUT', 'MOMENTUM', 'REVERSAL', 'VOLATILITY_BREAKOUT', 'EMA_CROSSOVER']
-            for strategy in strategies:
-                self.analyzer.perf_tracker.update_strategy_cooldown(strategy)
+            analyzer.perf_tracker.update_all_cooldowns(STRATEGIES)
         
         # Log strategy dashboard periodically (every 6 hours)
         if self.cycle_count % 72 == 0:
-            dashboard = self.analyzer.perf_tracker.get_strategy_dashboard_data()
-            print(f"\n📊 Strategy Performance Dashboard:")
+            dashboard = analyzer.perf_tracker.get_strategy_dashboard_data()
+            log.info(f"\n📊 Strategy Performance Dashboard:")
             for strategy, stats in dashboard['strategies'].items():
                 status = "⏸️ COOLDOWN" if stats['is_cooldown'] else f"📈 +{stats['boost']}" if stats['boost'] > 0 else f"📉 {stats['boost']}" if stats['boost'] < 0 else "➖"
-                print(f"   {status} {strategy}: WR={stats['win_rate']:.1%} | PnL={stats['avg_pnl_pct']:.2f}% | PF={stats['profit_factor']:.2f} | Trades={stats['trade_count']}")
+                log.info(f"   {status} {strategy}: WR={stats['win_rate']:.1%} | PnL={stats['avg_pnl_pct']:.2f}% | PF={stats['profit_factor']:.2f} | Trades={stats['trade_count']}")
 
         # Optionally force a single initial trade to bootstrap
-        self._force_initial_trade_once(portfolio, current_day)
-        
-        # Check circuit breakers
-        can_trade, reason = self.risk_manager.check_circuit_breakers()
-        if not can_trade:
-            print(f"🛑 Trading halted: {reason}")
-            
-            # If circuit breaker active, close risky positions
-            if self.risk_manager.circuit_breaker_level in ['LEVEL_2', 'LEVEL_3', 'LEVEL_4']:
-                positions = portfolio.get('positions', [])
-                for pos in positions:
-                    if pos['pnl_percent'] < -3:  # Close losing positions
-                        print(f"   Closing losing position: {pos['symbol']} ({pos['pnl_percent']:.1f}%)")
-                        self.executor.close_position(pos['symbol'])
-            
-            return
-        
-        # Update trailing stops with dynamic ATR-based system
-        self._update_all_trailing_stops(portfolio)
+        if FORCE_INITIAL_TRADE and not self._forced_trade_done:
+            self._force_initial_trade_once(portfolio, current_day)
+        
+        # Update trailing stops with dynamic ATR-based system (only positions whose mark moved)
+        positions = portfolio.get('positions', ())
+        mono_now = time.monotonic()
+        moved = self._positions_needing_stop_update(positions, mono_now)
+        if moved:
+            self._update_all_trailing_stops(moved)
+            moved_symbols = {pos['symbol'] for pos in moved}
+            last_prices = self._last_prices
+            self._last_prices = {
+                pos['symbol']: pos.get('current_price', 0) if pos['symbol'] in moved_symbols
+                else last_prices.get(pos['symbol'])
+                for pos in positions
+            }
+            if len(moved) == len(positions):
+                self._last_stop_update_ts = mono_now
         
         # Check TP hits and convert TP3 to trailing stop when TP2 hits
-        self.executor.check_tp_hits_and_convert_tp3()
+        executor.check_tp_hits_and_convert_tp3(positions)
         
-        self.executor.close_stale_positions()
+        # Staleness is measured in minutes, so a periodic scan is enough
+        if mono_now - self._last_stale_check_ts > STOP_REFRESH_MAX_SECONDS:
+            executor.close_stale_positions(positions)
+            self._last_stale_check_ts = mono_now
         
         # Analyze each asset
-        print(f"\n{'='*70}")
-        print(f"🔄 TRADING CYCLE - Processing {len(TRADING_ASSETS)} symbol(s): {', '.join(TRADING_ASSETS)}")
-        print(f"{'='*70}")
-        
-        for asset in TRADING_ASSETS:
-            try:
-                print(f"\n{'─'*70}")
-                print(f"📊 Processing {asset} | Cycle #{self.cycle_count}")
-                print(f"{'─'*70}")
-                
-                # Refresh portfolio before each asset to consider any prior trades
-                portfolio = self.executor.get_portfolio_status()
-                self._analyze_and_trade(asset, portfolio, current_day, trading_period)
-            except Exception as e:
-                print(f"❌ Error processing {asset}: {e}")
-                import traceback
-                traceback.print_exc()
-                self.health_monitor.handle_error(e, {'asset': asset, 'action': 'analyze_and_trade'})
+        log.info("\n" + _RULE)
+        log.info(f"🔄 TRADING CYCLE - Processing {len(TRADING_ASSETS)} symbol(s): {', '.join(TRADING_ASSETS)}")
+        log.info(_RULE)
+        
+        # Only assets with a position to manage or room for a new entry are
+        # worth a market data fetch; the rest are skipped before any request
+        active_assets = [
+            asset for asset in TRADING_ASSETS
+            if self._needs_market_data(asset, portfolio, trading_period)
+        ]
+        
+        # Market data for every active asset in one concurrent burst
+        market_data_by_asset = self.data_pipeline.fetch_realtime_batch(active_assets)
+        
+        # Network-bound per-asset work (LLM, orders) runs in parallel
+        futures = [
+            self._pool.submit(self._process_asset, asset, current_day, trading_period,
+                              market_data_by_asset.get(asset))
+            for asset in active_assets
+        ]
+        wait(futures)
         
         # Print status summary periodically
         if self.cycle_count % 12 == 0:
-            self._print_status(portfolio)
+            self._print_status(executor.get_portfolio_status())
+    
+    def _needs_market_data(self, asset: str, portfolio: Dict, trading_period: Dict) -> bool:
+        """True if asset has positions to monitor or could take a new entry this cycle"""
+        if portfolio.get('positions_by_symbol', {}).get(asset):
+            return True
+        if not trading_period.get('should_trade', True):
+            reason = trading_period.get('reason', 'Low liquidity period')
+        else:
+            entry_ok, reason = self.risk_manager.precheck_new_entry(portfolio, asset)
+            if entry_ok:
+                return True
+        self.log.info(f"   ⏸️  Skipping {asset} (no position, no new entry): {reason}")
+        return False
+    
+    def _positions_needing_stop_update(self, positions, mono_now: float) -> list:
+        """
+        Positions whose stop may need to move: every actively trailing position, plus those
+        whose mark moved past TRAILING_TICK_PCT since their last stop update
+        (all of them once a full refresh is overdue)
+        """
+        if not positions:
+            return []
+        if mono_now - self._last_stop_update_ts > STOP_REFRESH_MAX_SECONDS:
+            return list(positions)
+        last_prices = self._last_prices
+        tracked = self.executor.open_positions
+        moved = []
+        for pos in positions:
+            symbol = pos['symbol']
+            price = pos.get('current_price', 0)
+            last_price = last_prices.get(symbol)
+            # New positions, missing marks and active trails always get an update
+            if (not price or not last_price
+                    or abs(price - last_price) / last_price >= TRAILING_TICK_PCT
+                    or tracked.get(symbol, {}).get('is_trailing')):
+                moved.append(pos)
+        return moved
+    
+    @staticmethod
+    def _summarize_positions(portfolio: Dict, asset: str) -> PosView:
+        """Positions on asset (from the positions_by_symbol index), the worst of them, and counts"""
+        on_asset = tuple(portfolio.get('positions_by_symbol', {}).get(asset, ()))
+        return PosView(
+            on_asset=on_asset,
+            worst_on_asset=min(on_asset, key=itemgetter('pnl_percent')) if on_asset else None,
+            count_on_asset=len(on_asset),
+            total_count=len(portfolio.get('positions', ())),
+        )
     
-    def _analyze_and_trade(self, asset: str, portfolio: Dict, day_number: int, trading_period: Dict = None):
-        """ENHANCED: Analyze asset and execute trade with improved signals"""
+    def _process_asset(self, asset: str, day_number: int, trading_period: Dict, market_data: Dict = None):
+        """Worker: analyze and trade one asset, reporting errors instead of raising"""
+        try:
+            self.log.info(f"\n{'─'*70}")
+            self.log.info(f"📊 Processing {asset} | Cycle #{self.cycle_count}")
+            self.log.info(f"{'─'*70}")
+            
+            # Refresh portfolio to consider any prior trades
+            # (served from the cycle snapshot unless an order went through)
+            portfolio = self.executor.get_portfolio_status()
+            self._analyze_and_trade(asset, portfolio, day_number, trading_period, market_data)
+        except Exception as e:
+            # Format the traceback once: it goes to the error log via the health
+            # monitor and only reaches the console at DEBUG
+            tb = traceback.format_exc()
+            self.log.info(f"❌ Error processing {asset}: {e}")
+            self.log.debug("%s", tb)
+            self.health_monitor.handle_error(e, {'asset': asset, 'action': 'analyze_and_trade'}, tb=tb)
+    
+    def _analyze_and_trade(self, asset: str, portfolio: Dict, day_number: int, trading_period: Dict = None,
+                           market_data: Dict = None):
+        """
+        ENHANCED: Analyze asset and execute trade with improved signals
+        market_data may be pre-fetched for the cycle; it is fetched here otherwise
+        """
+        # The asset's lines are collected and emitted as one record per stretch,
+        # so concurrent assets' output does not interleave
+        log = _StepLog(self.log)
+        try:
+            self._analyze_and_trade_steps(log, asset, portfolio, day_number, trading_period, market_data)
+        finally:
+            log.flush()
+    
+    def _analyze_and_trade_steps(self, log: _StepLog, asset: str, portfolio: Dict, day_number: int,
+                                 trading_period: Dict, market_data: Dict):
+        """_analyze_and_trade body; flushes log before any call that logs on its own (orders, profit lock)"""
+        # Bind hot attributes to locals (called once per asset per cycle)
+        executor = self.executor
+        risk_manager = self.risk_manager
+        analyzer = self.analyzer
+        data_pipeline = self.data_pipeline
+        deepseek_agent = self.deepseek_agent
+        health_monitor = self.health_monitor
+        logger = self.logger
+        
+        pv = self._summarize_positions(portfolio, asset)
         
         # Apply time-based filters for new entries
         if trading_period and not trading_period.get('should_trade', True):
-            print(f"   ⏸️  Skipping new trades for {asset}: {trading_period.get('reason', 'Low liquidity period')}")
+            log.info(f"   ⏸️  Skipping new trades for {asset}: {trading_period.get('reason', 'Low liquidity period')}")
             # Still monitor existing positions
-            existing_positions = [p for p in portfolio.get('positions', []) if p.get('symbol') == asset]
-            if existing_positions:
-                print(f"   📊 Continuing to monitor {len(existing_positions)} existing position(s)")
+            if pv.on_asset:
+                log.info(f"   📊 Continuing to monitor {pv.count_on_asset} existing position(s)")
                 # Check exit signals and quick profit lock for existing positions
-                market_data = self.data_pipeline.fetch_realtime_data(asset)
+                if market_data is None:
+                    market_data = data_pipeline.get_cached_realtime(asset) or data_pipeline.fetch_realtime_data(asset)
                 if market_data and 'error' not in market_data:
-                    for pos in existing_positions:
+                    log.flush()
+                    for pos in pv.on_asset:
                         self._check_quick_profit_lock(pos, market_data.get('price', 0))
             return
         
-        print(f"🔍 Step 1/6: Fetching market data for {asset}...")
-        # Fetch market data
-        market_data = self.data_pipeline.fetch_realtime_data(asset)
+        log.debug("🔍 Step 1/6: Fetching market data for %s...", asset)
+        # Fetch market data (unless pre-fetched for the cycle)
+        if market_data is None:
+            market_data = data_pipeline.fetch_realtime_data(asset)
         
         # Validate data
-        print(f"🔍 Step 2/6: Validating data integrity for {asset}...")
-        if not self.health_monitor.validate_data_integrity(market_data):
-            print(f"   ❌ {asset} REJECTED: Invalid data for {asset}, skipping...")
+        log.debug("🔍 Step 2/6: Validating data integrity for %s...", asset)
+        if not health_monitor.validate_data_integrity(market_data):
+            log.info(f"   ❌ {asset} REJECTED: Invalid data for {asset}, skipping...")
             if 'error' in market_data:
-                print(f"      Error details: {market_data.get('error')}")
+                log.info(f"      Error details: {market_data.get('error')}")
             return
         else:
-            print(f"   ✅ {asset} data validated successfully")
+            log.info(f"   ✅ {asset} data validated successfully")
         
         # Get market regime and indicators
         regime = market_data.get('regime', 'UNKNOWN')
         indicators = market_data.get('indicators', {})
         price = market_data.get('price', 0)
         
-        print(f"   📊 {asset} Market Data:")
-        print(f"      Price: ${price:,.2f}")
-        print(f"      Regime: {regime}")
-        print(f"      RSI: {indicators.get('rsi', 0):.1f}" if indicators.get('rsi') else "      RSI: N/A")
-        print(f"      Volume Ratio: {indicators.get('volume_ratio', 1.0):.2f}x" if indicators.get('volume_ratio') else "      Volume Ratio: N/A")
+        # Per-asset detail: skip the formatting entirely unless DEBUG is on
+        if log.isEnabledFor(logging.DEBUG):
+            rsi = indicators.get('rsi')
+            volume_ratio = indicators.get('volume_ratio')
+            log.debug(
+                "   📊 %s Market Data:\n      Price: $%s\n      Regime: %s\n      RSI: %s\n      Volume Ratio: %s",
+                asset, f"{price:,.2f}", regime,
+                f"{rsi:.1f}" if rsi else "N/A",
+                f"{volume_ratio:.2f}x" if volume_ratio else "N/A",
+            )
         
         # Check existing positions for this asset (PYRAMIDING ALLOWED - max 2 per symbol)
-        existing_positions = []
-        open_positions = portfolio.get('positions', [])
-        for pos in open_positions:
-            if pos['symbol'] == asset:
-                existing_positions.append(pos)
-        
-        # Count positions per symbol
-        positions_on_symbol = len(existing_positions)
-        from config import MAX_POSITIONS_PER_SYMBOL
-        
-        if existing_positions:
-            print(f"\n🔍 Checking existing positions for {asset}:")
-            for i, pos in enumerate(existing_positions, 1):
-                print(f"   Position #{i}: {pos.get('side', 'UNKNOWN')} | PnL: {pos.get('pnl_percent', 0):+.2f}%")
-            print(f"   Total positions on {asset}: {positions_on_symbol}/{MAX_POSITIONS_PER_SYMBOL}")
+        if pv.on_asset:
+            log.info(f"\n🔍 Checking existing positions for {asset}:")
+            for i, pos in enumerate(pv.on_asset, 1):
+                log.info(f"   Position #{i}: {pos.get('side', 'UNKNOWN')} | PnL: {pos.get('pnl_percent', 0):+.2f}%")
+            log.info(f"   Total positions on {asset}: {pv.count_on_asset}/{MAX_POSITIONS_PER_SYMBOL}")
+        
+        # Cheap risk gates first: with no position to manage on this symbol, the LLM
+        # is only worth asking if a new entry could pass validation at all
+        entry_ok, entry_reason = True, None
+        if not pv.on_asset:
+            entry_ok, entry_reason = risk_manager.precheck_new_entry(portfolio, asset)
+        
+        # Start the LLM request now so its round trip overlaps the profit-lock and
+        # exit handling below (it is only needed while the symbol has room)
+        decision_future = None
+        if pv.count_on_asset < MAX_POSITIONS_PER_SYMBOL and entry_ok:
+            decision_future = deepseek_agent.submit_decision(market_data, portfolio, day_number)
         
         # ========================================
         # QUICK PROFIT LOCK (for low confidence positions)
         # ========================================
-        for pos in existing_positions:
-            self._check_quick_profit_lock(pos, market_data.get('price', 0))
+        if pv.on_asset:
+            log.flush()
+        for pos in pv.on_asset:
+            self._check_quick_profit_lock(pos, price)
         
         # ========================================
         # ENHANCED EXIT LOGIC (only for worst performing position if multiple)
         # ========================================
-        if existing_positions:
+        if pv.on_asset:
             # Find worst performing position for exit signals
-            worst_position = min(existing_positions, key=lambda p: p.get('pnl_percent', 0))
+            worst_position = pv.worst_on_asset
             pnl = worst_position['pnl_percent']
+            # Closing one position still leaves the symbol at its limit
+            at_limit_after_close = pv.count_on_asset - 1 >= MAX_POSITIONS_PER_SYMBOL
             
             # Emergency stop loss at -5%
             if pnl < -5:
-                print(f"🛑 Emergency Stop Loss: Closing worst position on {asset} at {pnl:.1f}%")
-                result = self.executor.close_position(asset)
-                self.logger.log_trade(result)
+                log.info(f"🛑 Emergency Stop Loss: Closing worst position on {asset} at {pnl:.1f}%")
+                log.flush()
+                result = executor.close_position(asset)
+                logger.log_trade(result)
                 # Continue to allow pyramiding if under limit
-                if positions_on_symbol - 1 >= MAX_POSITIONS_PER_SYMBOL:
+                if at_limit_after_close:
                     return  # Can't pyramid if still at limit after closing
             
             # Check graduated exit signals from market analyzer (on worst position)
-            exit_signal = self.analyzer.should_exit_position(
+            exit_signal = analyzer.should_exit_position(
                 worst_position, market_data, indicators
             )
             
@@ -319,29 +601,30 @@ class TradingBot:
             exit_confidence = exit_signal.get('exit_confidence', 0)
             
             if exit_action != 'NONE' and exit_confidence >= 75:
-                print(f"\n📉 TIERED EXIT SIGNAL for {asset}")
-                print(f"   🎯 Exit tier activated: {exit_action} at {exit_confidence}% confidence")
-                print(f"   Current PnL: {pnl:+.2f}%")
-                print(f"   Reasons: {' | '.join(exit_signal.get('reasons', []))}")
+                log.info(f"\n📉 TIERED EXIT SIGNAL for {asset}")
+                log.info(f"   🎯 Exit tier activated: {exit_action} at {exit_confidence}% confidence")
+                log.info(f"   Current PnL: {pnl:+.2f}%")
+                reasons_str = ' | '.join(exit_signal.get('reasons', ()))
+                log.info(f"   Reasons: {reasons_str}")
+                log.flush()
                 
-                result = self.executor.execute_tiered_exit(worst_position, exit_signal)
+                result = executor.execute_tiered_exit(worst_position, exit_signal)
                 
                 # Create decision object for logging
                 exit_decision = {
                     'action': 'CLOSE' if exit_action == 'FULL' else 'PARTIAL_CLOSE',
                     'confidence': exit_confidence,
-                    'entry_reason': ' | '.join(exit_signal.get('reasons', [])),
+                    'entry_reason': reasons_str,
                     'exit_tier': exit_action
                 }
-                self.logger.log_decision(exit_decision, market_data, result)
+                logger.log_decision(exit_decision, market_data, result)
                 
                 if result.get('status') == 'SUCCESS' or result.get('status') == 'NONE':
                     strategy = f'EXIT_{exit_action}'
-                    regime = market_data.get('regime', 'UNKNOWN')
                     if exit_action == 'FULL':
-                        self.logger.log_trade(result, strategy=strategy, regime=regime, confidence=exit_confidence)
+                        logger.log_trade(result, strategy=strategy, regime=regime, confidence=exit_confidence)
                     # Continue to allow pyramiding if under limit after close
-                    if exit_action == 'FULL' and positions_on_symbol - 1 >= MAX_POSITIONS_PER_SYMBOL:
+                    if exit_action == 'FULL' and at_limit_after_close:
                         return  # Can't pyramid if still at limit after closing
         
         # ========================================
@@ -349,69 +632,74 @@ class TradingBot:
         # ========================================
         
         # Check if we can add more positions (pyramiding check)
-        if positions_on_symbol >= MAX_POSITIONS_PER_SYMBOL:
-            print(f"   ⚠️ Already at max positions ({positions_on_symbol}/{MAX_POSITIONS_PER_SYMBOL}) for {asset}")
-            print(f"   💡 Will skip pyramiding - waiting for exit signals or position closure")
+        if pv.count_on_asset >= MAX_POSITIONS_PER_SYMBOL:
+            log.info(f"   ⚠️ Already at max positions ({pv.count_on_asset}/{MAX_POSITIONS_PER_SYMBOL}) for {asset}")
+            log.info(f"   💡 Will skip pyramiding - waiting for exit signals or position closure")
+            return
+        
+        if not entry_ok:
+            log.info(f"   ⚠️ {asset} SKIPPED before LLM: {entry_reason}")
             return
         
         # Get LLM decision (LLM will evaluate if pyramiding is profitable)
-        print(f"🔍 Step 3/6: Getting LLM decision for {asset}...")
+        log.debug("🔍 Step 3/6: Getting LLM decision for %s...", asset)
         try:
-            decision = self.deepseek_agent.get_decision(market_data, portfolio, day_number)
-            print(f"   ✅ {asset} LLM Decision received: action={decision.get('action')}, confidence={decision.get('confidence', 0):.1f}%")
+            decision = decision_future.result()
+            decision_source = "LLM Decision received"
         except Exception as e:
-            print(f"   ⚠️ {asset} DeepSeek API error, using fallback...")
-            print(f"      Error: {e}")
-            self.health_monitor.handle_api_failure('deepseek', e)
-            decision = self.deepseek_agent.get_fallback_decision(market_data, portfolio)
-            print(f"   ✅ {asset} Fallback Decision: action={decision.get('action')}, confidence={decision.get('confidence', 0):.1f}%")
+            log.info(f"   ⚠️ {asset} DeepSeek API error, using fallback...")
+            log.info(f"      Error: {e}")
+            health_monitor.handle_api_failure('deepseek', e)
+            decision = deepseek_agent.get_fallback_decision(market_data, portfolio)
+            decision_source = "Fallback Decision"
+        action = decision['action']
+        confidence = decision.get('confidence', 0)
+        log.info(f"   ✅ {asset} {decision_source}: action={action}, confidence={confidence:.1f}%")
         
         # Skip if HOLD or low confidence (lower threshold in volatile markets)
-        print(f"🔍 Step 4/6: Checking decision threshold for {asset}...")
-        from config import MIN_CONFIDENCE_VOLATILE
-        min_conf = MIN_CONFIDENCE_VOLATILE if market_data.get('regime') == 'VOLATILE' else MIN_CONFIDENCE
+        log.debug("🔍 Step 4/6: Checking decision threshold for %s...", asset)
+        min_conf = MIN_CONFIDENCE_VOLATILE if regime == 'VOLATILE' else MIN_CONFIDENCE
         
-        if decision['action'] == 'HOLD':
-            print(f"   ⚠️ {asset} SKIPPED: LLM returned HOLD (no trade signal)")
-            print(f"      Decision details: confidence={decision.get('confidence', 0):.1f}%, reason='{decision.get('entry_reason', 'N/A')}'")
+        if action == 'HOLD':
+            log.info(f"   ⚠️ {asset} SKIPPED: LLM returned HOLD (no trade signal)")
+            log.info(f"      Decision details: confidence={confidence:.1f}%, reason='{decision.get('entry_reason', 'N/A')}'")
             return
-        elif decision['confidence'] < min_conf:
-            print(f"   ⚠️ {asset} SKIPPED: Confidence too low")
-            print(f"      Confidence: {decision.get('confidence', 0):.1f}% < threshold: {min_conf}%")
-            print(f"      Regime: {regime} (threshold: {min_conf}% for this regime)")
+        elif confidence < min_conf:
+            log.info(f"   ⚠️ {asset} SKIPPED: Confidence too low")
+            log.info(f"      Confidence: {confidence:.1f}% < threshold: {min_conf}%")
+            log.info(f"      Regime: {regime} (threshold: {min_conf}% for this regime)")
             return
         else:
-            print(f"   ✅ {asset} Decision passed: action={decision.get('action')}, confidence={decision.get('confidence', 0):.1f}% >= {min_conf}%")
+            log.info(f"   ✅ {asset} Decision passed: action={action}, confidence={confidence:.1f}% >= {min_conf}%")
         
         # Pyramiding validation
-        is_pyramid = positions_on_symbol > 0
-        first_position = existing_positions[0] if existing_positions else None
+        is_pyramid = pv.count_on_asset > 0
+        first_position = pv.on_asset[0] if pv.on_asset else None
         
         if is_pyramid:
             # Enhanced pyramid rules
             first_pnl = first_position.get('pnl_percent', 0)
             first_side = first_position.get('side')
-            decision_side = decision.get('action')
             
             # Only pyramid if first position is profitable
             if first_pnl <= 0:
-                print(f"   ❌ PYRAMID REJECTED: First position losing ({first_pnl:.2f}%) - pyramid blocked")
+                log.info(f"   ❌ PYRAMID REJECTED: First position losing ({first_pnl:.2f}%) - pyramid blocked")
                 return
             
             # Require confidence >= 70 for pyramid
-            if decision['confidence'] < 70:
-                print(f"   ❌ PYRAMID REJECTED: Confidence {decision['confidence']:.1f}% < 70% threshold for pyramiding")
+            if confidence < 70:
+                log.info(f"   ❌ PYRAMID REJECTED: Confidence {confidence:.1f}% < 70% threshold for pyramiding")
                 return
             
             # Ensure same direction
-            if first_side != decision_side:
-                print(f"   ❌ PYRAMID REJECTED: Direction mismatch (first: {first_side}, new: {decision_side})")
+            if first_side != action:
+                log.info(f"   ❌ PYRAMID REJECTED: Direction mismatch (first: {first_side}, new: {action})")
                 return
             
-            print(f"   🏗️  PYRAMID OPPORTUNITY: First position +{first_pnl:.2f}%")
+            log.info(f"   🏗️  PYRAMID OPPORTUNITY: First position +{first_pnl:.2f}%")
         
         # Calculate position size and leverage (strategy and confidence-based)
-        print(f"🔍 Step 5/6: Calculating position size for {asset}...")
+        log.debug("🔍 Step 5/6: Calculating position size for %s...", asset)
         portfolio_value = portfolio.get('total_value', INITIAL_CAPITAL)
         
         # Extract strategy type from decision or market analyzer setups
@@ -420,41 +708,23 @@ class TradingBot:
         # If not in decision, try to extract from market analyzer setups
         if not strategy_type:
             try:
-                setups = self.analyzer.find_trade_setups(market_data)
-                if setups:
-                    # Get the best setup (highest confidence)
-                    best_setup = max(setups, key=lambda s: s.get('confidence', 0))
+                best_setup = analyzer.get_best_setup(market_data)
+                if best_setup:
                     strategy_type = best_setup.get('strategy')
             except Exception:
                 pass
         
         # Normalize strategy type to match STRATEGY_LEVERAGE keys
         if strategy_type:
-            # Map common variations to standard names
-            strategy_mapping = {
-                'trend_following': 'TREND_FOLLOWING',
-                'TREND_FOLLOWING_ENHANCED': 'TREND_FOLLOWING',
-                'momentum': 'MOMENTUM',
-                'MOMENTUM_ENHANCED': 'MOMENTUM',
-                'breakout': 'BREAKOUT',
-                'BREAKOUT_ENHANCED': 'BREAKOUT',
-                'mean_reversion': 'REVERSAL',
-                'MEAN_REVERSION': 'REVERSAL',
-                'reversal': 'REVERSAL',
-                'volatility_breakout': 'VOLATILITY_BREAKOUT',
-                'VOLATILITY_BREAKOUT': 'VOLATILITY_BREAKOUT',
-                'ema_crossover': 'EMA_CROSSOVER',
-                'EMA_CROSSOVER': 'EMA_CROSSOVER'
-            }
-            strategy_type = strategy_mapping.get(strategy_type, strategy_type.upper())
+            strategy_type = _STRATEGY_MAP.get(strategy_type) or strategy_type.upper()
         
         # Apply time-based size multiplier
         size_multiplier = trading_period.get('size_multiplier', 1.0) if trading_period else 1.0
         
         # Calculate base position size
-        base_position_info = self.risk_manager.calculate_position_size(
+        base_position_info = risk_manager.calculate_position_size(
             balance=portfolio_value,
-            confidence=decision['confidence'],
+            confidence=confidence,
             market_data=market_data,
             strategy_type=strategy_type,
             size_multiplier=size_multiplier
@@ -464,17 +734,17 @@ class TradingBot:
         
         # If pyramiding, calculate adjusted pyramid size
         if is_pyramid and first_position:
-            pyramid_info = self.risk_manager.calculate_pyramid_size(
-                first_position, base_size_dollars, decision['confidence'], portfolio_value
+            pyramid_info = risk_manager.calculate_pyramid_size(
+                first_position, base_size_dollars, confidence, portfolio_value
             )
             position_size_dollars = pyramid_info['pyramid_size']
             pyramid_multiplier = pyramid_info['multiplier']
             
             if position_size_dollars <= 0:
-                print(f"   ❌ PYRAMID REJECTED: Calculated pyramid size is ${position_size_dollars:,.2f}")
+                log.info(f"   ❌ PYRAMID REJECTED: Calculated pyramid size is ${position_size_dollars:,.2f}")
                 return
             
-            print(f"   🏗️  PYRAMID SIZE: ${position_size_dollars:,.2f} ({pyramid_multiplier:.2f}x base, reason: {pyramid_info['reason']})")
+            log.info(f"   🏗️  PYRAMID SIZE: ${position_size_dollars:,.2f} ({pyramid_multiplier:.2f}x base, reason: {pyramid_info['reason']})")
         else:
             position_size_dollars = base_size_dollars
             pyramid_multiplier = 1.0
@@ -485,184 +755,191 @@ class TradingBot:
         
         multiplier_text = f" (x{size_multiplier:.2f} time boost)" if size_multiplier > 1.0 else ""
         
-        print(f"   💰 {asset} Position Sizing:")
-        print(f"      Portfolio Value: ${portfolio_value:,.2f}")
-        print(f"      Position Size: ${position_size_dollars:,.2f} ({position_size:.1%}){multiplier_text}")
-        print(f"      Leverage: {leverage}x")
+        log.info(f"   💰 {asset} Position Sizing:")
+        log.info(f"      Portfolio Value: ${portfolio_value:,.2f}")
+        log.info(f"      Position Size: ${position_size_dollars:,.2f} ({position_size:.1%}){multiplier_text}")
+        log.info(f"      Leverage: {leverage}x")
         
         # Skip if position size too small
         if position_size == 0:
-            print(f"   ❌ {asset} REJECTED: Position size calculated as 0 (insufficient balance or calculation error)")
+            log.info(f"   ❌ {asset} REJECTED: Position size calculated as 0 (insufficient balance or calculation error)")
             return
         else:
-            print(f"   ✅ {asset} Position size validated")
+            log.info(f"   ✅ {asset} Position size validated")
         
         # Detailed logging before validation
-        print(f"🔍 Step 6/6: Final validation for {asset}...")
-        open_positions = portfolio.get('positions', [])
-        available_balance = portfolio.get('available_balance', 0)
-        positions_on_this_symbol = len([p for p in open_positions if p.get('symbol') == asset])
-        
-        print(f"\n   📋 {asset} Trade Validation:")
-        if positions_on_this_symbol > 0:
-            print(f"   🏗️  PYRAMIDING: Adding position #{positions_on_this_symbol + 1} (already have {positions_on_this_symbol})")
-            for i, pos in enumerate([p for p in open_positions if p.get('symbol') == asset], 1):
-                print(f"      Existing #{i}: {pos.get('side', 'UNKNOWN')} | PnL: {pos.get('pnl_percent', 0):+.2f}%")
-        else:
-            print(f"   📊 NEW POSITION: No existing positions on {asset}")
-        print(f"   Total portfolio positions: {len(open_positions)}/{MAX_OPEN_POSITIONS}")
-        print(f"   Positions on {asset}: {positions_on_this_symbol}/{MAX_POSITIONS_PER_SYMBOL}")
-        print(f"   Confidence: {decision['confidence']:.1f}% (threshold: {min_conf}%)")
-        print(f"   Position size: ${position_size_dollars:,.2f} ({position_size:.1%})")
-        print(f"   Leverage: {leverage}x")
-        print(f"   Available balance: ${available_balance:,.2f}")
-        
-        # Check each rejection reason
-        if positions_on_this_symbol >= MAX_POSITIONS_PER_SYMBOL:
-            print(f"   ❌ REJECTED: Max positions per symbol ({MAX_POSITIONS_PER_SYMBOL}) reached")
-        elif len(open_positions) >= MAX_OPEN_POSITIONS:
-            print(f"   ❌ REJECTED: Max total positions ({MAX_OPEN_POSITIONS}) reached")
-        elif decision['confidence'] < min_conf:
-            print(f"   ❌ REJECTED: Confidence too low")
-        elif position_size_dollars > available_balance * 0.95:
-            print(f"   ❌ REJECTED: Position too large (>95% of available balance)")
-        else:
-            print(f"   ✅ Passing validation checks")
+        log.debug("🔍 Step 6/6: Final validation for %s...", asset)
+        # One-line preview; the authoritative verdict comes from validate_trade below
+        entry_kind = f"PYRAMID #{pv.count_on_asset + 1}" if pv.count_on_asset else "NEW POSITION"
+        log.info(
+            f"   📋 {asset} {entry_kind} | Positions: {pv.total_count}/{MAX_OPEN_POSITIONS} total, "
+            f"{pv.count_on_asset}/{MAX_POSITIONS_PER_SYMBOL} on symbol | "
+            f"Confidence: {confidence:.1f}% (threshold: {min_conf}%) | "
+            f"Size: ${position_size_dollars:,.2f} ({position_size:.1%}) @ {leverage}x | "
+            f"Available: ${portfolio.get('available_balance', 0):,.2f}"
+        )
+        
+        # Validate and execute under the trade lock: another asset's worker
+        # may have opened a position since this portfolio snapshot was taken
+        with self._trade_lock:
+            self._validate_and_execute(
+                log, asset, decision, market_data, executor.get_portfolio_status(), pv.on_asset,
+                position_size, position_size_dollars, leverage
+            )
+    
+    def _validate_and_execute(self, log: _StepLog, asset: str, decision: Dict, market_data: Dict,
+                              portfolio: Dict, existing_positions: list, position_size: float,
+                              position_size_dollars: float, leverage: int):
+        """Final risk validation and order placement (caller holds the trade lock and flushes log)"""
+        executor = self.executor
+        risk_manager = self.risk_manager
+        logger = self.logger
+        pv = self._summarize_positions(portfolio, asset)
+        action = decision['action']
+        confidence = decision.get('confidence')
         
         # Validate trade
-        is_valid, validation_msg = self.risk_manager.validate_trade(
+        is_valid, validation_msg = risk_manager.validate_trade(
             decision, portfolio, position_size, leverage, symbol=asset
         )
         
         if not is_valid:
-            print(f"   ❌ Validation failed: {validation_msg}")
+            log.info(f"   ❌ Validation failed: {validation_msg}")
             return
         else:
-            print(f"   ✅ Validation passed")
+            log.info(f"   ✅ Validation passed")
         
         # Execute trade
-        if decision['action'] in ['LONG', 'SHORT']:
+        if action in {'LONG', 'SHORT'}:
             # Use position_size_dollars already calculated from position_info
             
-            print(f"\n📈 EXECUTING {decision['action']} on {asset}")
-            print(f"   Confidence: {decision['confidence']:.0f}%")
-            print(f"   Position Size: {position_size:.1%} (${position_size_dollars:,.2f})")
-            print(f"   Leverage: {leverage}x")
-            print(f"   Reason: {decision['entry_reason']}")
+            log.info(f"\n📈 EXECUTING {action} on {asset}")
+            log.info(f"   Confidence: {confidence:.0f}%")
+            log.info(f"   Position Size: {position_size:.1%} (${position_size_dollars:,.2f})")
+            log.info(f"   Leverage: {leverage}x")
+            log.info(f"   Reason: {decision['entry_reason']}")
             
             # Additional validation checks before execution
-            existing_on_symbol = [p for p in open_positions if p.get('symbol') == asset]
-            if existing_on_symbol:
-                print(f"   🏗️  PYRAMIDING: Adding to existing {len(existing_on_symbol)} position(s) on {asset}")
+            if pv.on_asset:
+                log.info(f"   🏗️  PYRAMIDING: Adding to existing {pv.count_on_asset} position(s) on {asset}")
             else:
-                print(f"   📊 NEW POSITION: First position on {asset}")
+                log.info(f"   📊 NEW POSITION: First position on {asset}")
             
-            if len(open_positions) >= MAX_OPEN_POSITIONS:
-                print(f"   ⚠️ WARNING: At max total positions ({len(open_positions)}/{MAX_OPEN_POSITIONS})")
+            if pv.total_count >= MAX_OPEN_POSITIONS:
+                log.info(f"   ⚠️ WARNING: At max total positions ({pv.total_count}/{MAX_OPEN_POSITIONS})")
             else:
-                print(f"   ✅ Total position limit OK: {len(open_positions)}/{MAX_OPEN_POSITIONS}")
+                log.info(f"   ✅ Total position limit OK: {pv.total_count}/{MAX_OPEN_POSITIONS}")
             
-            if len(existing_on_symbol) + 1 > MAX_POSITIONS_PER_SYMBOL:
-                print(f"   ⚠️ WARNING: Will exceed per-symbol limit (will be {len(existing_on_symbol) + 1}/{MAX_POSITIONS_PER_SYMBOL})")
+            if pv.count_on_asset + 1 > MAX_POSITIONS_PER_SYMBOL:
+                log.info(f"   ⚠️ WARNING: Will exceed per-symbol limit (will be {pv.count_on_asset + 1}/{MAX_POSITIONS_PER_SYMBOL})")
             else:
-                print(f"   ✅ Per-symbol limit OK: {len(existing_on_symbol)} → {len(existing_on_symbol) + 1}/{MAX_POSITIONS_PER_SYMBOL}")
+                log.info(f"   ✅ Per-symbol limit OK: {pv.count_on_asset} → {pv.count_on_asset + 1}/{MAX_POSITIONS_PER_SYMBOL}")
             
-            print(f"   ✅ Proceeding with execution...")
+            log.info(f"   ✅ Proceeding with execution...")
             
             # In high volatility, tighten SL/TP as per config
             if market_data.get('is_high_volatility'):
-                from config import SCALP_STOP_LOSS, SCALP_TAKE_PROFIT
                 decision['stop_loss_percent'] = SCALP_STOP_LOSS * 100 if SCALP_STOP_LOSS < 1 else SCALP_STOP_LOSS
                 decision['take_profit_percent'] = SCALP_TAKE_PROFIT * 100 if SCALP_TAKE_PROFIT < 1 else SCALP_TAKE_PROFIT
 
-            result = self.executor.execute_trade(
+            log.flush()
+            result = executor.execute_trade(
                 asset, decision, position_size_dollars, leverage
             )
             
             # Log decision and trade
-            self.logger.log_decision(decision, market_data, result)
+            logger.log_decision(decision, market_data, result)
             
             if result['status'] == 'SUCCESS':
                 # Extract strategy and regime for performance tracking
                 strategy = decision.get('strategy') or 'unknown'
                 regime = market_data.get('regime', 'UNKNOWN')
-                confidence = decision.get('confidence')
-                self.logger.log_trade(result, strategy=strategy, regime=regime, confidence=confidence)
-                self.risk_manager.total_trades_today += 1
-                # Update portfolio after successful trade so next asset can trade with updated margin
-                portfolio.update(self.executor.get_portfolio_status())
+                logger.log_trade(result, strategy=strategy, regime=regime, confidence=confidence)
+                risk_manager.total_trades_today += 1
             else:
-                print(f"   ❌ Trade execution failed: {result.get('message')}")
+                log.info(f"   ❌ Trade execution failed: {result.get('message')}")
         
-        elif decision['action'] == 'CLOSE' and existing_positions:
-            print(f"\n📉 CLOSING position on {asset}")
-            print(f"   Reason: {decision['entry_reason']}")
+        elif action == 'CLOSE' and existing_positions:
+            log.info(f"\n📉 CLOSING position on {asset}")
+            log.info(f"   Reason: {decision['entry_reason']}")
+            log.flush()
             
-            result = self.executor.close_position(asset)
-            self.logger.log_decision(decision, market_data, result)
+            result = executor.close_position(asset)
+            logger.log_decision(decision, market_data, result)
             
             if result['status'] == 'SUCCESS':
                 strategy = decision.get('strategy') or 'CLOSE'
                 regime = market_data.get('regime', 'UNKNOWN')
-                confidence = decision.get('confidence')
-                self.logger.log_trade(result, strategy=strategy, regime=regime, confidence=confidence)
+                logger.log_trade(result, strategy=strategy, regime=regime, confidence=confidence)
     
     def _health_check(self) -> bool:
         """Perform health check"""
         health = self.health_monitor.monitor_health()
         
         if not health['overall']:
-            print(f"⚠️ Health issues detected:")
+            self.log.info(f"⚠️ Health issues detected:")
             if not health['loop_running']:
-                print(f"   - Loop may be stuck ({health['time_since_cycle']:.0f}s since last cycle)")
+                self.log.info(f"   - Loop may be stuck ({health['time_since_cycle']:.0f}s since last cycle)")
             if not health['error_rate_ok']:
-                print(f"   - High error rate ({health['consecutive_errors']} consecutive errors)")
+                self.log.info(f"   - High error rate ({health['consecutive_errors']} consecutive errors)")
             if not health['apis_ok']:
-                print(f"   - API issues detected")
+                self.log.info(f"   - API issues detected")
             
             return False
         
         return True
     
-    def _update_all_trailing_stops(self, portfolio: Dict):
+    def _update_all_trailing_stops(self, positions: list):
         """
-        Update dynamic trailing stops for all open positions
-        Fetches fresh market data for each position and updates trailing stops
+        Update dynamic trailing stops for the given open positions
+        Fetches fresh market data for all positions in one batch and updates trailing stops
         """
         try:
-            positions = portfolio.get('positions', [])
             if not positions:
                 return
             
-            trailing_active = []
+            # Market data (needed for ATR): the last snapshot with live stream prices
+            # where available, one batch fetch for the rest
+            data_pipeline = self.data_pipeline
+            market_data_by_symbol = {}
+            missing = []
+            for symbol in dict.fromkeys(pos['symbol'] for pos in positions):
+                cached = data_pipeline.get_cached_realtime(symbol)
+                if cached is None:
+                    missing.append(symbol)
+                else:
+                    market_data_by_symbol[symbol] = cached
+            market_data_by_symbol.update(data_pipeline.fetch_realtime_batch(missing))
             
+            # Work out every stop move first, then place them together
+            executor = self.executor
+            plans = []
             for pos in positions:
                 symbol = pos['symbol']
                 
-                # Fetch fresh market data for this symbol (needed for ATR)
                 try:
-                    market_data = self.data_pipeline.fetch_realtime_data(symbol)
+                    market_data = market_data_by_symbol.get(symbol)
                     
                     # Validate market data
                     if not market_data or 'error' in market_data or not market_data.get('indicators'):
                         continue
                     
-                    # Update trailing stop for this position
-                    updated = self.executor.update_dynamic_trailing_stop(pos, market_data)
-                    
-                    if updated:
-                        trailing_active.append(symbol)
+                    plan = executor.plan_trailing_stop(pos, market_data)
+                    if plan is not None:
+                        plans.append(plan)
                     
                 except Exception as e:
-                    print(f"   ⚠️ Error updating trailing stop for {symbol}: {e}")
+                    self.log.info(f"   ⚠️ Error updating trailing stop for {symbol}: {e}")
                     continue
             
+            trailing_active = executor.apply_trailing_stops(plans)
+            
             # Log trailing status
             if trailing_active:
-                print(f"\n   📊 Trailing stops active: {', '.join(trailing_active)}")
+                self.log.info(f"\n   📊 Trailing stops active: {', '.join(trailing_active)}")
                 
         except Exception as e:
-            print(f"Error in _update_all_trailing_stops: {e}")
+            self.log.info(f"Error in _update_all_trailing_stops: {e}")
     
     def _check_quick_profit_lock(self, position: Dict, current_price: float) -> bool:
         """
@@ -679,17 +956,15 @@ class TradingBot:
                 return False
             
             # Check if already locked
-            if symbol in self.executor.open_positions:
-                if self.executor.open_positions[symbol].get('profit_locked', False):
-                    return False
+            tracked_pos = self.executor.open_positions.get(symbol)
+            if tracked_pos is not None and tracked_pos.get('profit_locked', False):
+                return False
             
             # Only apply to positions with confidence < 75%
             # Try to get confidence from position or executor tracking
             confidence = position.get('confidence', 100)
-            if symbol in self.executor.open_positions:
-                tracked_pos = self.executor.open_positions[symbol]
-                if 'confidence' in tracked_pos:
-                    confidence = tracked_pos['confidence']
+            if tracked_pos is not None:
+                confidence = tracked_pos.get('confidence', confidence)
             if confidence >= 75:
                 return False
             
@@ -699,65 +974,47 @@ class TradingBot:
                 return False
             
             # Execute quick profit lock
-            print(f"\n🔒 Quick profit lock triggered for {symbol} at {pnl_percent:.2f}% profit")
-            print(f"   Original confidence: {confidence}%")
+            self.log.info(f"\n🔒 Quick profit lock triggered for {symbol} at {pnl_percent:.2f}% profit")
+            self.log.info(f"   Original confidence: {confidence}%")
             
             # Close 50% of position
             partial_result = self.executor.close_partial_position(symbol, 0.5)
             
             if partial_result.get('status') != 'SUCCESS':
-                print(f"   ❌ Failed to close partial position: {partial_result.get('message')}")
+                self.log.info(f"   ❌ Failed to close partial position: {partial_result.get('message')}")
                 return False
             
             close_price = partial_result.get('close_price', 0)
             remaining_qty = partial_result.get('remaining_quantity', 0)
-            print(f"   ✅ Closed 50% at price ${close_price:,.2f}, remaining quantity: {remaining_qty}")
+            self.log.info(f"   ✅ Closed 50% at price ${close_price:,.2f}, remaining quantity: {remaining_qty}")
             
             # Update stop loss to entry price (breakeven)
             entry_price = position.get('entry_price', 0)
             side = position.get('side', 'LONG')
-            price_precision = 2
-            
-            try:
-                exchange_info = self.executor.client.futures_exchange_info()
-                symbol_info = next((s for s in exchange_info['symbols'] if s['symbol'] == symbol), None)
-                if symbol_info:
-                    price_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'PRICE_FILTER'), None)
-                    if price_filter:
-                        tick_size = float(price_filter['tickSize'])
-                        price_precision = max(0, len(str(tick_size).rstrip('0').split('.')[-1]))
-            except Exception:
-                pass
+            price_precision = self.executor.get_price_precision(symbol)
             
             sl_result = self.executor.set_stop_loss(
                 symbol, side, entry_price, remaining_qty, 0, price_precision, move_to_breakeven=True
             )
             
             if sl_result:
-                print(f"   ✅ Stop loss moved to breakeven: ${entry_price:,.2f}")
+                self.log.info(f"   ✅ Stop loss moved to breakeven: ${entry_price:,.2f}")
             else:
-                print(f"   ⚠️ Failed to update stop loss to breakeven (partial close still executed)")
+                self.log.info(f"   ⚠️ Failed to update stop loss to breakeven (partial close still executed)")
             
-            # Set profit_locked flag
-            if symbol in self.executor.open_positions:
-                self.executor.open_positions[symbol]['profit_locked'] = True
+            # Set profit_locked flag (looked up again: the partial close may have resynced tracking)
+            tracked_pos = self.executor.open_positions.get(symbol)
+            if tracked_pos is not None:
+                tracked_pos['profit_locked'] = True
             
             return True
             
         except Exception as e:
-            print(f"Error in quick profit lock check for {symbol}: {e}")
+            self.log.info(f"Error in quick profit lock check for {symbol}: {e}")
             return False
 
     def _force_initial_trade_once(self, portfolio, day_number):
-        # Only execute once per process
-        if getattr(self, "_forced_trade_done", False):
-            return
-        from config import (
-            FORCE_INITIAL_TRADE, INITIAL_TRADE_SYMBOL, INITIAL_TRADE_SIDE,
-            INITIAL_TRADE_SIZE_PCT, INITIAL_TRADE_LEVERAGE, MIN_CONFIDENCE
-        )
-        if not FORCE_INITIAL_TRADE:
-            return
+        # Only execute once per process (the caller checks _forced_trade_done and FORCE_INITIAL_TRADE)
         try:
             asset = INITIAL_TRADE_SYMBOL
             decision = {
@@ -780,12 +1037,12 @@ class TradingBot:
                 symbol=asset
             )
             if not is_valid:
-                print(f"⚠️ Forced trade blocked by validation: {msg}")
+                self.log.info(f"⚠️ Forced trade blocked by validation: {msg}")
                 self._forced_trade_done = True
                 return
 
             position_size_dollars = portfolio['total_value'] * size_decimal
-            print(f"\n⚡ FORCED TRADE: {decision['action']} {asset} | size={size_decimal:.1%} ($" \
+            self.log.info(f"\n⚡ FORCED TRADE: {decision['action']} {asset} | size={size_decimal:.1%} ($" \
                   f"{position_size_dollars:,.2f}) lev={INITIAL_TRADE_LEVERAGE}x")
             result = self.executor.execute_trade(
                 asset, decision, position_size_dollars, INITIAL_TRADE_LEVERAGE
@@ -795,13 +1052,11 @@ class TradingBot:
             if result.get('status') == 'SUCCESS':
                 self.logger.log_trade(result)
                 self.risk_manager.total_trades_today += 1
-                updated = self.executor.get_portfolio_status()
-                portfolio.update(updated)
             else:
-                print(f"   ❌ Forced trade failed: {result.get('message')}")
+                self.log.info(f"   ❌ Forced trade failed: {result.get('message')}")
             self._forced_trade_done = True
         except Exception as e:
-            print(f"❌ Forced trade error: {e}")
+            self.log.info(f"❌ Forced trade error: {e}")
             self._forced_trade_done = True
     
     def _print_status(self, portfolio: Dict):
@@ -809,67 +1064,97 @@ class TradingBot:
         metrics = self.logger.calculate_metrics()
         risk_summary = self.risk_manager.get_risk_summary()
         
-        print(f"\n{'='*70}")
-        print(f"📊 STATUS SUMMARY")
-        print(f"{'='*70}")
-        print(f"Portfolio Value:    ${portfolio['total_value']:>15,.2f}")
-        print(f"Total Return:       {metrics['total_return']:>14.2f}%")
-        print(f"Drawdown:           {risk_summary['current_drawdown']:>14.2f}%")
-        print(f"Open Positions:     {portfolio['position_count']:>15d}")
-        print(f"Total Trades:       {metrics['total_trades']:>15d}")
-        print(f"Win Rate:           {metrics['win_rate']:>14.2f}%")
-        print(f"Sharpe Ratio:       {metrics['sharpe_ratio']:>15.2f}")
-        
-        if risk_summary['circuit_breaker_level']:
-            print(f"⚠️  Circuit Breaker:  {risk_summary['circuit_breaker_level']}")
-        
-        print(f"{'='*70}\n")
+        # Built as one block and emitted as a single record
+        lines = [
+            "\n" + _RULE,
+            "📊 STATUS SUMMARY",
+            _RULE,
+            "Portfolio Value:    " + _FMT_MONEY(portfolio['total_value']),
+            "Total Return:       " + _FMT_PCT(metrics['total_return']),
+            "Drawdown:           " + _FMT_PCT(risk_summary['current_drawdown']),
+            "Open Positions:     " + _FMT_INT(portfolio['position_count']),
+            "Total Trades:       " + _FMT_INT(metrics['total_trades']),
+            "Win Rate:           " + _FMT_PCT(metrics['win_rate']),
+            "Sharpe Ratio:       " + _FMT_RATIO(metrics['sharpe_ratio']),
+        ]
+        
+        breaker = risk_summary['circuit_breaker_level']
+        if breaker:
+            lines.append(f"⚠️  Circuit Breaker:  {breaker}")
+        
+        lines.append(_RULE + "\n")
+        self.log.info("\n".join(lines))
     
     def _get_competition_day(self) -> int:
         """Get current day of competition (1-14 or fractional for tests)"""
-        elapsed = datetime.now(timezone.utc) - self.competition_start
+        now = time.monotonic()
+        valid_until, day = self._competition_day
+        if now < valid_until:
+            return day
+        
+        elapsed = now - self._competition_start_mono
         # Calculate fractional day for test runs
-        day = elapsed.total_seconds() / (24 * 3600)
+        day = elapsed / (24 * 3600)
         day = min(day + 1, COMPETITION_DURATION_DAYS + 1)
-        return max(1, int(day))
+        day = max(1, int(day))
+        
+        # The answer holds until the next day starts
+        if day > COMPETITION_DURATION_DAYS:
+            valid_until = float('inf')
+        else:
+            valid_until = self._competition_start_mono + day * 86400
+        self._competition_day = (valid_until, day)
+        return day
     
     def _competition_ended(self) -> bool:
         """Check if competition period has ended"""
-        return datetime.now(timezone.utc) >= self.competition_end
+        return time.monotonic() >= self._competition_end_mono
     
     def shutdown(self):
-        """Graceful shutdown"""
-        print("\n" + "="*70)
-        print("🛑 SHUTTING DOWN TRADING BOT")
-        print("="*70)
+        """Graceful shutdown (runs once; later calls are no-ops)"""
+        if self._shutdown_started:
+            return
+        self._shutdown_started = True
+        
+        self.log.info("\n" + "="*70)
+        self.log.info("🛑 SHUTTING DOWN TRADING BOT")
+        self.log.info("="*70)
         
         self.running = False
+        self._stop_event.set()
+        self._wake_event.set()
+        get_market_stream().stop()
         
         # Close all positions
-        print("\n📊 Closing all open positions...")
+        self.log.info("\n📊 Closing all open positions...")
         self.executor.close_all_positions()
         
         # Generate final report
-        print("\n📈 Generating final report...")
+        self.log.info("\n📈 Generating final report...")
         self.logger.generate_final_report()
+        self.logger.close()
         
-        print("\n✅ Shutdown complete")
-        print("="*70)
+        self.log.info("\n✅ Shutdown complete")
+        self.log.info("="*70)
+        stop_console()
     
     def cleanup(self):
-        """Cleanup function called on exit"""
-        if self.running:
-            self.shutdown()
+        """Cleanup function called on exit - only if the loop did not shut down"""
+        self.shutdown()
 
 
 def main():
     """Main entry point"""
     try:
         bot = TradingBot()
+        # Everything allocated during startup (modules, clients, config) lives for
+        # the whole run - move it out of the collector's generations so periodic
+        # GC passes only walk objects created by the trading cycles
+        gc.freeze()
         bot.run()
     except Exception as e:
+        stop_console()
         print(f"\n❌ Fatal error: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
@@ -2,24 +2,162 @@
 Market Analysis Module - ENHANCED VERSION
 Improved trade setups with multi-confirmation signals and better risk/reward
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 import json
+import math
+import time
+from functools import lru_cache
+from operator import itemgetter
 from analytics.performance_tracker import get_performance_tracker
+from config import SETUP_SCAN_REUSE_SECONDS
+from logger import get_logger
+
+# Regime groups checked by the setup scorers
+BULLISH_REGIMES = frozenset({'STRONG_TREND_UP', 'BREAKOUT_UP'})
+BEARISH_REGIMES = frozenset({'STRONG_TREND_DOWN', 'BREAKOUT_DOWN'})
+SIDEWAYS_REGIMES = frozenset({'RANGING', 'VOLATILE', 'NEUTRAL'})
+BULLISH_MOMENTUM_REGIMES = BULLISH_REGIMES | {'MOMENTUM'}
+BEARISH_MOMENTUM_REGIMES = BEARISH_REGIMES | {'MOMENTUM'}
+UPTREND_OR_NEUTRAL_REGIMES = frozenset({'STRONG_TREND_UP', 'NEUTRAL'})
+DOWNTREND_OR_NEUTRAL_REGIMES = frozenset({'STRONG_TREND_DOWN', 'NEUTRAL'})
+
+
+class IndicatorSnapshot(NamedTuple):
+    """Indicator values the setup scorers read, looked up once per find_trade_setups call"""
+    ema_9: float
+    ema_21: float
+    ema_50: float
+    rsi: float
+    macd_diff: float
+    volume_ratio: float
+    bb_position: float
+    recent_high: float
+    recent_low: float
+    atr: float
+    atr_percent: float
+    price_change_4h: float
+    current_price: float
+    
+    @classmethod
+    def from_indicators(cls, indicators: Dict, price: float) -> 'IndicatorSnapshot':
+        """Read the scorer inputs, with the scorers' defaults for missing keys"""
+        get = indicators.get
+        return cls(
+            ema_9=get('ema_9', 0),
+            ema_21=get('ema_21', 0),
+            ema_50=get('ema_50', 0),
+            rsi=get('rsi', 50),
+            macd_diff=get('macd_diff', 0),
+            volume_ratio=get('volume_ratio', 1),
+            bb_position=get('bb_position', 50),
+            recent_high=get('recent_high', 0),
+            recent_low=get('recent_low', 0),
+            atr=get('atr', 0),
+            atr_percent=get('atr_percent', 0),
+            price_change_4h=get('price_change_4h', 0),
+            current_price=get('current_price', price),
+        )
+
+
+def compact_number(value: float, sig: int = 5) -> str:
+    """
+    Format a number with `sig` significant digits for the LLM prompt
+    (no thousands separators, exponents or trailing zeros - fewer tokens)
+    """
+    if not value:
+        return '0'
+    if not math.isfinite(value):
+        return str(value)  # nan / inf, as plain formatting printed them
+    decimals = max(0, sig - 1 - int(math.floor(math.log10(abs(value)))))
+    text = f"{value:.{decimals}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return text
+
+
+def _expand_reasons(reasons: List) -> List[str]:
+    """
+    Reason strings for a setup the scorer returns. Scorers record formatted reasons as
+    (template, *args) and only the setups that are returned pay for the formatting
+    """
+    return [reason if reason.__class__ is str else reason[0].format(*reason[1:]) for reason in reasons]
+
+
+@lru_cache(maxsize=32)
+def competition_status(day_number: int) -> str:
+    """Closing COMPETITION STATUS / DECISION REQUIRED block of the LLM context (depends only on the day)"""
+    return f"""
+COMPETITION STATUS:
+- Days Remaining: {14 - day_number}
+- Phase: {'🔴 FINAL PUSH' if day_number > 11 else '🟡 MID-GAME' if day_number > 7 else '🟢 EARLY PHASE'}
+- Strategy: {'Maximum aggression needed' if day_number > 11 else 'Balanced risk/reward' if day_number > 7 else 'Building steady foundation'}
+
+DECISION REQUIRED:
+Analyze all signals and provide trading decision in strict JSON format.
+"""
 
 
 class MarketAnalyzer:
     """Analyzes market conditions and generates high-quality trade setups"""
     
     def __init__(self):
-        self.setup_history = []
         self.min_setup_confidence = 70  # Only consider setups with 70%+ confidence
         self.perf_tracker = get_performance_tracker()
+        # (assessment name, strategy, scorer, scorer takes market_data) in evaluation order
+        self._setup_scorers = (
+            ('trend_following', 'TREND_FOLLOWING', self._identify_trend_setup_enhanced, False),
+            ('breakout', 'BREAKOUT', self._identify_breakout_setup_enhanced, True),
+            ('mean_reversion', 'REVERSAL', self._identify_reversal_setup_enhanced, False),
+            ('momentum', 'MOMENTUM', self._identify_momentum_setup_enhanced, True),
+            ('volatility_breakout', 'VOLATILITY_BREAKOUT', self._identify_volatility_breakout, True),
+            ('ema_crossover', 'EMA_CROSSOVER', self._identify_ema_crossover, False),
+        )
+        # symbol -> (monotonic scan time, scan inputs key, indicators copy, market_data last served, setups, assessment)
+        self._last_scan = {}
+        self._fallback_memo = (None, None, None)  # (snapshot, regime, volatility fallback score) of the latest scan
     
     def find_trade_setups(self, market_data: Dict) -> List[Dict]:
         """
         Identify high-probability trade setups with enhanced multi-confirmation logic
         Returns list of potential setups with confidence scores
+        
+        A symbol's latest scan is reused (for up to SETUP_SCAN_REUSE_SECONDS) while its inputs are
+        unchanged: the same indicators, regime and prices, and no trade or cooldown change since
         """
+        if 'error' in market_data or not market_data.get('indicators'):
+            return []
+        
+        symbol = market_data['symbol']
+        indicators = market_data['indicators']
+        key = (
+            market_data['regime'], market_data['price'], market_data.get('price_change_24h', 0),
+            self.perf_tracker.scoring_stamp()
+        )
+        now = time.monotonic()
+        entry = self._last_scan.get(symbol)
+        if (entry is not None and now - entry[0] < SETUP_SCAN_REUSE_SECONDS
+                and entry[1] == key and entry[2] == indicators):
+            if entry[3] is not market_data:
+                # A new poll still gets its assessment record
+                self._log_assessment(entry[5])
+                self._last_scan[symbol] = entry[:3] + (market_data,) + entry[4:]
+            return list(entry[4])
+        
+        setups, assessment = self._scan_setups(market_data)
+        self._log_assessment(assessment)
+        self._last_scan[symbol] = (now, key, dict(indicators), market_data, setups, assessment)
+        return list(setups)
+    
+    @staticmethod
+    def _log_assessment(assessment: Dict):
+        """Write a scan's assessment record (logging failures never block a scan)"""
+        try:
+            get_logger().log_assessment(assessment)
+        except Exception:
+            pass
+    
+    def _scan_setups(self, market_data: Dict) -> tuple:
+        """Run every setup scorer on market_data; returns (setups, assessment)"""
         setups = []
         # Build assessment scaffold
         assessment = {
@@ -31,9 +169,6 @@ class MarketAnalyzer:
             'shortlisted': []
         }
         
-        if 'error' in market_data or not market_data.get('indicators'):
-            return setups
-        
         indicators = market_data['indicators']
         regime = market_data['regime']
         symbol = market_data['symbol']
@@ -46,79 +181,33 @@ class MarketAnalyzer:
             if key in indicators:
                 assessment['indicators_snapshot'][key] = indicators.get(key)
         
-        # Setup 1: Enhanced Trend Following with Multi-Timeframe Confirmation
-        trend_setup = self._identify_trend_setup_enhanced(indicators, regime, symbol, price)
-        assessment['strategy_checks'].append({
-            'name': 'trend_following',
-            'accepted': bool(trend_setup and trend_setup.get('confidence', 0) >= self.min_setup_confidence),
-            'confidence': (trend_setup or {}).get('confidence', 0),
-            'direction': (trend_setup or {}).get('direction'),
-            'reasons': (trend_setup or {}).get('reasons')
-        })
-        if trend_setup and trend_setup['confidence'] >= self.min_setup_confidence:
-            setups.append(trend_setup)
-        
-        # Setup 2: Smart Breakout with Volume Confirmation
-        breakout_setup = self._identify_breakout_setup_enhanced(indicators, regime, symbol, price, market_data)
-        assessment['strategy_checks'].append({
-            'name': 'breakout',
-            'accepted': bool(breakout_setup and breakout_setup.get('confidence', 0) >= self.min_setup_confidence),
-            'confidence': (breakout_setup or {}).get('confidence', 0),
-            'direction': (breakout_setup or {}).get('direction'),
-            'reasons': (breakout_setup or {}).get('reasons')
-        })
-        if breakout_setup and breakout_setup['confidence'] >= self.min_setup_confidence:
-            setups.append(breakout_setup)
-        
-        # Setup 3: Mean Reversion with Divergence Detection
-        reversal_setup = self._identify_reversal_setup_enhanced(indicators, regime, symbol, price)
-        assessment['strategy_checks'].append({
-            'name': 'mean_reversion',
-            'accepted': bool(reversal_setup and reversal_setup.get('confidence', 0) >= self.min_setup_confidence),
-            'confidence': (reversal_setup or {}).get('confidence', 0),
-            'direction': (reversal_setup or {}).get('direction'),
-            'reasons': (reversal_setup or {}).get('reasons')
-        })
-        if reversal_setup and reversal_setup['confidence'] >= self.min_setup_confidence:
-            setups.append(reversal_setup)
-        
-        # Setup 4: Momentum with Trend Alignment
-        momentum_setup = self._identify_momentum_setup_enhanced(indicators, regime, symbol, price, market_data)
-        assessment['strategy_checks'].append({
-            'name': 'momentum',
-            'accepted': bool(momentum_setup and momentum_setup.get('confidence', 0) >= self.min_setup_confidence),
-            'confidence': (momentum_setup or {}).get('confidence', 0),
-            'direction': (momentum_setup or {}).get('direction'),
-            'reasons': (momentum_setup or {}).get('reasons')
-        })
-        if momentum_setup and momentum_setup['confidence'] >= self.min_setup_confidence:
-            setups.append(momentum_setup)
-        
-        # Setup 5: NEW - Volatility Contraction Pattern
-        volatility_setup = self._identify_volatility_breakout(indicators, regime, symbol, price, market_data)
-        assessment['strategy_checks'].append({
-            'name': 'volatility_breakout',
-            'accepted': bool(volatility_setup and volatility_setup.get('confidence', 0) >= self.min_setup_confidence),
-            'confidence': (volatility_setup or {}).get('confidence', 0),
-            'direction': (volatility_setup or {}).get('direction'),
-            'reasons': (volatility_setup or {}).get('reasons')
-        })
-        if volatility_setup and volatility_setup['confidence'] >= self.min_setup_confidence:
-            setups.append(volatility_setup)
-        
-        # Setup 6: NEW - EMA Crossover with Confirmation
-        crossover_setup = self._identify_ema_crossover(indicators, regime, symbol, price)
-        assessment['strategy_checks'].append({
-            'name': 'ema_crossover',
-            'accepted': bool(crossover_setup and crossover_setup.get('confidence', 0) >= self.min_setup_confidence),
-            'confidence': (crossover_setup or {}).get('confidence', 0),
-            'direction': (crossover_setup or {}).get('direction'),
-            'reasons': (crossover_setup or {}).get('reasons')
-        })
-        if crossover_setup and crossover_setup['confidence'] >= self.min_setup_confidence:
-            setups.append(crossover_setup)
+        # Every scorer sees the same inputs; its result is recorded in the assessment
+        snap = IndicatorSnapshot.from_indicators(indicators, price)
+        strategy_checks = assessment['strategy_checks']
+        min_conf = self.min_setup_confidence
+        check_strategy_cooldown = self.perf_tracker.check_strategy_cooldown
+        for name, strategy, scorer, needs_market_data in self._setup_scorers:
+            # A cooling-down strategy yields no setup, so it isn't scored at all
+            if check_strategy_cooldown(strategy)[0]:
+                setup = None
+            elif needs_market_data:
+                setup = scorer(snap, regime, symbol, price, market_data)
+            else:
+                setup = scorer(snap, regime, symbol, price)
+            setup_info = setup or {}
+            confidence = setup_info.get('confidence', 0)
+            accepted = bool(setup) and confidence >= min_conf
+            strategy_checks.append({
+                'name': name,
+                'accepted': accepted,
+                'confidence': confidence,
+                'direction': setup_info.get('direction'),
+                'reasons': setup_info.get('reasons')
+            })
+            if accepted:
+                setups.append(setup)
 
-        # Record shortlisted setups summary in assessment and write
+        # Record shortlisted setups summary in assessment
         assessment['shortlisted'] = [
             {
                 'name': s.get('name'),
@@ -129,15 +218,14 @@ class MarketAnalyzer:
             }
             for s in setups
         ]
-        try:
-            from logger import get_logger
-            get_logger().log_assessment(assessment)
-        except Exception:
-            pass
-        
-        return setups
+        return setups, assessment
+    
+    def get_best_setup(self, market_data: Dict) -> Optional[Dict]:
+        """Highest-confidence setup from find_trade_setups, or None"""
+        setups = self.find_trade_setups(market_data)
+        return max(setups, key=itemgetter('confidence')) if setups else None
     
-    def _identify_trend_setup_enhanced(self, indicators: Dict, regime: str, symbol: str, price: float) -> Optional[Dict]:
+    def _identify_trend_setup_enhanced(self, snap: IndicatorSnapshot, regime: str, symbol: str, price: float) -> Optional[Dict]:
         """
         ENHANCED: Trend-following with multiple confirmation layers
         - EMA alignment (9 > 21 > 50 for uptrend)
@@ -149,138 +237,134 @@ class MarketAnalyzer:
         confidence = 0
         direction = None
         reasons = []
+        add_reason = reasons.append
         stop_loss_pct = 4
         take_profit_pct = 12
         
-        ema_9 = indicators.get('ema_9', 0)
-        ema_21 = indicators.get('ema_21', 0)
-        ema_50 = indicators.get('ema_50', 0)
-        rsi = indicators.get('rsi', 50)
-        macd_diff = indicators.get('macd_diff', 0)
-        volume_ratio = indicators.get('volume_ratio', 1)
+        ema_9 = snap.ema_9
+        ema_21 = snap.ema_21
+        ema_50 = snap.ema_50
+        rsi = snap.rsi
+        macd_diff = snap.macd_diff
+        volume_ratio = snap.volume_ratio
         
         # === BULLISH TREND SETUP ===
-        if regime in ['STRONG_TREND_UP']:
+        if regime == 'STRONG_TREND_UP':
             # Core trend confirmation
             confidence += 25
             direction = 'LONG'
-            reasons.append("✓ Strong uptrend regime detected")
+            add_reason("✓ Strong uptrend regime detected")
             
             # Check EMA alignment (bullish stack)
             if ema_9 > ema_21 > ema_50:
                 confidence += 20
-                reasons.append("✓ Perfect EMA alignment (9>21>50)")
+                add_reason("✓ Perfect EMA alignment (9>21>50)")
             elif ema_9 > ema_21:
                 confidence += 10
-                reasons.append("✓ Short-term EMA alignment")
+                add_reason("✓ Short-term EMA alignment")
             
             # Price position relative to EMAs
             if price > ema_9 and price > ema_21:
                 confidence += 15
-                reasons.append("✓ Price trading above key EMAs")
+                add_reason("✓ Price trading above key EMAs")
             
             # RSI health check (avoid overbought)
             if 50 < rsi < 70:
                 confidence += 15
-                reasons.append(f"✓ RSI in healthy bullish zone ({rsi:.1f})")
+                add_reason(("✓ RSI in healthy bullish zone ({:.1f})", rsi))
             elif 45 < rsi <= 50:
                 confidence += 8
-                reasons.append(f"✓ RSI neutral-bullish ({rsi:.1f})")
+                add_reason(("✓ RSI neutral-bullish ({:.1f})", rsi))
             elif rsi >= 70:
                 confidence -= 10
-                reasons.append(f"⚠ RSI overbought ({rsi:.1f})")
+                add_reason(("⚠ RSI overbought ({:.1f})", rsi))
             
             # MACD momentum confirmation
             if macd_diff > 0:
                 confidence += 15
-                reasons.append("✓ MACD bullish crossover confirmed")
+                add_reason("✓ MACD bullish crossover confirmed")
                 if macd_diff > 0.1:
                     confidence += 5
-                    reasons.append("✓ Strong MACD momentum")
+                    add_reason("✓ Strong MACD momentum")
             else:
                 confidence -= 8
-                reasons.append("⚠ MACD bearish (conflicting signal)")
+                add_reason("⚠ MACD bearish (conflicting signal)")
             
             # Volume validation
             if volume_ratio > 1.3:
                 confidence += 10
-                reasons.append(f"✓ High volume confirmation ({volume_ratio:.2f}x)")
+                add_reason(("✓ High volume confirmation ({:.2f}x)", volume_ratio))
             elif volume_ratio < 0.8:
                 confidence -= 5
-                reasons.append("⚠ Below-average volume")
+                add_reason("⚠ Below-average volume")
             
             # Adjust stop loss and take profit for trending markets
             stop_loss_pct = 3.5
             take_profit_pct = 15
         
         # === BEARISH TREND SETUP ===
-        elif regime in ['STRONG_TREND_DOWN']:
+        elif regime == 'STRONG_TREND_DOWN':
             # Core trend confirmation
             confidence += 25
             direction = 'SHORT'
-            reasons.append("✓ Strong downtrend regime detected")
+            add_reason("✓ Strong downtrend regime detected")
             
             # Check EMA alignment (bearish stack)
             if ema_9 < ema_21 < ema_50:
                 confidence += 20
-                reasons.append("✓ Perfect EMA alignment (9<21<50)")
+                add_reason("✓ Perfect EMA alignment (9<21<50)")
             elif ema_9 < ema_21:
                 confidence += 10
-                reasons.append("✓ Short-term EMA bearish")
+                add_reason("✓ Short-term EMA bearish")
             
             # Price position relative to EMAs
             if price < ema_9 and price < ema_21:
                 confidence += 15
-                reasons.append("✓ Price trading below key EMAs")
+                add_reason("✓ Price trading below key EMAs")
             
             # RSI health check (avoid oversold)
             if 30 < rsi < 50:
                 confidence += 15
-                reasons.append(f"✓ RSI in healthy bearish zone ({rsi:.1f})")
+                add_reason(("✓ RSI in healthy bearish zone ({:.1f})", rsi))
             elif 50 < rsi <= 55:
                 confidence += 8
-                reasons.append(f"✓ RSI neutral-bearish ({rsi:.1f})")
+                add_reason(("✓ RSI neutral-bearish ({:.1f})", rsi))
             elif rsi <= 30:
                 confidence -= 10
-                reasons.append(f"⚠ RSI oversold ({rsi:.1f})")
+                add_reason(("⚠ RSI oversold ({:.1f})", rsi))
             
             # MACD momentum confirmation
             if macd_diff < 0:
                 confidence += 15
-                reasons.append("✓ MACD bearish crossover confirmed")
+                add_reason("✓ MACD bearish crossover confirmed")
                 if macd_diff < -0.1:
                     confidence += 5
-                    reasons.append("✓ Strong MACD bearish momentum")
+                    add_reason("✓ Strong MACD bearish momentum")
             else:
                 confidence -= 8
-                reasons.append("⚠ MACD bullish (conflicting signal)")
+                add_reason("⚠ MACD bullish (conflicting signal)")
             
             # Volume validation
             if volume_ratio > 1.3:
                 confidence += 10
-                reasons.append(f"✓ High volume confirmation ({volume_ratio:.2f}x)")
+                add_reason(("✓ High volume confirmation ({:.2f}x)", volume_ratio))
             elif volume_ratio < 0.8:
                 confidence -= 5
-                reasons.append("⚠ Below-average volume")
+                add_reason("⚠ Below-average volume")
             
             # Adjust stop loss and take profit
             stop_loss_pct = 3.5
             take_profit_pct = 15
         
-        # Check strategy cooldown
-        is_cooldown, cooldown_reason = self.perf_tracker.check_strategy_cooldown('TREND_FOLLOWING')
-        if is_cooldown:
-            return None
-        
         # Apply adaptive strategy boost
         boost_data = self.perf_tracker.calculate_strategy_boost('TREND_FOLLOWING')
         boost = boost_data['boost']
         if boost != 0:
             confidence += boost
             if boost > 0:
-                reasons.append(f"✓ Strategy boost +{boost} ({boost_data['reason']})")
+                add_reason(("✓ Strategy boost +{} ({})", boost, boost_data['reason']))
             else:
-                reasons.append(f"⚠ Strategy penalty {boost} ({boost_data['reason']})")
+                add_reason(("⚠ Strategy penalty {} ({})", boost, boost_data['reason']))
         
         min_conf_local = 55 if regime == 'VOLATILE' else 70
         if confidence >= min_conf_local and direction:
@@ -292,43 +376,17 @@ class MarketAnalyzer:
                 'entry_price': price,
                 'stop_loss_percent': stop_loss_pct,
                 'take_profit_percent': take_profit_pct,
-                'reasons': reasons,
+                'reasons': _expand_reasons(reasons),
                 'strategy': 'TREND_FOLLOWING'  # Tag for tracking
             }
         
         # Volatility fallback scoring to avoid zero-confidence in VOLATILE
-        try:
-            atr = indicators.get('atr', 0)
-            current_price = indicators.get('current_price', price)
-            atr_ratio = (atr / current_price) if current_price else 0
-            volume = indicators.get('volume_ratio', 1.0)
-            base_conf = 0
-            if atr_ratio > 0.008:
-                base_conf += min(40, int(atr_ratio * 4000))
-            if volume > 1.2:
-                base_conf += min(25, int((volume - 1.0) * 25))
-            if regime == 'VOLATILE':
-                base_conf += 20
-            if rsi < 35 or rsi > 65:
-                base_conf += 15
-            min_conf = 55 if regime == 'VOLATILE' else 70
-            if base_conf >= min_conf:
-                inferred_dir = 'LONG' if rsi < 50 else 'SHORT'
-                return {
-                    'type': 'TREND_FOLLOWING_VOL_FALLBACK',
-                    'symbol': symbol,
-                    'direction': inferred_dir,
-                    'confidence': min(95, base_conf),
-                    'entry_price': price,
-                    'stop_loss_percent': stop_loss_pct,
-                    'take_profit_percent': take_profit_pct,
-                    'reasons': reasons + [f"Vol fallback ATR:{atr_ratio:.2%} Vol:{volume:.1f}x RSI:{rsi:.0f}"]
-                }
-        except Exception:
-            pass
-        return None
+        return self._volatility_fallback_setup(
+            'TREND_FOLLOWING_VOL_FALLBACK', snap, regime, symbol, price,
+            stop_loss_pct, take_profit_pct, reasons
+        )
     
-    def _identify_breakout_setup_enhanced(self, indicators: Dict, regime: str, symbol: str, price: float, market_data: Dict) -> Optional[Dict]:
+    def _identify_breakout_setup_enhanced(self, snap: IndicatorSnapshot, regime: str, symbol: str, price: float, market_data: Dict) -> Optional[Dict]:
         """
         ENHANCED: Breakout detection with volume and momentum confirmation
         - Price breaking key levels (resistance/support)
@@ -339,111 +397,107 @@ class MarketAnalyzer:
         confidence = 0
         direction = None
         reasons = []
+        add_reason = reasons.append
         stop_loss_pct = 4.5
         take_profit_pct = 18
         
-        bb_position = indicators.get('bb_position', 50)
-        recent_high = indicators.get('recent_high', 0)
-        recent_low = indicators.get('recent_low', 0)
-        volume_ratio = indicators.get('volume_ratio', 1)
-        rsi = indicators.get('rsi', 50)
+        bb_position = snap.bb_position
+        recent_high = snap.recent_high
+        recent_low = snap.recent_low
+        volume_ratio = snap.volume_ratio
+        rsi = snap.rsi
         price_change_24h = market_data.get('price_change_24h', 0)
-        atr_percent = indicators.get('atr_percent', 0)
+        atr_percent = snap.atr_percent
         
         # === BULLISH BREAKOUT ===
-        if regime in ['BREAKOUT_UP'] or (bb_position > 90 and volume_ratio > 1.5):
+        if regime == 'BREAKOUT_UP' or (bb_position > 90 and volume_ratio > 1.5):
             confidence += 30
             direction = 'LONG'
-            reasons.append("✓ Bullish breakout pattern detected")
+            add_reason("✓ Bullish breakout pattern detected")
             
             # Volume spike confirmation (critical for breakouts)
             if volume_ratio > 2.0:
                 confidence += 25
-                reasons.append(f"✓ Massive volume spike ({volume_ratio:.2f}x) - strong conviction")
+                add_reason(("✓ Massive volume spike ({:.2f}x) - strong conviction", volume_ratio))
             elif volume_ratio > 1.5:
                 confidence += 15
-                reasons.append(f"✓ Strong volume ({volume_ratio:.2f}x)")
+                add_reason(("✓ Strong volume ({:.2f}x)", volume_ratio))
             else:
                 confidence -= 15
-                reasons.append("⚠ Insufficient volume for valid breakout")
+                add_reason("⚠ Insufficient volume for valid breakout")
             
             # Price breaking recent high
             if price > recent_high * 0.998:
                 confidence += 20
-                reasons.append("✓ Breaking above recent high resistance")
+                add_reason("✓ Breaking above recent high resistance")
             
             # RSI momentum check
             if 55 < rsi < 75:
                 confidence += 15
-                reasons.append(f"✓ RSI shows strong momentum ({rsi:.1f})")
+                add_reason(("✓ RSI shows strong momentum ({:.1f})", rsi))
             elif rsi >= 75:
                 confidence -= 10
-                reasons.append(f"⚠ RSI extremely overbought ({rsi:.1f})")
+                add_reason(("⚠ RSI extremely overbought ({:.1f})", rsi))
             
             # 24-hour performance validation
             if price_change_24h > 4:
                 confidence += 10
-                reasons.append(f"✓ Strong 24h momentum ({price_change_24h:+.1f}%)")
+                add_reason(("✓ Strong 24h momentum ({:+.1f}%)", price_change_24h))
             
             # Bollinger Band upper break
             if bb_position > 95:
                 confidence += 8
-                reasons.append("✓ Breaking above upper Bollinger Band")
+                add_reason("✓ Breaking above upper Bollinger Band")
             
             # Volatility expansion (breakouts need expansion)
             if atr_percent > 3:
                 confidence += 7
-                reasons.append(f"✓ Volatility expanding ({atr_percent:.1f}%)")
+                add_reason(("✓ Volatility expanding ({:.1f}%)", atr_percent))
         
         # === BEARISH BREAKDOWN ===
-        elif regime in ['BREAKOUT_DOWN'] or (bb_position < 10 and volume_ratio > 1.5):
+        elif regime == 'BREAKOUT_DOWN' or (bb_position < 10 and volume_ratio > 1.5):
             confidence += 30
             direction = 'SHORT'
-            reasons.append("✓ Bearish breakdown pattern detected")
+            add_reason("✓ Bearish breakdown pattern detected")
             
             # Volume spike confirmation
             if volume_ratio > 2.0:
                 confidence += 25
-                reasons.append(f"✓ Massive volume spike ({volume_ratio:.2f}x)")
+                add_reason(("✓ Massive volume spike ({:.2f}x)", volume_ratio))
             elif volume_ratio > 1.5:
                 confidence += 15
-                reasons.append(f"✓ Strong volume ({volume_ratio:.2f}x)")
+                add_reason(("✓ Strong volume ({:.2f}x)", volume_ratio))
             else:
                 confidence -= 15
-                reasons.append("⚠ Insufficient volume for valid breakdown")
+                add_reason("⚠ Insufficient volume for valid breakdown")
             
             # Price breaking recent low
             if price < recent_low * 1.002:
                 confidence += 20
-                reasons.append("✓ Breaking below recent low support")
+                add_reason("✓ Breaking below recent low support")
             
             # RSI momentum check
             if 25 < rsi < 45:
                 confidence += 15
-                reasons.append(f"✓ RSI shows strong bearish momentum ({rsi:.1f})")
+                add_reason(("✓ RSI shows strong bearish momentum ({:.1f})", rsi))
             elif rsi <= 25:
                 confidence -= 10
-                reasons.append(f"⚠ RSI extremely oversold ({rsi:.1f})")
+                add_reason(("⚠ RSI extremely oversold ({:.1f})", rsi))
             
             # 24-hour performance validation
             if price_change_24h < -4:
                 confidence += 10
-                reasons.append(f"✓ Strong 24h bearish momentum ({price_change_24h:.1f}%)")
+                add_reason(("✓ Strong 24h bearish momentum ({:.1f}%)", price_change_24h))
             
             # Bollinger Band lower break
             if bb_position < 5:
                 confidence += 8
-                reasons.append("✓ Breaking below lower Bollinger Band")
+                add_reason("✓ Breaking below lower Bollinger Band")
             
             # Volatility expansion
             if atr_percent > 3:
                 confidence += 7
-                reasons.append(f"✓ Volatility expanding ({atr_percent:.1f}%)")
-        
-        # Check strategy cooldown
-        is_cooldown, cooldown_reason = self.perf_tracker.check_strategy_cooldown('BREAKOUT')
-        if is_cooldown:
-            return None
+                add_reason(("✓ Volatility expanding ({:.1f}%)", atr_percent))
         
         # Apply adaptive strategy boost
         boost_data = self.perf_tracker.calculate_strategy_boost('BREAKOUT')
@@ -451,11 +505,11 @@ class MarketAnalyzer:
         if boost != 0:
             confidence += boost
             if boost > 0:
-                reasons.append(f"✓ Strategy boost +{boost} ({boost_data['reason']})")
+                add_reason(("✓ Strategy boost +{} ({})", boost, boost_data['reason']))
             else:
-                reasons.append(f"⚠ Strategy penalty {boost} ({boost_data['reason']})")
+                add_reason(("⚠ Strategy penalty {} ({})", boost, boost_data['reason']))
         
-        min_conf_local = 55 if (market_data.get('regime') == 'VOLATILE') else 70
+        min_conf_local = 55 if (regime == 'VOLATILE') else 70
         if confidence >= min_conf_local and direction:
             return {
                 'type': 'BREAKOUT_ENHANCED',
@@ -465,44 +519,17 @@ class MarketAnalyzer:
                 'entry_price': price,
                 'stop_loss_percent': stop_loss_pct,
                 'take_profit_percent': take_profit_pct,
-                'reasons': reasons,
+                'reasons': _expand_reasons(reasons),
                 'strategy': 'BREAKOUT'  # Tag for tracking
             }
         
-        # Volatility fallback scoring
-        try:
-            atr = indicators.get('atr', 0)
-            current_price = indicators.get('current_price', price)
-            atr_ratio = (atr / current_price) if current_price else 0
-            volume = indicators.get('volume_ratio', 1.0)
-            rsi = indicators.get('rsi', 50)
-            base_conf = 0
-            if atr_ratio > 0.008:
-                base_conf += min(40, int(atr_ratio * 4000))
-            if volume > 1.2:
-                base_conf += min(25, int((volume - 1.0) * 25))
-            if regime == 'VOLATILE':
-                base_conf += 20
-            if rsi < 35 or rsi > 65:
-                base_conf += 15
-            min_conf = 55 if regime == 'VOLATILE' else 70
-            if base_conf >= min_conf:
-                inferred_dir = 'LONG' if rsi < 50 else 'SHORT'
-                return {
-                    'type': 'BREAKOUT_VOL_FALLBACK',
-                    'symbol': symbol,
-                    'direction': inferred_dir,
-                    'confidence': min(95, base_conf),
-                    'entry_price': price,
-                    'stop_loss_percent': stop_loss_pct,
-                    'take_profit_percent': take_profit_pct,
-                    'reasons': reasons + [f"Vol fallback ATR:{atr_ratio:.2%} Vol:{volume:.1f}x RSI:{rsi:.0f}"]
-                }
-        except Exception:
-            pass
-        return None
+        # Volatility fallback scoring to avoid zero-confidence in VOLATILE
+        return self._volatility_fallback_setup(
+            'BREAKOUT_VOL_FALLBACK', snap, regime, symbol, price,
+            stop_loss_pct, take_profit_pct, reasons
+        )
     
-    def _identify_reversal_setup_enhanced(self, indicators: Dict, regime: str, symbol: str, price: float) -> Optional[Dict]:
+    def _identify_reversal_setup_enhanced(self, snap: IndicatorSnapshot, regime: str, symbol: str, price: float) -> Optional[Dict]:
         """
         ENHANCED: Mean reversion with divergence detection
         - Extreme RSI levels with recovery signs
@@ -513,93 +540,89 @@ class MarketAnalyzer:
         confidence = 0
         direction = None
         reasons = []
+        add_reason = reasons.append
         stop_loss_pct = 5
         take_profit_pct = 10
         
-        rsi = indicators.get('rsi', 50)
-        bb_position = indicators.get('bb_position', 50)
-        macd_diff = indicators.get('macd_diff', 0)
-        ema_9 = indicators.get('ema_9', 0)
-        ema_21 = indicators.get('ema_21', 0)
+        rsi = snap.rsi
+        bb_position = snap.bb_position
+        macd_diff = snap.macd_diff
+        ema_9 = snap.ema_9
+        ema_21 = snap.ema_21
         
         # === BULLISH REVERSAL (Buy the Dip) ===
         if rsi < 35 and bb_position < 25:
             confidence += 35
             direction = 'LONG'
-            reasons.append(f"✓ Oversold conditions (RSI: {rsi:.1f}, BB: {bb_position:.0f}%)")
+            add_reason(("✓ Oversold conditions (RSI: {:.1f}, BB: {:.0f}%)", rsi, bb_position))
             
             # Extreme oversold bonus
             if rsi < 25:
                 confidence += 15
-                reasons.append("✓ Extremely oversold - high reversal probability")
+                add_reason("✓ Extremely oversold - high reversal probability")
             
             # MACD showing early reversal signs
             if macd_diff > -0.05:
                 confidence += 20
-                reasons.append("✓ MACD divergence - momentum weakening")
+                add_reason("✓ MACD divergence - momentum weakening")
             elif macd_diff > 0:
                 confidence += 25
-                reasons.append("✓ MACD bullish crossover - reversal confirmed")
+                add_reason("✓ MACD bullish crossover - reversal confirmed")
             
             # Price near lower Bollinger Band
             if bb_position < 15:
                 confidence += 15
-                reasons.append("✓ Price at extreme lower band - reversion likely")
+                add_reason("✓ Price at extreme lower band - reversion likely")
             
             # Make sure we're not fighting a strong downtrend
-            if regime in ['STRONG_TREND_DOWN', 'BREAKOUT_DOWN']:
+            if regime in BEARISH_REGIMES:
                 confidence -= 25
-                reasons.append("⚠ Strong downtrend active - risky reversal")
-            elif regime in ['RANGING', 'VOLATILE', 'NEUTRAL']:
+                add_reason("⚠ Strong downtrend active - risky reversal")
+            elif regime in SIDEWAYS_REGIMES:
                 confidence += 10
-                reasons.append("✓ No strong trend - good reversal environment")
+                add_reason("✓ No strong trend - good reversal environment")
             
             # EMA support check
             if price < ema_21 * 0.97:
                 confidence += 8
-                reasons.append("✓ Price well below EMA - rubber band effect")
+                add_reason("✓ Price well below EMA - rubber band effect")
         
         # === BEARISH REVERSAL (Sell the Rally) ===
         elif rsi > 65 and bb_position > 75:
             confidence += 35
             direction = 'SHORT'
-            reasons.append(f"✓ Overbought conditions (RSI: {rsi:.1f}, BB: {bb_position:.0f}%)")
+            add_reason(("✓ Overbought conditions (RSI: {:.1f}, BB: {:.0f}%)", rsi, bb_position))
             
             # Extreme overbought bonus
             if rsi > 75:
                 confidence += 15
-                reasons.append("✓ Extremely overbought - high reversal probability")
+                add_reason("✓ Extremely overbought - high reversal probability")
             
             # MACD showing early reversal signs
             if macd_diff < 0.05:
                 confidence += 20
-                reasons.append("✓ MACD divergence - momentum weakening")
+                add_reason("✓ MACD divergence - momentum weakening")
             elif macd_diff < 0:
                 confidence += 25
-                reasons.append("✓ MACD bearish crossover - reversal confirmed")
+                add_reason("✓ MACD bearish crossover - reversal confirmed")
             
             # Price near upper Bollinger Band
             if bb_position > 85:
                 confidence += 15
-                reasons.append("✓ Price at extreme upper band - reversion likely")
+                add_reason("✓ Price at extreme upper band - reversion likely")
             
             # Make sure we're not fighting a strong uptrend
-            if regime in ['STRONG_TREND_UP', 'BREAKOUT_UP']:
+            if regime in BULLISH_REGIMES:
                 confidence -= 25
-                reasons.append("⚠ Strong uptrend active - risky reversal")
-            elif regime in ['RANGING', 'VOLATILE', 'NEUTRAL']:
+                add_reason("⚠ Strong uptrend active - risky reversal")
+            elif regime in SIDEWAYS_REGIMES:
                 confidence += 10
-                reasons.append("✓ No strong trend - good reversal environment")
+                add_reason("✓ No strong trend - good reversal environment")
             
             # EMA resistance check
             if price > ema_21 * 1.03:
                 confidence += 8
-                reasons.append("✓ Price well above EMA - rubber band effect")
-        
-        # Check strategy cooldown
-        is_cooldown, cooldown_reason = self.perf_tracker.check_strategy_cooldown('REVERSAL')
-        if is_cooldown:
-            return None
+                add_reason("✓ Price well above EMA - rubber band effect")
         
         # Apply adaptive strategy boost
         boost_data = self.perf_tracker.calculate_strategy_boost('REVERSAL')
@@ -607,9 +630,9 @@ class MarketAnalyzer:
         if boost != 0:
             confidence += boost
             if boost > 0:
-                reasons.append(f"✓ Strategy boost +{boost} ({boost_data['reason']})")
+                add_reason(("✓ Strategy boost +{} ({})", boost, boost_data['reason']))
             else:
-                reasons.append(f"⚠ Strategy penalty {boost} ({boost_data['reason']})")
+                add_reason(("⚠ Strategy penalty {} ({})", boost, boost_data['reason']))
         
         min_conf_local = 55 if regime == 'VOLATILE' else 70
         if confidence >= min_conf_local and direction:
@@ -621,43 +644,17 @@ class MarketAnalyzer:
                 'entry_price': price,
                 'stop_loss_percent': stop_loss_pct,
                 'take_profit_percent': take_profit_pct,
-                'reasons': reasons,
+                'reasons': _expand_reasons(reasons),
                 'strategy': 'REVERSAL'  # Tag for tracking
             }
         
-        # Volatility fallback scoring
-        try:
-            atr = indicators.get('atr', 0)
-            current_price = indicators.get('current_price', price)
-            atr_ratio = (atr / current_price) if current_price else 0
-            volume = indicators.get('volume_ratio', 1.0)
-            base_conf = 0
-            if atr_ratio > 0.008:
-                base_conf += min(40, int(atr_ratio * 4000))
-            if volume > 1.2:
-                base_conf += min(25, int((volume - 1.0) * 25))
-            if regime == 'VOLATILE':
-                base_conf += 20
-            if rsi < 35 or rsi > 65:
-                base_conf += 15
-            min_conf = 55 if regime == 'VOLATILE' else 70
-            if base_conf >= min_conf:
-                inferred_dir = 'LONG' if rsi < 50 else 'SHORT'
-                return {
-                    'type': 'REVERSAL_VOL_FALLBACK',
-                    'symbol': symbol,
-                    'direction': inferred_dir,
-                    'confidence': min(92, base_conf),
-                    'entry_price': price,
-                    'stop_loss_percent': stop_loss_pct,
-                    'take_profit_percent': take_profit_pct,
-                    'reasons': reasons + [f"Vol fallback ATR:{atr_ratio:.2%} Vol:{volume:.1f}x RSI:{rsi:.0f}"]
-                }
-        except Exception:
-            pass
-        return None
+        # Volatility fallback scoring to avoid zero-confidence in VOLATILE
+        return self._volatility_fallback_setup(
+            'REVERSAL_VOL_FALLBACK', snap, regime, symbol, price,
+            stop_loss_pct, take_profit_pct, reasons, max_conf=92
+        )
     
-    def _identify_momentum_setup_enhanced(self, indicators: Dict, regime: str, symbol: str, price: float, market_data: Dict) -> Optional[Dict]:
+    def _identify_momentum_setup_enhanced(self, snap: IndicatorSnapshot, regime: str, symbol: str, price: float, market_data: Dict) -> Optional[Dict]:
         """
         ENHANCED: Momentum trading with trend alignment
         - Strong price momentum (>5% moves)
@@ -668,65 +665,61 @@ class MarketAnalyzer:
         confidence = 0
         direction = None
         reasons = []
+        add_reason = reasons.append
         stop_loss_pct = 4
         take_profit_pct = 16
         
-        price_change_4h = indicators.get('price_change_4h', 0)
+        price_change_4h = snap.price_change_4h
         price_change_24h = market_data.get('price_change_24h', 0)
-        rsi = indicators.get('rsi', 50)
-        volume_ratio = indicators.get('volume_ratio', 1)
-        macd_diff = indicators.get('macd_diff', 0)
+        rsi = snap.rsi
+        volume_ratio = snap.volume_ratio
+        macd_diff = snap.macd_diff
         
         # === BULLISH MOMENTUM ===
         if price_change_4h > 3 and price_change_24h > 5:
             confidence += 30
             direction = 'LONG'
-            reasons.append(f"✓ Strong upward momentum ({price_change_24h:.1f}% / 24h)")
+            add_reason(("✓ Strong upward momentum ({:.1f}% / 24h)", price_change_24h))
             
             # Extreme momentum bonus
             if price_change_24h > 10:
                 confidence += 20
-                reasons.append("✓ Exceptional momentum - continuation likely")
+                add_reason("✓ Exceptional momentum - continuation likely")
             elif price_change_24h > 7:
                 confidence += 10
-                reasons.append("✓ Very strong momentum")
+                add_reason("✓ Very strong momentum")
             
             # RSI sustainability check
             if 55 < rsi < 75:
                 confidence += 20
-                reasons.append(f"✓ RSI sustainable momentum zone ({rsi:.1f})")
+                add_reason(("✓ RSI sustainable momentum zone ({:.1f})", rsi))
             elif rsi >= 75:
                 confidence -= 15
-                reasons.append(f"⚠ RSI too high - momentum may exhaust ({rsi:.1f})")
+                add_reason(("⚠ RSI too high - momentum may exhaust ({:.1f})", rsi))
             
             # Volume confirmation crucial for momentum
             if volume_ratio > 2.0:
                 confidence += 20
-                reasons.append(f"✓ Massive volume surge ({volume_ratio:.2f}x)")
+                add_reason(("✓ Massive volume surge ({:.2f}x)", volume_ratio))
             elif volume_ratio > 1.5:
                 confidence += 12
-                reasons.append(f"✓ Strong volume ({volume_ratio:.2f}x)")
+                add_reason(("✓ Strong volume ({:.2f}x)", volume_ratio))
             else:
                 confidence -= 10
-                reasons.append("⚠ Weak volume - momentum questionable")
+                add_reason("⚠ Weak volume - momentum questionable")
             
             # MACD trend alignment
             if macd_diff > 0.1:
                 confidence += 12
-                reasons.append("✓ MACD strongly bullish - aligned")
+                add_reason("✓ MACD strongly bullish - aligned")
             
             # Regime alignment
-            if regime in ['STRONG_TREND_UP', 'BREAKOUT_UP', 'MOMENTUM']:
+            if regime in BULLISH_MOMENTUM_REGIMES:
                 confidence += 15
-                reasons.append("✓ Regime aligned with momentum")
+                add_reason("✓ Regime aligned with momentum")
             else:
                 confidence -= 8
-                reasons.append("⚠ Regime not aligned")
-        
-        # Check strategy cooldown
-        is_cooldown, cooldown_reason = self.perf_tracker.check_strategy_cooldown('MOMENTUM')
-        if is_cooldown:
-            return None
+                add_reason("⚠ Regime not aligned")
         
         # Apply adaptive strategy boost
         boost_data = self.perf_tracker.calculate_strategy_boost('MOMENTUM')
@@ -734,57 +727,57 @@ class MarketAnalyzer:
         if boost != 0:
             confidence += boost
             if boost > 0:
-                reasons.append(f"✓ Strategy boost +{boost} ({boost_data['reason']})")
+                add_reason(("✓ Strategy boost +{} ({})", boost, boost_data['reason']))
             else:
-                reasons.append(f"⚠ Strategy penalty {boost} ({boost_data['reason']})")
+                add_reason(("⚠ Strategy penalty {} ({})", boost, boost_data['reason']))
         
         # === BEARISH MOMENTUM ===
         elif price_change_4h < -3 and price_change_24h < -5:
             confidence += 30
             direction = 'SHORT'
-            reasons.append(f"✓ Strong downward momentum ({price_change_24h:.1f}% / 24h)")
+            add_reason(("✓ Strong downward momentum ({:.1f}% / 24h)", price_change_24h))
             
             # Extreme momentum bonus
             if price_change_24h < -10:
                 confidence += 20
-                reasons.append("✓ Exceptional bearish momentum")
+                add_reason("✓ Exceptional bearish momentum")
             elif price_change_24h < -7:
                 confidence += 10
-                reasons.append("✓ Very strong bearish momentum")
+                add_reason("✓ Very strong bearish momentum")
             
             # RSI sustainability check
             if 25 < rsi < 45:
                 confidence += 20
-                reasons.append(f"✓ RSI sustainable bearish zone ({rsi:.1f})")
+                add_reason(("✓ RSI sustainable bearish zone ({:.1f})", rsi))
             elif rsi <= 25:
                 confidence -= 15
-                reasons.append(f"⚠ RSI too low - momentum may reverse ({rsi:.1f})")
+                add_reason(("⚠ RSI too low - momentum may reverse ({:.1f})", rsi))
             
             # Volume confirmation
             if volume_ratio > 2.0:
                 confidence += 20
-                reasons.append(f"✓ Massive volume surge ({volume_ratio:.2f}x)")
+                add_reason(("✓ Massive volume surge ({:.2f}x)", volume_ratio))
             elif volume_ratio > 1.5:
                 confidence += 12
-                reasons.append(f"✓ Strong volume ({volume_ratio:.2f}x)")
+                add_reason(("✓ Strong volume ({:.2f}x)", volume_ratio))
             else:
                 confidence -= 10
-                reasons.append("⚠ Weak volume - momentum questionable")
+                add_reason("⚠ Weak volume - momentum questionable")
             
             # MACD trend alignment
             if macd_diff < -0.1:
                 confidence += 12
-                reasons.append("✓ MACD strongly bearish - aligned")
+                add_reason("✓ MACD strongly bearish - aligned")
             
             # Regime alignment
-            if regime in ['STRONG_TREND_DOWN', 'BREAKOUT_DOWN', 'MOMENTUM']:
+            if regime in BEARISH_MOMENTUM_REGIMES:
                 confidence += 15
-                reasons.append("✓ Regime aligned with momentum")
+                add_reason("✓ Regime aligned with momentum")
             else:
                 confidence -= 8
-                reasons.append("⚠ Regime not aligned")
+                add_reason("⚠ Regime not aligned")
         
-        min_conf_local = 55 if (market_data.get('regime') == 'VOLATILE') else 70
+        min_conf_local = 55 if (regime == 'VOLATILE') else 70
         if confidence >= min_conf_local and direction:
             return {
                 'type': 'MOMENTUM_ENHANCED',
@@ -794,44 +787,17 @@ class MarketAnalyzer:
                 'entry_price': price,
                 'stop_loss_percent': stop_loss_pct,
                 'take_profit_percent': take_profit_pct,
-                'reasons': reasons,
+                'reasons': _expand_reasons(reasons),
                 'strategy': 'MOMENTUM'  # Tag for tracking
             }
         
-        # Volatility fallback scoring
-        try:
-            atr = indicators.get('atr', 0)
-            current_price = indicators.get('current_price', price)
-            atr_ratio = (atr / current_price) if current_price else 0
-            volume = indicators.get('volume_ratio', 1.0)
-            rsi = indicators.get('rsi', 50)
-            base_conf = 0
-            if atr_ratio > 0.008:
-                base_conf += min(40, int(atr_ratio * 4000))
-            if volume > 1.2:
-                base_conf += min(25, int((volume - 1.0) * 25))
-            if market_data.get('regime') == 'VOLATILE':
-                base_conf += 20
-            if rsi < 35 or rsi > 65:
-                base_conf += 15
-            min_conf = 55 if market_data.get('regime') == 'VOLATILE' else 70
-            if base_conf >= min_conf:
-                inferred_dir = 'LONG' if rsi < 50 else 'SHORT'
-                return {
-                    'type': 'MOMENTUM_VOL_FALLBACK',
-                    'symbol': symbol,
-                    'direction': inferred_dir,
-                    'confidence': min(95, base_conf),
-                    'entry_price': price,
-                    'stop_loss_percent': stop_loss_pct,
-                    'take_profit_percent': take_profit_pct,
-                    'reasons': reasons + [f"Vol fallback ATR:{atr_ratio:.2%} Vol:{volume:.1f}x RSI:{rsi:.0f}"]
-                }
-        except Exception:
-            pass
-        return None
+        # Volatility fallback scoring to avoid zero-confidence in VOLATILE
+        return self._volatility_fallback_setup(
+            'MOMENTUM_VOL_FALLBACK', snap, regime, symbol, price,
+            stop_loss_pct, take_profit_pct, reasons
+        )
     
-    def _identify_volatility_breakout(self, indicators: Dict, regime: str, symbol: str, price: float, market_data: Dict) -> Optional[Dict]:
+    def _identify_volatility_breakout(self, snap: IndicatorSnapshot, regime: str, symbol: str, price: float, market_data: Dict) -> Optional[Dict]:
         """
         BALANCED: Volatility trading with quality filters
         - Core volatility scoring (ATR-based)
@@ -839,51 +805,47 @@ class MarketAnalyzer:
         - Quality filters (RSI extremes, volume, trend alignment)
         """
         # Extract indicators
-        atr = indicators.get('atr', 0)
+        atr = snap.atr
         atr_ratio = atr / price if price else 0
-        volume = indicators.get('volume_ratio', 1.0)
-        rsi = indicators.get('rsi', 50)
-        ema_21 = indicators.get('ema_21', price)
+        volume = snap.volume_ratio
+        rsi = snap.rsi
+        ema_21 = snap.ema_21 or price
         stop_loss_pct = 4
         take_profit_pct = 14
         
         confidence = 0
         reasons = []
+        add_reason = reasons.append
         
         # Core volatility (0-50 points)
         if atr_ratio > 0.004:  # >0.4% ATR
             atr_score = min(50, int(atr_ratio * 10000))
             confidence += atr_score
-            reasons.append(f"✓ Volatility high (ATR {atr_ratio:.2%}) -> +{atr_score}")
+            add_reason(("✓ Volatility high (ATR {:.2%}) -> +{}", atr_ratio, atr_score))
         
         # Regime boost (0-20 points)
         if regime == 'VOLATILE':
             confidence += 20
-            reasons.append("✓ VOLATILE regime -> +20")
+            add_reason("✓ VOLATILE regime -> +20")
         
         # Quality filters (0-30 points total)
         # RSI extremes = mean reversion opportunity
         if rsi < 35:
             confidence += 15
-            reasons.append(f"✓ Oversold RSI ({rsi:.1f}) -> +15")
+            add_reason(("✓ Oversold RSI ({:.1f}) -> +15", rsi))
         elif rsi > 65:
             confidence += 15
-            reasons.append(f"✓ Overbought RSI ({rsi:.1f}) -> +15")
+            add_reason(("✓ Overbought RSI ({:.1f}) -> +15", rsi))
         
         # Volume confirmation
         if volume > 1.3:
             confidence += 10
-            reasons.append(f"✓ Volume confirmation ({volume:.2f}x) -> +10")
+            add_reason(("✓ Volume confirmation ({:.2f}x) -> +10", volume))
         
         # Trend alignment
         if (price < ema_21 and rsi < 45) or (price > ema_21 and rsi > 55):
             confidence += 5
-            reasons.append("✓ Trend alignment -> +5")
-        
-        # Check strategy cooldown
-        is_cooldown, cooldown_reason = self.perf_tracker.check_strategy_cooldown('VOLATILITY_BREAKOUT')
-        if is_cooldown:
-            return None
+            add_reason("✓ Trend alignment -> +5")
         
         # Apply adaptive strategy boost
         boost_data = self.perf_tracker.calculate_strategy_boost('VOLATILITY_BREAKOUT')
@@ -891,9 +853,9 @@ class MarketAnalyzer:
         if boost != 0:
             confidence += boost
             if boost > 0:
-                reasons.append(f"✓ Strategy boost +{boost} ({boost_data['reason']})")
+                add_reason(("✓ Strategy boost +{} ({})", boost, boost_data['reason']))
             else:
-                reasons.append(f"⚠ Strategy penalty {boost} ({boost_data['reason']})")
+                add_reason(("⚠ Strategy penalty {} ({})", boost, boost_data['reason']))
         
         # Lower threshold for VOLATILE to capture BTC
         min_conf = 65 if regime == 'VOLATILE' else 75
@@ -908,13 +870,13 @@ class MarketAnalyzer:
                 'entry_price': price,
                 'stop_loss_percent': stop_loss_pct,
                 'take_profit_percent': take_profit_pct,
-                'reasons': reasons,
+                'reasons': _expand_reasons(reasons),
                 'strategy': 'VOLATILITY_BREAKOUT'  # Tag for tracking
             }
         
         return None
     
-    def _identify_ema_crossover(self, indicators: Dict, regime: str, symbol: str, price: float) -> Optional[Dict]:
+    def _identify_ema_crossover(self, snap: IndicatorSnapshot, regime: str, symbol: str, price: float) -> Optional[Dict]:
         """
         NEW SETUP: EMA crossover with confirmation
         - EMA 9 crossing EMA 21
@@ -924,15 +886,16 @@ class MarketAnalyzer:
         confidence = 0
         direction = None
         reasons = []
+        add_reason = reasons.append
         stop_loss_pct = 3.5
         take_profit_pct = 12
         
-        ema_9 = indicators.get('ema_9', 0)
-        ema_21 = indicators.get('ema_21', 0)
-        ema_50 = indicators.get('ema_50', 0)
-        macd_diff = indicators.get('macd_diff', 0)
-        rsi = indicators.get('rsi', 50)
-        volume_ratio = indicators.get('volume_ratio', 1)
+        ema_9 = snap.ema_9
+        ema_21 = snap.ema_21
+        ema_50 = snap.ema_50
+        macd_diff = snap.macd_diff
+        rsi = snap.rsi
+        volume_ratio = snap.volume_ratio
         
         # Calculate proximity to crossover
         ema_diff_pct = ((ema_9 - ema_21) / ema_21) * 100
@@ -941,58 +904,53 @@ class MarketAnalyzer:
         if 0 < ema_diff_pct < 0.5 and price > ema_9:
             confidence += 35
             direction = 'LONG'
-            reasons.append("✓ Bullish EMA crossover in progress (9 > 21)")
+            add_reason("✓ Bullish EMA crossover in progress (9 > 21)")
             
             if macd_diff > 0:
                 confidence += 20
-                reasons.append("✓ MACD confirms bullish momentum")
+                add_reason("✓ MACD confirms bullish momentum")
             
             if ema_21 > ema_50:
                 confidence += 15
-                reasons.append("✓ Longer-term trend also bullish")
+                add_reason("✓ Longer-term trend also bullish")
             
             if 50 < rsi < 65:
                 confidence += 12
-                reasons.append(f"✓ RSI in optimal range ({rsi:.1f})")
+                add_reason(("✓ RSI in optimal range ({:.1f})", rsi))
             
             if volume_ratio > 1.2:
                 confidence += 10
-                reasons.append("✓ Volume supporting move")
+                add_reason("✓ Volume supporting move")
             
-            if regime in ['STRONG_TREND_UP', 'NEUTRAL']:
+            if regime in UPTREND_OR_NEUTRAL_REGIMES:
                 confidence += 8
-                reasons.append("✓ Favorable market regime")
+                add_reason("✓ Favorable market regime")
         
         # Bearish crossover (9 crossing below 21)
         elif -0.5 < ema_diff_pct < 0 and price < ema_9:
             confidence += 35
             direction = 'SHORT'
-            reasons.append("✓ Bearish EMA crossover in progress (9 < 21)")
+            add_reason("✓ Bearish EMA crossover in progress (9 < 21)")
             
             if macd_diff < 0:
                 confidence += 20
-                reasons.append("✓ MACD confirms bearish momentum")
+                add_reason("✓ MACD confirms bearish momentum")
             
             if ema_21 < ema_50:
                 confidence += 15
-                reasons.append("✓ Longer-term trend also bearish")
+                add_reason("✓ Longer-term trend also bearish")
             
             if 35 < rsi < 50:
                 confidence += 12
-                reasons.append(f"✓ RSI in optimal range ({rsi:.1f})")
+                add_reason(("✓ RSI in optimal range ({:.1f})", rsi))
             
             if volume_ratio > 1.2:
                 confidence += 10
-                reasons.append("✓ Volume supporting move")
+                add_reason("✓ Volume supporting move")
             
-            if regime in ['STRONG_TREND_DOWN', 'NEUTRAL']:
+            if regime in DOWNTREND_OR_NEUTRAL_REGIMES:
                 confidence += 8
-                reasons.append("✓ Favorable market regime")
-        
-        # Check strategy cooldown
-        is_cooldown, cooldown_reason = self.perf_tracker.check_strategy_cooldown('EMA_CROSSOVER')
-        if is_cooldown:
-            return None
+                add_reason("✓ Favorable market regime")
         
         # Apply adaptive strategy boost
         boost_data = self.perf_tracker.calculate_strategy_boost('EMA_CROSSOVER')
@@ -1000,9 +958,9 @@ class MarketAnalyzer:
         if boost != 0:
             confidence += boost
             if boost > 0:
-                reasons.append(f"✓ Strategy boost +{boost} ({boost_data['reason']})")
+                add_reason(("✓ Strategy boost +{} ({})", boost, boost_data['reason']))
             else:
-                reasons.append(f"⚠ Strategy penalty {boost} ({boost_data['reason']})")
+                add_reason(("⚠ Strategy penalty {} ({})", boost, boost_data['reason']))
         
         min_conf_local = 55 if regime == 'VOLATILE' else 70
         if confidence >= min_conf_local and direction:
@@ -1014,17 +972,56 @@ class MarketAnalyzer:
                 'entry_price': price,
                 'stop_loss_percent': stop_loss_pct,
                 'take_profit_percent': take_profit_pct,
-                'reasons': reasons,
+                'reasons': _expand_reasons(reasons),
                 'strategy': 'EMA_CROSSOVER'  # Tag for tracking
             }
         
-        # Volatility fallback scoring
+        # Volatility fallback scoring to avoid zero-confidence in VOLATILE
+        return self._volatility_fallback_setup(
+            'EMA_CROSSOVER_VOL_FALLBACK', snap, regime, symbol, price,
+            stop_loss_pct, take_profit_pct, reasons, max_conf=92
+        )
+    
+    def _volatility_fallback_setup(self, setup_type: str, snap: IndicatorSnapshot, regime: str, symbol: str,
+                                   price: float, stop_loss_pct: float, take_profit_pct: float,
+                                   reasons: List[str], max_conf: int = 95) -> Optional[Dict]:
+        """
+        Shared fallback for the setup scorers: score volatility, volume and RSI extremes alone
+        Returns a setup of setup_type if that score clears the regime's threshold, else None
+        """
+        # The score depends only on the snapshot and regime - computed once per scan, not per scorer
+        memo = self._fallback_memo
+        if memo[0] is snap and memo[1] == regime:
+            score = memo[2]
+        else:
+            score = self._volatility_fallback_score(snap, regime)
+            self._fallback_memo = (snap, regime, score)
+        if score is None:
+            return None
+        base_conf, direction, note = score
+        try:
+            return {
+                'type': setup_type,
+                'symbol': symbol,
+                'direction': direction,
+                'confidence': min(max_conf, base_conf),
+                'entry_price': price,
+                'stop_loss_percent': stop_loss_pct,
+                'take_profit_percent': take_profit_pct,
+                'reasons': _expand_reasons(reasons) + [note]
+            }
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _volatility_fallback_score(snap: IndicatorSnapshot, regime: str) -> Optional[tuple]:
+        """(confidence, direction, reason) of the volatility fallback, or None if it stays below the regime's threshold"""
         try:
-            atr = indicators.get('atr', 0)
-            current_price = indicators.get('current_price', price)
+            atr = snap.atr
+            current_price = snap.current_price
             atr_ratio = (atr / current_price) if current_price else 0
-            volume = indicators.get('volume_ratio', 1.0)
-            rsi = indicators.get('rsi', 50)
+            volume = snap.volume_ratio
+            rsi = snap.rsi
             base_conf = 0
             if atr_ratio > 0.008:
                 base_conf += min(40, int(atr_ratio * 4000))
@@ -1036,17 +1033,11 @@ class MarketAnalyzer:
                 base_conf += 15
             min_conf = 55 if regime == 'VOLATILE' else 70
             if base_conf >= min_conf:
-                inferred_dir = 'LONG' if rsi < 50 else 'SHORT'
-                return {
-                    'type': 'EMA_CROSSOVER_VOL_FALLBACK',
-                    'symbol': symbol,
-                    'direction': inferred_dir,
-                    'confidence': min(92, base_conf),
-                    'entry_price': price,
-                    'stop_loss_percent': stop_loss_pct,
-                    'take_profit_percent': take_profit_pct,
-                    'reasons': reasons + [f"Vol fallback ATR:{atr_ratio:.2%} Vol:{volume:.1f}x RSI:{rsi:.0f}"]
-                }
+                return (
+                    base_conf,
+                    'LONG' if rsi < 50 else 'SHORT',
+                    f"Vol fallback ATR:{atr_ratio:.2%} Vol:{volume:.1f}x RSI:{rsi:.0f}"
+                )
         except Exception:
             pass
         return None
@@ -1086,7 +1077,7 @@ class MarketAnalyzer:
                 exit_confidence += 35
                 reasons.append("⚠ Bearish MACD crossover + weak RSI - trend reversing")
             
-            if regime in ['STRONG_TREND_DOWN', 'BREAKOUT_DOWN']:
+            if regime in BEARISH_REGIMES:
                 exit_confidence += 30
                 reasons.append("⚠ Market regime turned bearish")
             
@@ -1099,7 +1090,7 @@ class MarketAnalyzer:
                 exit_confidence += 35
                 reasons.append("⚠ Bullish MACD crossover + strong RSI - trend reversing")
             
-            if regime in ['STRONG_TREND_UP', 'BREAKOUT_UP']:
+            if regime in BULLISH_REGIMES:
                 exit_confidence += 30
                 reasons.append("⚠ Market regime turned bullish")
             
@@ -1159,12 +1150,13 @@ class MarketAnalyzer:
         price = market_data.get('price', 0)
         regime = market_data.get('regime', 'UNKNOWN')
         indicators = market_data.get('indicators', {})
+        ind_get = indicators.get
         
         # Find best setups
         setups = self.find_trade_setups(market_data)
         
         # Sort by confidence
-        setups_sorted = sorted(setups, key=lambda x: x['confidence'], reverse=True)
+        setups_sorted = sorted(setups, key=itemgetter('confidence'), reverse=True)
         best_setup = setups_sorted[0] if setups_sorted else None
         
         # Portfolio status
@@ -1175,62 +1167,64 @@ class MarketAnalyzer:
         position_count = len(open_positions)
         
         # Check if we already have a position in this symbol
-        existing_position = None
-        for pos in open_positions:
-            if pos.get('symbol') == symbol:
-                existing_position = pos
-                break
-        
-        # Build context
-        context = f"""
+        positions_by_symbol = portfolio.get('positions_by_symbol')
+        if positions_by_symbol is not None:
+            symbol_positions = positions_by_symbol.get(symbol)
+            existing_position = symbol_positions[0] if symbol_positions else None
+        else:
+            existing_position = next((pos for pos in open_positions if pos.get('symbol') == symbol), None)
+        
+        # Build context from parts joined once at the end
+        parts = [f"""
 TRADING DAY: {day_number}/14
 
 ASSET: {symbol}
-Current Price: ${price:,.2f}
+Current Price: ${compact_number(price)}
 24h Change: {market_data.get('price_change_24h', 0):+.2f}%
 Market Regime: {regime}
 
 TECHNICAL INDICATORS:
-- RSI: {indicators.get('rsi', 0):.1f}
-- MACD: {'Bullish' if indicators.get('macd_diff', 0) > 0 else 'Bearish'} (diff: {indicators.get('macd_diff', 0):.4f})
-- EMA9: ${indicators.get('ema_9', 0):.2f} | EMA21: ${indicators.get('ema_21', 0):.2f} | EMA50: ${indicators.get('ema_50', 0):.2f}
-- Bollinger Position: {indicators.get('bb_position', 50):.0f}% (0=bottom, 100=top)
-- Volume Ratio: {indicators.get('volume_ratio', 1):.2f}x average
-- ATR: {indicators.get('atr_percent', 0):.2f}% (volatility)
-- Recent High: ${indicators.get('recent_high', 0):,.2f} | Low: ${indicators.get('recent_low', 0):,.2f}
+- RSI: {ind_get('rsi', 0):.1f}
+- MACD: {'Bullish' if ind_get('macd_diff', 0) > 0 else 'Bearish'} (diff: {compact_number(ind_get('macd_diff', 0), 3)})
+- EMA9: ${compact_number(ind_get('ema_9', 0))} | EMA21: ${compact_number(ind_get('ema_21', 0))} | EMA50: ${compact_number(ind_get('ema_50', 0))}
+- Bollinger Position: {ind_get('bb_position', 50):.0f}% (0=bottom, 100=top)
+- Volume Ratio: {ind_get('volume_ratio', 1):.2f}x average
+- ATR: {ind_get('atr_percent', 0):.2f}% (volatility)
+- Recent High: ${compact_number(ind_get('recent_high', 0))} | Low: ${compact_number(ind_get('recent_low', 0))}
 
 ENHANCED TRADE ANALYSIS:
-"""
+"""]
         
         if best_setup:
-            context += f"""
+            parts.append(f"""
 🎯 PRIMARY SETUP: {best_setup['type']}
    Direction: {best_setup['direction']}
    Confidence: {best_setup['confidence']:.0f}%
-   Entry: ${best_setup['entry_price']:,.2f}
+   Entry: ${compact_number(best_setup['entry_price'])}
    Stop Loss: {best_setup.get('stop_loss_percent', 4):.1f}%
    Take Profit: {best_setup.get('take_profit_percent', 12):.1f}%
    
    Signal Reasons:
-"""
-            for reason in best_setup['reasons']:
-                context += f"   {reason}\n"
+""")
+            parts.extend(f"   {reason}\n" for reason in best_setup['reasons'])
             
             # Show additional setups if available
             if len(setups_sorted) > 1:
-                context += f"\n📋 ALTERNATIVE SETUPS ({len(setups_sorted)-1} found):\n"
-                for i, setup in enumerate(setups_sorted[1:3], 1):  # Show top 2 alternatives
-                    context += f"   {i}. {setup['type']}: {setup['direction']} ({setup['confidence']:.0f}%)\n"
+                parts.append(f"\n📋 ALTERNATIVE SETUPS ({len(setups_sorted)-1} found):\n")
+                parts.extend(
+                    f"   {i}. {setup['type']}: {setup['direction']} ({setup['confidence']:.0f}%)\n"
+                    for i, setup in enumerate(setups_sorted[1:3], 1)  # Show top 2 alternatives
+                )
         else:
-            context += "❌ No high-confidence setups identified (all below 70% threshold)\n"
+            parts.append("❌ No high-confidence setups identified (all below 70% threshold)\n")
         
-        context += f"""
+        parts.append(f"""
 PORTFOLIO STATUS:
-- Total Value: ${portfolio_value:,.2f}
-- Available Balance: ${available_balance:,.2f}
+- Total Value: ${portfolio_value:.0f}
+- Available Balance: ${available_balance:.0f}
 - Current Drawdown: {drawdown:.1f}%
 - Open Positions: {position_count}/3
-"""
+""")
         
         if existing_position:
             # Check if position should be exited
@@ -1243,29 +1237,21 @@ PORTFOLIO STATUS:
             exit_conf = exit_signal.get('exit_confidence', 0)
             exit_action = exit_signal.get('exit_action', 'NONE')
             
-            context += f"""
+            parts.append(f"""
 📊 EXISTING POSITION IN {symbol}:
    Side: {existing_position.get('side')}
-   Entry: ${existing_position.get('entry_price', 0):,.2f}
+   Entry: ${compact_number(existing_position.get('entry_price', 0))}
    Current PnL: {existing_position.get('pnl_percent', 0):+.2f}%
    Leverage: {existing_position.get('leverage')}x
    
    Exit Analysis: {'🔴 SUGGEST ' + exit_action if should_exit else '🟢 HOLD'}
    Exit Confidence: {exit_conf}%
    Reason: {exit_reason}
-"""
+""")
         
-        context += f"""
-COMPETITION STATUS:
-- Days Remaining: {14 - day_number}
-- Phase: {'🔴 FINAL PUSH' if day_number > 11 else '🟡 MID-GAME' if day_number > 7 else '🟢 EARLY PHASE'}
-- Strategy: {'Maximum aggression needed' if day_number > 11 else 'Balanced risk/reward' if day_number > 7 else 'Building steady foundation'}
-
-DECISION REQUIRED:
-Analyze all signals and provide trading decision in strict JSON format.
-"""
+        parts.append(competition_status(day_number))
         
-        return context
+        return "".join(parts)
 
 
 # Singleton instance
@@ -0,0 +1,126 @@
+"""
+Market Data Stream
+Keeps the latest 24h ticker and candles per symbol from the Binance futures
+WebSocket, so the trading loop reads prices from memory instead of polling
+REST, and reports candle closes so the loop can act on them right away
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from config import (
+    BINANCE_API_KEY, BINANCE_API_SECRET, MARKET_STREAM_MAX_AGE_SECONDS, STREAM_KLINE_INTERVAL
+)
+from logger import get_console
+
+
+class MarketDataStream:
+    """Background WebSocket subscription holding the latest ticker per symbol"""
+
+    # Stream field -> REST futures_ticker field, so consumers see one shape
+    TICKER_FIELDS = {
+        'c': 'lastPrice',
+        'h': 'highPrice',
+        'l': 'lowPrice',
+        'v': 'volume',
+        'q': 'quoteVolume',
+        'P': 'priceChangePercent',
+    }
+
+    def __init__(self):
+        self.log = get_console('trading_bot.stream')
+        self._latest = {}  # symbol -> (monotonic receive time, ticker dict)
+        self._klines = {}  # symbol -> (monotonic receive time, last closed kline, latest kline)
+        self._lock = threading.Lock()
+        self._manager = None
+        self._on_bar_close = None
+        self._last_closed_bar = 0  # open time (ms) of the latest candle reported closed
+
+    def start(self, symbols: List[str], on_bar_close: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Subscribe to <symbol>@ticker and <symbol>@kline_<STREAM_KLINE_INTERVAL> for every symbol
+        on_bar_close: called from the stream thread whenever one of those candles closes
+        Returns False if the stream could not start
+        """
+        if self._manager is not None:
+            return True
+        self._on_bar_close = on_bar_close
+        try:
+            from binance import ThreadedWebsocketManager
+            manager = ThreadedWebsocketManager(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=True)
+            manager.start()
+            manager.start_futures_multiplex_socket(
+                callback=self._on_message,
+                streams=[
+                    stream
+                    for symbol in symbols
+                    for stream in (f"{symbol.lower()}@ticker", f"{symbol.lower()}@kline_{STREAM_KLINE_INTERVAL}")
+                ]
+            )
+            self._manager = manager
+            self.log.info(f"📡 Market stream started for {len(symbols)} symbol(s)")
+            return True
+        except Exception as e:
+            self.log.info(f"⚠️  Market stream unavailable, using REST polling: {e}")
+            return False
+
+    def stop(self):
+        """Close the WebSocket connection"""
+        manager, self._manager = self._manager, None
+        if manager is not None:
+            try:
+                manager.stop()
+            except Exception as e:
+                self.log.info(f"Error stopping market stream: {e}")
+
+    def _on_message(self, msg: Dict):
+        """Store a ticker or kline frame under its symbol, reporting closed candles (runs on the stream thread)"""
+        data = msg.get('data', msg)
+        event = data.get('e')
+        if event == 'kline':
+            kline = data['k']
+            with self._lock:
+                closed = self._klines.get(data['s'], (0, None, None))[1]
+                self._klines[data['s']] = (time.monotonic(), kline if kline['x'] else closed, kline)
+            # Every symbol's candle closes at the same boundary - report it once
+            if kline['x'] and kline['t'] > self._last_closed_bar:
+                self._last_closed_bar = kline['t']
+                if self._on_bar_close is not None:
+                    self._on_bar_close()
+            return
+        if event != '24hrTicker':
+            return
+        ticker = {'symbol': data['s']}
+        for stream_field, rest_field in self.TICKER_FIELDS.items():
+            ticker[rest_field] = data[stream_field]
+        with self._lock:
+            self._latest[data['s']] = (time.monotonic(), ticker)
+
+    def get_ticker(self, symbol: str, max_age: float = MARKET_STREAM_MAX_AGE_SECONDS) -> Optional[Dict]:
+        """Latest ticker for symbol, or None if none arrived within max_age seconds"""
+        with self._lock:
+            entry = self._latest.get(symbol)
+        if entry is None or time.monotonic() - entry[0] > max_age:
+            return None
+        return entry[1]
+    
+    def get_klines(self, symbol: str, max_age: float = MARKET_STREAM_MAX_AGE_SECONDS) -> Optional[Tuple[Optional[Dict], Dict]]:
+        """
+        (last closed kline or None, latest kline) of STREAM_KLINE_INTERVAL for symbol in the
+        stream's raw format, or None if no kline arrived within max_age seconds
+        """
+        with self._lock:
+            entry = self._klines.get(symbol)
+        if entry is None or time.monotonic() - entry[0] > max_age:
+            return None
+        return entry[1], entry[2]
+
+
+# Global market stream instance
+_stream_instance = None
+
+def get_market_stream() -> MarketDataStream:
+    """Get or create market stream instance"""
+    global _stream_instance
+    if _stream_instance is None:
+        _stream_instance = MarketDataStream()
+    return _stream_instance
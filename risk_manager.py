@@ -2,7 +2,7 @@
 Risk Management System
 Handles position sizing, circuit breakers, drawdown monitoring, and risk limits
 """
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from config import (
     INITIAL_CAPITAL, MAX_DRAWDOWN, MAX_LEVERAGE, MAX_POSITION_SIZE,
@@ -10,9 +10,17 @@ from config import (
     ENABLE_VOLATILITY_TRADING, SCALP_POSITION_SIZE,
     BASE_LEVERAGE, HIGH_CONFIDENCE_LEVERAGE, LEVERAGE_THRESHOLD,
     MAX_POSITIONS_PER_SYMBOL, MAX_CORRELATED_POSITIONS, MAX_PORTFOLIO_RISK,
-    HIGH_CONFIDENCE_SIZE, MEDIUM_CONFIDENCE_SIZE, LOW_CONFIDENCE_SIZE
+    HIGH_CONFIDENCE_SIZE, MEDIUM_CONFIDENCE_SIZE, LOW_CONFIDENCE_SIZE,
+    HIGH_CONFIDENCE_POSITION_SIZE, MEDIUM_CONFIDENCE_POSITION_SIZE,
+    LOW_CONFIDENCE_POSITION_SIZE
 )
 
+# Symbols that move together and share the MAX_CORRELATED_POSITIONS limit
+CORRELATED_SYMBOLS = ('BTCUSDT', 'ETHUSDT', 'SOLUSDT')
+
+# Margin needed by the smallest order we place ($100 pyramid floor at max leverage)
+MIN_ENTRY_MARGIN = 100 / MAX_LEVERAGE
+
 # Strategy-specific leverage mapping
 STRATEGY_LEVERAGE = {
     'TREND_FOLLOWING': 4,
@@ -38,14 +46,18 @@ class RiskManager:
         self.total_trades_today = 0
         self.last_reset_date = datetime.now(timezone.utc).date()
     
-    def check_circuit_breakers(self) -> Tuple[bool, str]:
+    def check_circuit_breakers(self, now: Optional[datetime] = None) -> Tuple[bool, str]:
         """
         Check if any circuit breakers are triggered
+        Parameters:
+            now: Cycle timestamp (UTC); read from the clock when omitted
         Returns: (can_trade, reason)
         """
+        now = now or datetime.now(timezone.utc)
+        
         # Check if we're in a circuit breaker pause period
-        if self.circuit_breaker_until and datetime.now(timezone.utc) < self.circuit_breaker_until:
-            remaining = (self.circuit_breaker_until - datetime.now(timezone.utc)).total_seconds() / 3600
+        if self.circuit_breaker_until and now < self.circuit_breaker_until:
+            remaining = (self.circuit_breaker_until - now).total_seconds() / 3600
             return False, f"Circuit breaker active for {remaining:.1f} more hours"
         
         # Level 4: Emergency stop (38% drawdown)
@@ -57,7 +69,7 @@ class RiskManager:
         if self.current_drawdown >= CIRCUIT_BREAKERS['LEVEL_3']['drawdown']:
             self.circuit_breaker_level = 'LEVEL_3'
             if self.circuit_breaker_until is None:
-                self.circuit_breaker_until = datetime.now(timezone.utc) + timedelta(hours=24)
+                self.circuit_breaker_until = now + timedelta(hours=24)
                 return False, "CRITICAL: Drawdown ≥35% - 24h trading pause initiated"
             return True, "CRITICAL MODE: Extreme caution required"
         
@@ -65,7 +77,7 @@ class RiskManager:
         if self.current_drawdown >= CIRCUIT_BREAKERS['LEVEL_2']['drawdown']:
             self.circuit_breaker_level = 'LEVEL_2'
             if self.circuit_breaker_until is None:
-                self.circuit_breaker_until = datetime.now(timezone.utc) + timedelta(hours=12)
+                self.circuit_breaker_until = now + timedelta(hours=12)
                 return False, "DEFENSIVE MODE: Drawdown ≥30% - 12h trading pause"
             return True, "DEFENSIVE MODE: Reduced risk only"
         
@@ -100,14 +112,6 @@ class RiskManager:
             strategy_type: Strategy type (TREND_FOLLOWING, MOMENTUM, BREAKOUT, etc.)
         Returns: dict with 'size' (dollar amount), 'leverage', and 'size_percent'
         """
-        from config import (
-            HIGH_CONFIDENCE_POSITION_SIZE, 
-            MEDIUM_CONFIDENCE_POSITION_SIZE, 
-            LOW_CONFIDENCE_POSITION_SIZE,
-            MAX_LEVERAGE,
-            CIRCUIT_BREAKERS
-        )
-        
         # Get regime from market_data
         regime = market_data.get('regime', 'UNKNOWN') if market_data else 'UNKNOWN'
         
@@ -162,8 +166,6 @@ class RiskManager:
         Returns:
             int: Final leverage (1-5x)
         """
-        from config import MAX_LEVERAGE
-        
         # Get base leverage from strategy type (default to 2x if unknown)
         base = STRATEGY_LEVERAGE.get(strategy_type, 2) if strategy_type else 2
         
@@ -264,8 +266,8 @@ class RiskManager:
         leverage = max(1, min(leverage, MAX_LEVERAGE))
         return leverage
     
-    def update_portfolio_metrics(self, current_portfolio_value: float):
-        """Update risk metrics based on current portfolio value"""
+    def update_portfolio_metrics(self, current_portfolio_value: float, now: Optional[datetime] = None):
+        """Update risk metrics based on current portfolio value (now: cycle timestamp, UTC)"""
         self.current_value = current_portfolio_value
         
         # Update peak value
@@ -276,7 +278,7 @@ class RiskManager:
         self.current_drawdown = (self.peak_value - current_portfolio_value) / self.peak_value
         
         # Reset daily metrics if new day
-        current_date = datetime.now(timezone.utc).date()
+        current_date = (now or datetime.now(timezone.utc)).date()
         if current_date > self.last_reset_date:
             self.daily_start_value = current_portfolio_value
             self.total_trades_today = 0
@@ -315,7 +317,7 @@ class RiskManager:
         
         # Check max positions
         open_positions = len(portfolio.get('positions', []))
-        if open_positions >= MAX_OPEN_POSITIONS and decision['action'] in ['LONG', 'SHORT']:
+        if open_positions >= MAX_OPEN_POSITIONS and decision['action'] in {'LONG', 'SHORT'}:
             return False, f"Max positions ({MAX_OPEN_POSITIONS}) already open"
         
         # Get symbol (from parameter or extract from decision/portfolio)
@@ -324,18 +326,24 @@ class RiskManager:
             symbol = decision.get('symbol') or portfolio.get('positions', [{}])[0].get('symbol') if portfolio.get('positions') else None
         
         # Portfolio risk validation (only for new LONG/SHORT trades)
-        if decision['action'] in ['LONG', 'SHORT'] and symbol:
+        if decision['action'] in {'LONG', 'SHORT'} and symbol:
             positions = portfolio.get('positions', [])
             
+            # Symbol index built by the executor; rebuilt for hand-made portfolios
+            positions_by_symbol = portfolio.get('positions_by_symbol')
+            if positions_by_symbol is None:
+                positions_by_symbol = {}
+                for p in positions:
+                    positions_by_symbol.setdefault(p.get('symbol'), []).append(p)
+            
             # Check 1: No pyramiding (max 1 position per symbol)
-            existing_symbol_positions = [p for p in positions if p.get('symbol') == symbol]
+            existing_symbol_positions = positions_by_symbol.get(symbol, [])
             if len(existing_symbol_positions) >= MAX_POSITIONS_PER_SYMBOL:
                 return False, f"Symbol {symbol} already has {len(existing_symbol_positions)} position(s) (max {MAX_POSITIONS_PER_SYMBOL})"
             
             # Check 2: Correlation limits (max 3 correlated crypto positions)
-            crypto_symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
-            crypto_positions = [p for p in positions if p.get('symbol') in crypto_symbols]
-            if symbol in crypto_symbols and len(crypto_positions) >= MAX_CORRELATED_POSITIONS:
+            crypto_positions = sum(len(positions_by_symbol.get(s, [])) for s in CORRELATED_SYMBOLS)
+            if symbol in CORRELATED_SYMBOLS and crypto_positions >= MAX_CORRELATED_POSITIONS:
                 return False, f"Max correlated crypto positions ({MAX_CORRELATED_POSITIONS}) already open"
             
             # Check 3: Total portfolio risk
@@ -383,6 +391,27 @@ class RiskManager:
         # All validations passed
         return True, "Trade validated"
     
+    def precheck_new_entry(self, portfolio: Dict, symbol: str) -> Tuple[bool, str]:
+        """
+        Decision-independent checks from validate_trade for a new position,
+        cheap enough to run before asking the LLM
+        Returns: (may_open, reason)
+        """
+        if len(portfolio.get('positions', [])) >= MAX_OPEN_POSITIONS:
+            return False, f"Max positions ({MAX_OPEN_POSITIONS}) already open"
+        
+        if symbol in CORRELATED_SYMBOLS:
+            positions_by_symbol = portfolio.get('positions_by_symbol', {})
+            crypto_positions = sum(len(positions_by_symbol.get(s, [])) for s in CORRELATED_SYMBOLS)
+            if crypto_positions >= MAX_CORRELATED_POSITIONS:
+                return False, f"Max correlated crypto positions ({MAX_CORRELATED_POSITIONS}) already open"
+        
+        available_balance = portfolio.get('available_balance', 0)
+        if available_balance < MIN_ENTRY_MARGIN:
+            return False, f"Insufficient margin (have ${available_balance:,.2f}, need ${MIN_ENTRY_MARGIN:,.2f})"
+        
+        return True, "OK"
+    
     def emergency_shutdown(self):
         """Emergency shutdown - close all positions and halt trading"""
         self.circuit_breaker_level = 'LEVEL_4'
@@ -187,6 +187,31 @@ class TestDeepSeekAgent:
         decision = agent.get_fallback_decision(market_data, portfolio)
         assert decision['action'] == 'CLOSE'
 
+    
+    def test_decision_cache_key(self):
+        """Test decision cache key discretizes small market moves"""
+        market_data = {
+            'symbol': 'BTCUSDT',
+            'price': 98234.5,
+            'regime': 'TRENDING',
+            'indicators': {'rsi': 55.2}
+        }
+        portfolio = {'positions': []}
+        
+        key = DeepSeekAgent._decision_cache_key(market_data, portfolio, 1)
+        
+        # Sub-0.1% price move and RSI noise map to the same key
+        nudged = dict(market_data, price=98240.0, indicators={'rsi': 54.8})
+        assert DeepSeekAgent._decision_cache_key(nudged, portfolio, 1) == key
+        
+        # Opening a position on the symbol changes the prompt, so the key changes
+        portfolio_with_position = {'positions': [{'symbol': 'BTCUSDT', 'side': 'LONG'}]}
+        assert DeepSeekAgent._decision_cache_key(market_data, portfolio_with_position, 1) != key
+        
+        # Unusable inputs are not cached
+        broken = dict(market_data, indicators={'rsi': float('nan')})
+        assert DeepSeekAgent._decision_cache_key(broken, portfolio, 1) is None
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,49 @@
+"""
+Unit tests for Logger
+Tests the queued console output
+"""
+import logging
+import pytest
+import logger
+
+
+class TestConsole:
+    """Test suite for get_console / stop_console"""
+    
+    @pytest.fixture(autouse=True)
+    def console_file(self, tmp_path, monkeypatch):
+        """Write console output to a temporary file; each test starts and ends with no listener running"""
+        logger.stop_console()
+        monkeypatch.setattr(logger, 'CONSOLE_LOG_FILE', str(tmp_path / 'bot.log'))
+        yield
+        logger.stop_console()
+    
+    def queue_handlers(self):
+        """QueueHandlers currently attached to the console logger"""
+        root = logging.getLogger('trading_bot')
+        return [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]
+    
+    def test_logging_after_stop_is_not_lost(self, capsys):
+        """Test records logged after stop_console still reach stdout"""
+        log = logger.get_console('trading_bot.test')
+        log.info("before stop")
+        logger.stop_console()
+        
+        assert self.queue_handlers() == []
+        log.info("after stop")
+        
+        out = capsys.readouterr().out
+        assert "before stop" in out
+        assert "after stop" in out
+    
+    def test_restart_prints_once(self, capsys):
+        """Test a restarted console has a single queue handler and prints each line once"""
+        logger.get_console('trading_bot.test')
+        logger.stop_console()
+        log = logger.get_console('trading_bot.test')
+        
+        assert len(self.queue_handlers()) == 1
+        log.info("restarted")
+        logger.stop_console()
+        
+        assert capsys.readouterr().out.count("restarted") == 1
@@ -0,0 +1,101 @@
+"""
+Unit tests for Market Analyzer
+Tests setup scanning, scan reuse and strategy cooldowns
+"""
+import pytest
+import market_analyzer
+from market_analyzer import MarketAnalyzer, _expand_reasons, compact_number
+
+
+class StubTracker:
+    """Performance tracker with no trade history"""
+    
+    def __init__(self):
+        self.strategy_cooldowns = set()
+    
+    def check_strategy_cooldown(self, strategy_type):
+        return strategy_type in self.strategy_cooldowns, ""
+    
+    def calculate_strategy_boost(self, strategy_type, lookback_trades=20):
+        return {'boost': 0, 'reason': ''}
+    
+    def scoring_stamp(self):
+        return None, frozenset(self.strategy_cooldowns)
+
+
+class TestMarketAnalyzer:
+    """Test suite for MarketAnalyzer class"""
+    
+    @pytest.fixture
+    def analyzer(self, monkeypatch):
+        """Analyzer with a stub tracker and assessment logging captured in memory"""
+        self.assessments = []
+        logger = type('Logger', (), {'log_assessment': lambda _, a: self.assessments.append(a)})()
+        monkeypatch.setattr(market_analyzer, 'get_logger', lambda: logger)
+        analyzer = MarketAnalyzer()
+        analyzer.perf_tracker = StubTracker()
+        return analyzer
+    
+    def create_market_data(self, price=100.0, regime='STRONG_TREND_UP'):
+        """Market data for a healthy uptrend"""
+        return {
+            'symbol': 'BTCUSDT',
+            'price': price,
+            'regime': regime,
+            'price_change_24h': 2.0,
+            'indicators': {
+                'ema_9': 99.0, 'ema_21': 98.0, 'ema_50': 96.0,
+                'rsi': 60.0, 'macd_diff': 0.2, 'volume_ratio': 1.5,
+                'bb_position': 70.0, 'recent_high': 101.0, 'recent_low': 95.0,
+                'atr': 1.0, 'atr_percent': 1.0, 'price_change_4h': 1.0,
+                'current_price': price
+            }
+        }
+    
+    def test_trend_setup_found(self, analyzer):
+        """Test that a confirmed uptrend yields a formatted LONG trend setup"""
+        setup = analyzer.get_best_setup(self.create_market_data())
+        
+        assert setup['type'] == 'TREND_FOLLOWING_ENHANCED'
+        assert setup['direction'] == 'LONG'
+        assert setup['confidence'] >= 70
+        assert "✓ RSI in healthy bullish zone (60.0)" in setup['reasons']
+        assert all(isinstance(reason, str) for reason in setup['reasons'])
+    
+    def test_scan_reused_while_inputs_unchanged(self, analyzer):
+        """Test that an identical poll reuses the scan but still logs its assessment"""
+        first = analyzer.find_trade_setups(self.create_market_data())
+        second = analyzer.find_trade_setups(self.create_market_data())
+        
+        assert second == first
+        assert second is not first
+        assert len(self.assessments) == 2
+        assert self.assessments[1] is self.assessments[0]
+        
+        moved = analyzer.find_trade_setups(self.create_market_data(price=100.5))
+        assert len(self.assessments) == 3
+        assert self.assessments[2] is not self.assessments[0]
+        assert moved[0]['entry_price'] == 100.5
+    
+    def test_strategy_in_cooldown_yields_no_setup(self, analyzer):
+        """Test that a cooling-down strategy is skipped, including after a cached scan"""
+        market_data = self.create_market_data()
+        assert any(s['strategy'] == 'TREND_FOLLOWING' for s in analyzer.find_trade_setups(market_data))
+        
+        analyzer.perf_tracker.strategy_cooldowns.add('TREND_FOLLOWING')
+        setups = analyzer.find_trade_setups(market_data)
+        assert all(s.get('strategy') != 'TREND_FOLLOWING' for s in setups)
+    
+    def test_expand_reasons(self):
+        """Test deferred reason templates are formatted in order"""
+        reasons = ["✓ Plain", ("✓ RSI ({:.1f})", 61.26), ("✓ Boost +{} ({})", 5, 'hot')]
+        assert _expand_reasons(reasons) == ["✓ Plain", "✓ RSI (61.3)", "✓ Boost +5 (hot)"]
+    
+    def test_compact_number(self):
+        """Test prompt numbers are compact and non-finite values don't raise"""
+        assert compact_number(0) == '0'
+        assert compact_number(12345.678) == '12346'
+        assert compact_number(0.0012345678) == '0.0012346'
+        assert compact_number(float('nan')) == 'nan'
+        assert compact_number(float('inf')) == 'inf'
+        assert compact_number(float('-inf')) == '-inf'
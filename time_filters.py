@@ -3,7 +3,7 @@ Time-Based Trading Filters
 Filters trades based on time of day to optimize entry timing
 """
 from datetime import datetime, timezone
-from typing import Dict
+from typing import Dict, Optional
 
 # Configuration
 ENABLE_TIME_FILTERS = True  # Can disable for testing
@@ -19,9 +19,11 @@ CUSTOM_AVOID_HOURS = None  # Override AVOID_HOURS_UTC if set
 CUSTOM_HIGH_VOLUME_HOURS = None  # Override HIGH_VOLUME_HOURS_UTC if set
 
 
-def get_trading_period() -> Dict:
+def get_trading_period(now: Optional[datetime] = None) -> Dict:
     """
     Get current trading period and whether trading should occur
+    Parameters:
+        now: Cycle timestamp (UTC); read from the clock when omitted
     Returns:
         dict with should_trade, period, size_multiplier, reason
     """
@@ -33,7 +35,7 @@ def get_trading_period() -> Dict:
             'reason': 'Time filters disabled'
         }
     
-    current_hour = datetime.now(timezone.utc).hour
+    current_hour = (now or datetime.now(timezone.utc)).hour
     
     # Use custom hours if set
     avoid_hours = CUSTOM_AVOID_HOURS if CUSTOM_AVOID_HOURS is not None else AVOID_HOURS_UTC
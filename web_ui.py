@@ -2,7 +2,6 @@
 Web UI for Apex Trading Bot
 Provides a dashboard to monitor bot performance, trades, and status
 """
-import json
 import os
 from datetime import datetime, timezone, timedelta
 from flask import Flask, render_template, jsonify, request
@@ -10,7 +9,7 @@ from flask_cors import CORS
 from typing import Dict, List
 
 from executor import get_executor
-from logger import get_logger
+from logger import get_logger, loads_jsonl_line
 from risk_manager import get_risk_manager
 from analytics.performance_tracker import get_performance_tracker
 from config import INITIAL_CAPITAL, DECISION_LOG_FILE, TRADE_LOG_FILE, PERFORMANCE_LOG_FILE, ERROR_LOG_FILE
@@ -26,16 +25,15 @@ def read_jsonl_file(filepath: str, limit: int = 100) -> List[Dict]:
     
     entries = []
     try:
-        with open(filepath, 'r') as f:
+        with open(filepath, 'rb') as f:
             lines = f.readlines()
             # Get last N lines
             for line in lines[-limit:]:
                 line = line.strip()
                 if line:
-                    try:
-                        entries.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
+                    entry = loads_jsonl_line(line)
+                    if entry is not None:
+                        entries.append(entry)
         # Return in chronological order (oldest first)
         return entries
     except Exception as e: